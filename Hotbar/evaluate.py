@@ -0,0 +1,180 @@
+# evaluate.py
+"""
+Accuracy and latency of the hotbar matchers on labeled slot crops.
+
+Each crop goes through the same decision as monitor_hotbar: the best
+reference wins unless its score is below CONFIDENCE_THRESHOLD, in which
+case the slot is empty.
+
+Labels come from a CSV file (filename,label) or from the file names:
+"Ballistic Flashbang.png", "Ballistic Flashbang_3.png" and
+"Ballistic Flashbang (2).png" are all labeled "Ballistic Flashbang", and
+names starting with "empty" are empty slots. An empty label in the CSV,
+or "empty", also means an empty slot.
+
+Usage:
+    python evaluate.py crops/
+    python evaluate.py crops/ --labels labels.csv --matchers brute ordered
+"""
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+import cv2
+from references import (CONFIDENCE_THRESHOLD, EARLY_EXIT_THRESHOLD, IMAGES_FOLDER, SLOT_SIZE, decide,
+                        load_reference_images)
+from matching import BatchMatcher, MatchStats, match_slot
+from pca_matcher import MODEL_FILE, PCAMatcher
+
+def brute_force(reference_images):
+    """Score every reference, as monitor_hotbar did originally"""
+    def classify(image):
+        return match_slot(image, reference_images)
+    return classify
+
+def ordered(reference_images):
+    """Most likely references first, stopping at EARLY_EXIT_THRESHOLD"""
+    # Statistics are learned over the corpus as if it were one session
+    stats = MatchStats(stats_file=None, slots=1)
+
+    def classify(image):
+        name, score, evaluated = match_slot(image, reference_images, stats.order(0, reference_images),
+                                            EARLY_EXIT_THRESHOLD)
+        detected = decide(name, score)
+        if detected != stats.slot_last[0]:
+            stats.record(0, detected)
+        return name, score, evaluated
+    return classify
+
+def batched(reference_images):
+    """All references in one matrix product"""
+    matcher = BatchMatcher(reference_images)
+
+    def classify(image):
+        name, score = matcher.match([image])[0]
+        return name, score, len(matcher.names)
+    return classify
+
+def pca(reference_images):
+    """PCA projection and nearest reference, using the built model if it matches the references"""
+    matcher = None
+    if os.path.exists(MODEL_FILE):
+        matcher = PCAMatcher.load(MODEL_FILE, reference_images)
+        if set(matcher.names) != set(reference_images):
+            print(f"Warning: {MODEL_FILE} was built from other references, building a model of these")
+            matcher = None
+    if matcher is None:
+        matcher = PCAMatcher.build(reference_images)
+
+    def classify(image):
+        return matcher.match([image])[0]
+    return classify
+
+MATCHERS = {
+    'brute': brute_force,
+    'ordered': ordered,
+    'batched': batched,
+    'pca': pca,
+}
+
+def label_from_filename(filename):
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    if stem.lower().startswith("empty"):
+        return None
+    return re.sub(r"(_\d+| \(\d+\))$", "", stem)
+
+def load_corpus(folder, labels_file=None):
+    """(path, label) pairs, label None for an empty slot"""
+    if labels_file:
+        corpus = []
+        with open(labels_file, 'r', newline='') as f:
+            for row in csv.reader(f):
+                if not row or row[0].strip().lower() == "filename":
+                    continue
+                label = row[1].strip() if len(row) > 1 else ""
+                corpus.append((os.path.join(folder, row[0].strip()),
+                               None if label.lower() in ("", "empty") else label))
+        return corpus
+    return [(os.path.join(folder, name), label_from_filename(name)) for name in sorted(os.listdir(folder))
+            if name.lower().endswith((".png", ".jpg", ".jpeg"))]
+
+def evaluate(classify, crops, threshold):
+    """
+    Run one matcher over labeled crops.
+
+    Returns:
+        dict: accuracy, false announcements, misses and latency
+    """
+    correct = false_announcements = misses = evaluated_total = 0
+    latencies = []
+    for image, label in crops:
+        start_time = time.perf_counter()
+        name, score, evaluated = classify(image)
+        latencies.append(time.perf_counter() - start_time)
+        evaluated_total += evaluated
+
+        # The same decision monitor_hotbar makes before announcing
+        detected = decide(name, score, threshold)
+        if detected == label:
+            correct += 1
+        elif detected is not None:
+            # A wrong item, or an item in an empty slot, would be spoken
+            false_announcements += 1
+        else:
+            misses += 1
+
+    latencies.sort()
+    return {
+        'accuracy': correct / len(crops),
+        'false_announcements': false_announcements,
+        'misses': misses,
+        'mean_ms': sum(latencies) / len(latencies) * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95)] * 1000,
+        'templates': evaluated_total / len(crops),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate hotbar matchers on labeled slot crops")
+    parser.add_argument("crops", help="Folder of slot crops")
+    parser.add_argument("--labels", help="CSV of filename,label (default: labels from file names)")
+    parser.add_argument("--images", default=IMAGES_FOLDER, help="Reference image folder")
+    parser.add_argument("--matchers", nargs="+", choices=list(MATCHERS), default=list(MATCHERS))
+    parser.add_argument("--threshold", type=float, default=CONFIDENCE_THRESHOLD)
+    args = parser.parse_args()
+
+    reference_images = load_reference_images(args.images)
+    if not reference_images:
+        print(f"No reference images found in {args.images}")
+        sys.exit(1)
+
+    crops = []
+    for path, label in load_corpus(args.crops, args.labels):
+        img = cv2.imread(path)
+        if img is None:
+            print(f"Warning: Could not read {path}")
+            continue
+        if img.shape[1::-1] != SLOT_SIZE:
+            img = cv2.resize(img, SLOT_SIZE)
+        crops.append((img, label))
+    if not crops:
+        print(f"No crops found in {args.crops}")
+        sys.exit(1)
+
+    unknown = {label for _, label in crops if label is not None and label not in reference_images}
+    if unknown:
+        print(f"Warning: {len(unknown)} labels have no reference image, e.g. {sorted(unknown)[0]!r}")
+
+    print(f"{len(crops)} crops ({sum(label is None for _, label in crops)} empty), "
+          f"{len(reference_images)} reference images, threshold {args.threshold}")
+    print()
+    print(f"{'Matcher':<10} {'Top-1':>7} {'False':>6} {'Missed':>7} {'Mean ms':>8} {'p95 ms':>7} {'Templates':>10}")
+    for name in args.matchers:
+        result = evaluate(MATCHERS[name](reference_images), crops, args.threshold)
+        print(f"{name:<10} {result['accuracy'] * 100:>6.1f}% {result['false_announcements']:>6} "
+              f"{result['misses']:>7} {result['mean_ms']:>8.3f} {result['p95_ms']:>7.3f} "
+              f"{result['templates']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -40,15 +40,63 @@ class ImageCache:
             print(f"Warning: Failed to process {image_path}: {e}")
             return None
 
+    def load_cache(self) -> bool:
+        """
+        Load the cache file into memory unless it is already loaded.
+        
+        Returns:
+            bool: True if a cache is loaded
+        """
+        if self.cache:
+            return True
+        if not os.path.exists(self.cache_file):
+            return False
+        try:
+            with open(self.cache_file, 'rb') as f:
+                self.cache = pickle.load(f)
+            return True
+        except PermissionError as pe:
+            print(f"Permission error loading cache: {pe}")
+        except Exception as e:
+            print(f"Error loading cache: {e}")
+        return False
+
+    def stale_images(self, image_paths) -> Tuple[list, list]:
+        """
+        Compare image files with the loaded cache.
+        
+        Args:
+            image_paths (list): Paths of the PNG images in the directory
+        
+        Returns:
+            tuple: (Paths that are new or changed, cached names whose file is gone)
+        """
+        stale = []
+        for image_path in image_paths:
+            entry = self.cache.get(image_path.name)
+            try:
+                stat = image_path.stat()
+            except OSError:
+                continue
+            if entry is None or entry['modified'] != stat.st_mtime or entry['size'] != stat.st_size:
+                stale.append(image_path)
+        names = {image_path.name for image_path in image_paths}
+        removed = [name for name in self.cache if name not in names]
+        return stale, removed
+
     def cache_images(self, image_dir: str = "cache", cache_file: str = None, 
-                    max_workers: int = None) -> Tuple[bool, str]:
+                    max_workers: int = None, force: bool = False) -> Tuple[bool, str]:
         """
         Cache all PNG images from a directory using parallel processing.
         
+        Only images that are new or changed since the cache file was written
+        are read again, and nothing is written if the cache is up to date.
+        
         Args:
             image_dir (str): Directory containing PNG images
             cache_file (str): Output cache file name (default is instance cache_file)
             max_workers (int): Maximum number of thread workers (None = CPU count)
+            force (bool): Reread every image even if the cache is up to date
         
         Returns:
             tuple: (Success status, Message with timing and compression stats)
@@ -78,20 +126,28 @@ class ImageCache:
                 print("No PNG files found in directory")
                 return True, "No PNG files found in directory"
 
+            if force:
+                self.cache = {}
+            else:
+                self.load_cache()
+            image_paths, removed = self.stale_images(image_paths)
+            if not image_paths and not removed:
+                elapsed = time.time() - start_time
+                return True, f"Cache of {len(self.cache)} images is up to date (checked in {elapsed:.2f} seconds)"
+            for name in removed:
+                del self.cache[name]
+
             # Process images in parallel
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
                 results = executor.map(self._process_image, image_paths)
             
             # Filter out None results and update cache
-            total_original = 0
-            total_compressed = 0
-            
             for result in results:
                 if result:
                     name, data = result
                     self.cache[name] = data
-                    total_original += data['size']
-                    total_compressed += data['compressed_size']
+            total_original = sum(data['size'] for data in self.cache.values())
+            total_compressed = sum(data['compressed_size'] for data in self.cache.values())
 
             # Save cache using pickle (faster than JSON for binary data)
             try:
@@ -114,7 +170,8 @@ class ImageCache:
             compression_ratio = (total_compressed / total_original) * 100 if total_original else 0
             
             return True, (
-                f"Cached {len(self.cache)} images in {elapsed:.2f} seconds\n"
+                f"Cached {len(image_paths)} new or changed images, {len(self.cache)} in total, "
+                f"in {elapsed:.2f} seconds\n"
                 f"Original size: {total_original/1024/1024:.2f}MB\n"
                 f"Compressed size: {total_compressed/1024/1024:.2f}MB\n"
                 f"Compression ratio: {compression_ratio:.1f}%"
@@ -135,17 +192,8 @@ class ImageCache:
             bytes: Decompressed image data if found, None otherwise
         """
         try:
-            if not self.cache:  # Load cache if not already loaded
-                if os.path.exists(self.cache_file):
-                    try:
-                        with open(self.cache_file, 'rb') as f:
-                            self.cache = pickle.load(f)
-                    except PermissionError as pe:
-                        print(f"Permission error loading cache: {pe}")
-                        return None
-                    except Exception as e:
-                        print(f"Error loading cache: {e}")
-                        return None
+            if not self.load_cache():
+                return None
             
             if image_name in self.cache:
                 return zlib.decompress(self.cache[image_name]['data'])
@@ -1,29 +1,36 @@
 # main.py
-import cv2
-import numpy as np
-import os
 import time
-from mss import mss
-import tkinter as tk
-from tkinter import simpledialog
-from pynput import keyboard
+START_TIME = time.perf_counter()
+
+# cv2, numpy, tkinter and the speech output are imported where they are
+# first used, so the hotkeys are listening before they have loaded
+import os
+import sys
 import threading
-import accessible_output2.outputs.auto
 from image_cache import ImageCache
+from references import (BASE_SLOT_COORDS, IMAGES_FOLDER, CONFIDENCE_THRESHOLD, EARLY_EXIT_THRESHOLD,
+                        decide, load_reference_images)
 
-# Constants
-BASE_SLOT_COORDS = [
-    (1514, 931, 1577, 975),  # Slot 1
-    (1595, 931, 1658, 975),  # Slot 2
-    (1677, 931, 1740, 975),  # Slot 3
-    (1759, 931, 1822, 975),  # Slot 4
-    (1840, 931, 1903, 975)   # Slot 5
-]
+# Modules shared by all the tools
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "common"))
+from hotkeys import HotkeyManager
+from capture import open_capture
+from events import EventPublisher
+
+# Constants (the slot positions and thresholds are in references.py)
 SLOT_COORDS = (1502, 931, 1565, 975)  # left, top, right, bottom for single slot capture
-IMAGES_FOLDER = "images"  # Folder for reference images
 DISPLAY_SIZE = (250, 250)  # Size for display images
-CONFIDENCE_THRESHOLD = 0.5  # Minimum confidence to consider a match valid
+SHOW_OVERLAY = True  # Show the detection window (needed for the arrow key adjustments)
+OVERLAY_FPS = 5  # Maximum detection window refreshes per second
+STATUS_INTERVAL = 1.0  # Seconds between updates of the search statistics in the window
+STATS_FILE = "match_stats.json"  # Item frequency/recency, kept across sessions
+STATS_SAVE_INTERVAL = 60  # Seconds between saves of the match statistics
+MATCHER = "ordered"  # "ordered" template search, or "pca" (build the model with pca_matcher.py)
+PCA_MODEL_FILE = "pca_model.npz"
+REGIONS_FILE = "regions.json"  # Extra region sets (inventory, backpack...), optional
+PUBLISH_EVENTS = True  # Stream detections to local subscribers (see common/events.py)
 FPS = 10
+CAPTURE_MARGIN = 16  # Pixels captured around the slots, so small offset adjustments fit
 
 # Arrow key constants for OpenCV
 KEY_LEFT = 81  # Left arrow key code
@@ -37,8 +44,47 @@ y_offset = 0.0
 running = True
 monitoring = False
 last_detected_items = [None, None, None, None, None]
-speaker = accessible_output2.outputs.auto.Auto()
+speaker = None  # Screen reader output, loaded by speak()
+speaker_lock = threading.Lock()
 image_cache = ImageCache()
+hotkeys = HotkeyManager()
+capture = None  # Frame source, open while monitoring
+capture_box = None  # Screen region the frame source covers
+match_stats = None  # Created by monitor_hotbar()
+region_detector = None  # Created by monitor_hotbar() if REGIONS_FILE defines region sets
+events = None  # Detection event publisher, started in main()
+startup_phases = []  # (phase, seconds taken, seconds since start)
+
+def startup_phase(name, phase_start):
+    """Record a finished startup phase"""
+    now = time.perf_counter()
+    startup_phases.append((name, now - phase_start, now - START_TIME))
+
+def startup_report():
+    """How long each startup phase took to get ready"""
+    lines = ["Startup:"]
+    for name, seconds, since_start in startup_phases:
+        lines.append(f"  {name:<22} {seconds * 1000:8.1f} ms  (ready at {since_start * 1000:.0f} ms)")
+    return "\n".join(lines)
+
+def load_speaker():
+    """Load the screen reader output unless it is already loaded"""
+    global speaker
+    with speaker_lock:
+        if speaker is None:
+            import accessible_output2.outputs.auto
+            speaker = accessible_output2.outputs.auto.Auto()
+    return speaker
+
+def speak(text):
+    """Speak through the screen reader, loading it on first use"""
+    load_speaker().speak(text)
+
+def publish_detection(frame, **fields):
+    """Send a detection to event subscribers, if the event stream is on"""
+    if events:
+        events.publish(dict(fields, type='detection', tool='hotbar', frame_time=frame.timestamp,
+                            latency=time.time() - frame.timestamp))
 
 def apply_offset(coords):
     """Apply the current offset to coordinates"""
@@ -59,34 +105,72 @@ def print_coordinates():
     for i, coord in enumerate(slot_coords, 1):
         print(f"Slot {i}: Top Left ({coord[0]:.2f}, {coord[1]:.2f}), Bottom Right ({coord[2]:.2f}, {coord[3]:.2f})")
 
-def load_reference_images(folder):
-    """Load all reference images from the folder"""
-    if not os.path.exists(folder):
-        os.makedirs(folder, exist_ok=True)
-        print(f"Created images folder: {folder}")
-        
-    images = {}
-    for filename in os.listdir(folder):
-        if filename.endswith((".png", ".jpg", ".jpeg")):
-            img = cv2.imread(os.path.join(folder, filename))
-            if img is not None:
-                img = cv2.resize(img, (int(BASE_SLOT_COORDS[0][2] - BASE_SLOT_COORDS[0][0]), 
-                                      int(BASE_SLOT_COORDS[0][3] - BASE_SLOT_COORDS[0][1])))
-                name = os.path.splitext(filename)[0]
-                images[name] = img
-    return images
-
-def match_template(image, template):
-    """Match a slot image against a template image"""
-    result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
-    _, max_val, _, _ = cv2.minMaxLoc(result)
-    return max_val
+def capture_bbox(region_sets=()):
+    """Screen region covering the hotbar slots and all region sets"""
+    boxes = apply_offset(BASE_SLOT_COORDS) + [bbox for region_set in region_sets for _, bbox in region_set.regions]
+    return (
+        int(min(box[0] for box in boxes)) - CAPTURE_MARGIN,
+        int(min(box[1] for box in boxes)) - CAPTURE_MARGIN,
+        int(max(box[2] for box in boxes)) + 1 + CAPTURE_MARGIN,
+        int(max(box[3] for box in boxes)) + 1 + CAPTURE_MARGIN,
+    )
+
+def covers(outer, boxes):
+    """True if every box lies inside outer"""
+    return all(box[0] >= outer[0] and box[1] >= outer[1] and box[2] <= outer[2] and box[3] <= outer[3]
+               for box in boxes)
+
+def start_capture(region_sets=()):
+    """Capture just the regions monitored, or read them from a shared capture if one runs"""
+    global capture, capture_box
+    stop_capture()
+    capture_box = capture_bbox(region_sets)
+    capture = open_capture(capture_box, interval=1./FPS)
+
+def stop_capture():
+    """Stop capturing while monitoring is paused"""
+    global capture
+    if capture:
+        capture.stop()
+        capture = None
+
+def load_pca_matcher(reference_images, rebuild=False):
+    """
+    PCA matcher for the reference images, rebuilding the saved model if it
+    was built from other references, or if rebuild is set.
+
+    Returns:
+        PCAMatcher, or None if there are no reference images
+    """
+    from pca_matcher import PCA_DIMS, PCAMatcher
+
+    dims = PCA_DIMS
+    if os.path.exists(PCA_MODEL_FILE):
+        pca = PCAMatcher.load(PCA_MODEL_FILE, reference_images)
+        if not rebuild and set(pca.names) == set(reference_images):
+            return pca
+        dims = pca.dims
+        if not rebuild:
+            print(f"PCA model {PCA_MODEL_FILE} does not match the reference images, rebuilding it")
+    if not reference_images:
+        return None
+    pca = PCAMatcher.build(reference_images, dims)
+    pca.save(PCA_MODEL_FILE)
+    print(f"Built {pca.dims}-dimensional PCA model of {len(pca.names)} references")
+    return pca
 
 def capture_and_save_image():
     """Capture a single slot and prompt for name"""
-    # Capture the screenshot
-    with mss() as sct:
-        screenshot = np.array(sct.grab(SLOT_COORDS))
+    import cv2
+    import numpy as np
+    import tkinter as tk
+    from tkinter import simpledialog
+
+    # Copy the slot out of the latest shared frame, or grab it if none is published.
+    # A source of its own, as monitoring may stop the monitor's at any time
+    source = open_capture(SLOT_COORDS, start_service=False)
+    screenshot = np.array(source.latest().region(SLOT_COORDS))
+    source.stop()
     
     # Convert the image from BGRA to RGB
     screenshot_rgb = cv2.cvtColor(screenshot, cv2.COLOR_BGRA2RGB)
@@ -105,54 +189,100 @@ def capture_and_save_image():
         # Save the image
         file_path = os.path.join(IMAGES_FOLDER, f"{image_name}.png")
         cv2.imwrite(file_path, cv2.cvtColor(screenshot_rgb, cv2.COLOR_RGB2BGR))
-        speaker.speak(f"Image saved as {image_name}")
+        speak(f"Image saved as {image_name}")
         print(f"Image saved as {file_path}")
         
         # Update the image cache
         image_cache.cache_images(IMAGES_FOLDER)
     else:
-        speaker.speak("Image capture cancelled")
+        speak("Image capture cancelled")
         print("Image capture cancelled")
 
-def on_press(key):
-    """Handle keyboard shortcuts"""
-    global monitoring, running
+def toggle_monitoring():
+    """F10 - Toggle monitoring"""
+    global monitoring
     
-    if key == keyboard.Key.f12:
-        # F12 - Capture reference image
-        capture_and_save_image()
-    elif key == keyboard.Key.f10:
-        # F10 - Toggle monitoring
-        monitoring = not monitoring
-        if monitoring:
-            speaker.speak("Hotbar monitoring started")
-            print("Hotbar monitoring started")
-        else:
-            speaker.speak("Hotbar monitoring paused")
-            print("Hotbar monitoring paused")
-    elif key == keyboard.Key.f9:
-        # F9 - Exit program
-        speaker.speak("Exiting program")
-        print("Exiting program")
-        running = False
-        return False  # Stop the listener
+    monitoring = not monitoring
+    if monitoring:
+        speak("Hotbar monitoring started")
+        print("Hotbar monitoring started")
+    else:
+        speak("Hotbar monitoring paused")
+        print("Hotbar monitoring paused")
+
+def exit_program():
+    """F9 - Exit program"""
+    global running
+    
+    speak("Exiting program")
+    print("Exiting program")
+    running = False
+    hotkeys.stop()  # Stop the listener
 
 def monitor_hotbar():
     """Monitor the hotbar slots and detect changes"""
-    global running, last_detected_items, x_offset, y_offset
-    
-    sct = mss()
-    reference_images = load_reference_images(IMAGES_FOLDER)
-    
-    # Create window for visualization
-    cv2.namedWindow("Hotbar Detection")
+    global running, last_detected_items, x_offset, y_offset, match_stats, region_detector
     
+    phase_start = time.perf_counter()
+    import cv2
+    from matching import MatchStats, match_slot
+    from regions import RegionDetector, load_region_sets
+    startup_phase("OpenCV import", phase_start)
+
+    phase_start = time.perf_counter()
+    load_speaker()
+    startup_phase("Speech output", phase_start)
+
+    # Only new or changed images are reread; an up to date cache is just checked
+    phase_start = time.perf_counter()
+    success, message = image_cache.cache_images(IMAGES_FOLDER)
+    print(message)
+    startup_phase("Image cache check", phase_start)
+
+    # The reference bank is decoded once, from the cache loaded above
+    phase_start = time.perf_counter()
+    reference_images = load_reference_images(IMAGES_FOLDER, image_cache)
     print("Loaded", len(reference_images), "reference images")
     if not reference_images:
         print(f"No reference images found in {IMAGES_FOLDER} folder. Use F12 to capture some.")
+    startup_phase("Reference images", phase_start)
+
+    # Item statistics from earlier sessions order the template search
+    phase_start = time.perf_counter()
+    match_stats = MatchStats(STATS_FILE, slots=len(BASE_SLOT_COORDS))
+    match_stats.load()
+    region_sets = load_region_sets(REGIONS_FILE)
+    if region_sets:
+        region_detector = RegionDetector(region_sets, CONFIDENCE_THRESHOLD)
+        region_detector.load_banks()
+    startup_phase("Statistics and regions", phase_start)
+
+    pca = None
+    if MATCHER == "pca":
+        pca = load_pca_matcher(reference_images)
+        if pca:
+            print(f"Using {pca.dims}-dimensional PCA matcher with {len(pca.names)} references")
+
+    # Create window for visualization
+    overlay = None
+    if SHOW_OVERLAY:
+        from overlay import OverlayCanvas
+        phase_start = time.perf_counter()
+        overlay = OverlayCanvas(len(BASE_SLOT_COORDS), DISPLAY_SIZE, fps=OVERLAY_FPS)
+        overlay.open()
+        startup_phase("Detection window", phase_start)
+    else:
+        print("Detection window disabled, offsets cannot be adjusted")
+    print(startup_report())
+    last_save = time.time()
+    # Refreshed every STATUS_INTERVAL; text that changed every frame would redraw the status every frame
+    templates_status = ""
+    last_status = 0.0
     
     while running:
         if not monitoring:
+            # Nothing is captured while paused
+            stop_capture()
             time.sleep(0.1)
             continue
             
@@ -160,73 +290,75 @@ def monitor_hotbar():
 
         # Apply offsets to slot coordinates
         slot_coords = apply_offset(BASE_SLOT_COORDS)
+        if capture is None or not covers(capture_box, slot_coords):
+            # Monitoring just started, or the offsets moved the slots out of the captured region
+            start_capture(region_sets)
 
-        # Capture all slots
-        screenshots = [np.array(sct.grab(tuple(map(int, coord)))) for coord in slot_coords]
-        screenshots_rgb = [cv2.cvtColor(screenshot, cv2.COLOR_RGBA2RGB) for screenshot in screenshots]
+        # Read all slots from the latest frame; the conversion copies them
+        # out of the shared ring buffer
+        frame = capture.latest()
+        screenshots_rgb = [cv2.cvtColor(frame.region(coord), cv2.COLOR_RGBA2RGB) for coord in slot_coords]
+        if not frame.valid():
+            # The slot was overwritten while we copied it, try the next frame
+            continue
 
         # Process each slot
         current_detected = []
         for idx, screenshot_rgb in enumerate(screenshots_rgb):
-            best_match = None
-            best_score = -1
-            
-            for name, ref_img in reference_images.items():
-                score = match_template(screenshot_rgb, ref_img)
-                if score > best_score:
-                    best_score = score
-                    best_match = name
+            if pca:
+                best_match, best_score, evaluated = pca.match([screenshot_rgb])[0]
+            else:
+                # Try the items most likely to be in this slot first
+                order = match_stats.order(idx, reference_images)
+                best_match, best_score, evaluated = match_slot(
+                    screenshot_rgb, reference_images, order, EARLY_EXIT_THRESHOLD)
+            match_stats.record_search(evaluated)
                     
             # Only consider it a match if above threshold
-            if best_score < CONFIDENCE_THRESHOLD:
-                best_match = None
-                
-            current_detected.append(best_match)
+            current_detected.append(decide(best_match, best_score))
             
             # Announce changes via speech output
             if current_detected[idx] != last_detected_items[idx]:
+                match_stats.record(idx, current_detected[idx])
                 slot_num = idx + 1
+                publish_detection(frame, slot=slot_num, item=current_detected[idx], score=float(best_score))
                 if current_detected[idx]:
-                    speaker.speak(f"Slot {slot_num}: {current_detected[idx]}")
+                    speak(f"Slot {slot_num}: {current_detected[idx]}")
                 else:
-                    speaker.speak(f"Slot {slot_num}: Empty")
+                    speak(f"Slot {slot_num}: Empty")
         
         # Update the last detected items
         last_detected_items = current_detected.copy()
 
-        # Create display image
-        display_images = [cv2.resize(img, DISPLAY_SIZE) for img in screenshots_rgb]
-        top_row = np.hstack(display_images[:3])
-        bottom_row = np.hstack([display_images[3], display_images[4], np.zeros_like(display_images[0])])
-        display = np.vstack([top_row, bottom_row])
+        # Extra region sets that are due, matched in one batched pass
+        if region_detector:
+            for region_set, idx, item, score in region_detector.process(frame) or []:
+                publish_detection(frame, region_set=region_set.name, region=region_set.regions[idx][0],
+                                  item=item, score=score)
+                message = f"{region_set.name} {region_set.regions[idx][0]}: {item if item else 'Empty'}"
+                print(message)
+                if region_set.announce:
+                    speak(message)
 
-        # Add detection results to the image
-        for idx, item in enumerate(current_detected):
-            x_offset_display = (idx % 3) * DISPLAY_SIZE[0]
-            y_offset_display = (idx // 3) * DISPLAY_SIZE[1]
-            
-            text = item if item else "Empty"
-            color = (0, 255, 0) if item else (0, 0, 255)
-            
-            cv2.putText(display, f"Slot {idx+1}: {text}", 
-                        (x_offset_display + 5, y_offset_display + 20),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
-
-        # Display threshold and current offsets
-        cv2.putText(display, f"Threshold: {CONFIDENCE_THRESHOLD}", 
-                    (5, display.shape[0] - 60),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
-        cv2.putText(display, f"X/Y Offset: {x_offset:.1f}/{y_offset:.1f}", 
-                    (5, display.shape[0] - 30),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
-        cv2.putText(display, "F10: Toggle | F12: Capture | F9: Exit | Arrows: Adjust", 
-                    (5, display.shape[0] - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-
-        cv2.imshow("Hotbar Detection", display)
+        if time.time() - last_save > STATS_SAVE_INTERVAL:
+            match_stats.save()
+            last_save = time.time()
+
+        # Update the debug window; unchanged slots are not redrawn
+        key = -1
+        if overlay:
+            if time.time() - last_status >= STATUS_INTERVAL:
+                templates_status = f"Templates/slot: {match_stats.average_evaluated():.1f} of {len(reference_images)}"
+                last_status = time.time()
+            key = overlay.frame(screenshots_rgb, current_detected, [
+                templates_status,
+                f"Threshold: {CONFIDENCE_THRESHOLD}",
+                f"X/Y Offset: {x_offset:.1f}/{y_offset:.1f}",
+                "F10: Toggle | F12: Capture | F9: Exit | Arrows: Adjust",
+            ])
 
         # Handle key presses for adjustment
-        key = cv2.waitKey(1) & 0xFF
+        key = key & 0xFF
         
         # Check for arrow keys (the exact key codes can vary by platform)
         # Try the standard key codes first
@@ -247,23 +379,43 @@ def monitor_hotbar():
             y_offset += 0.5
             print_coordinates()
         elif key == ord('r'):
-            # Reload reference images
-            reference_images = load_reference_images(IMAGES_FOLDER)
+            # Reload reference images, picking up new files through the cache
+            image_cache.cache_images(IMAGES_FOLDER)
+            reference_images = load_reference_images(IMAGES_FOLDER, image_cache)
+            match_stats.invalidate()
             print("Reloaded", len(reference_images), "reference images")
+            if MATCHER == "pca":
+                # The projections must cover exactly the reloaded references
+                pca = load_pca_matcher(reference_images, rebuild=True)
+            if region_detector:
+                region_detector.load_banks()
 
         # Sleep to maintain frame rate
         time.sleep(max(1./FPS - (time.time() - start_time), 0))
 
-    cv2.destroyAllWindows()
+    stop_capture()
+    if overlay:
+        print(overlay.report())
+        overlay.close()
 
 def main():
-    global running
-    
-    # Initialize the image cache
-    success, message = image_cache.cache_images(IMAGES_FOLDER)
-    print(message)
+    global running, events
+    startup_phase("Imports", START_TIME)
+
+    # Let the FA11y client and loggers follow detections
+    if PUBLISH_EVENTS:
+        phase_start = time.perf_counter()
+        events = EventPublisher()
+        try:
+            events.start()
+            print(f"Publishing detections on {events.address}")
+        except OSError as e:
+            print(f"Warning: Could not publish detections on {events.address}: {e}")
+            events = None
+        startup_phase("Event stream", phase_start)
     
-    # Start monitoring thread
+    # Start monitoring thread; it loads OpenCV, the image cache and the
+    # reference images while the hotkeys are already listening
     monitor_thread = threading.Thread(target=monitor_hotbar)
     monitor_thread.daemon = True
     monitor_thread.start()
@@ -275,13 +427,23 @@ def main():
     print("Arrow keys: Adjust hotbar position")
     print("R: Reload reference images")
     
-    # Start listening for key presses
-    with keyboard.Listener(on_press=on_press) as listener:
-        listener.join()
+    # Listen for key presses, handling them on this thread until F9
+    hotkeys.add_hotkey('f12', capture_and_save_image)  # F12 - Capture reference image
+    hotkeys.add_hotkey('f10', toggle_monitoring)
+    hotkeys.add_hotkey('f9', exit_program)
+    hotkeys.run()
+    print(hotkeys.latency_report())
     
     # Ensure clean exit
     running = False
     monitor_thread.join(timeout=1.0)
+    if events:
+        events.stop()
+    if match_stats:
+        match_stats.save()
+        print(f"Templates evaluated per slot: {match_stats.average_evaluated():.1f} on average")
+    if region_detector:
+        print(region_detector.report())
     print("Program terminated")
 
 if __name__ == "__main__":
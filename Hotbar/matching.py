@@ -0,0 +1,196 @@
+# matching.py
+"""
+Matching slot images against reference images.
+
+Importing this module has no side effects; cv2 is imported when
+match_template() is first used.
+"""
+import json
+import os
+import time
+import numpy as np
+
+class MatchStats:
+    """
+    Per-slot and global frequency/recency statistics of detected items.
+
+    Used to try the most likely reference images first, so the search can
+    stop early once a near-perfect match is found. The statistics are
+    saved to a JSON file and carried across sessions.
+    """
+    def __init__(self, stats_file="match_stats.json", slots=5, half_life=600.0):
+        """
+        Args:
+            stats_file (str): JSON file the statistics are kept in
+            slots (int): Number of hotbar slots
+            half_life (float): Seconds for the recency bonus of an item to halve
+        """
+        self.stats_file = stats_file
+        self.slots = slots
+        self.half_life = half_life
+        self.slot_counts = [{} for _ in range(slots)]
+        self.global_counts = {}
+        self.last_seen = {}
+        self.slot_last = [None] * slots
+        self.dirty = False
+
+        # Candidate order per slot, rebuilt only after the statistics change
+        self._order_cache = [None] * slots
+
+        # Templates evaluated, for the average per slot search
+        self.evaluated = 0
+        self.searches = 0
+
+    def load(self):
+        """Load statistics saved by an earlier session"""
+        if not os.path.exists(self.stats_file):
+            return
+        try:
+            with open(self.stats_file, 'r') as f:
+                data = json.load(f)
+            for slot, counts in enumerate(data.get('slot_counts', [])[:self.slots]):
+                self.slot_counts[slot] = counts
+            self.global_counts = data.get('global_counts', {})
+            self.last_seen = data.get('last_seen', {})
+            self._order_cache = [None] * self.slots
+        except Exception as e:
+            print(f"Warning: Failed to load match statistics: {e}")
+
+    def save(self):
+        """Save statistics if they changed"""
+        if not self.dirty:
+            return
+        try:
+            with open(self.stats_file, 'w') as f:
+                json.dump({
+                    'slot_counts': self.slot_counts,
+                    'global_counts': self.global_counts,
+                    'last_seen': self.last_seen,
+                }, f)
+            self.dirty = False
+        except Exception as e:
+            print(f"Warning: Failed to save match statistics: {e}")
+
+    def _score(self, slot, name, now):
+        score = 4 * self.slot_counts[slot].get(name, 0) + self.global_counts.get(name, 0)
+        last = self.last_seen.get(name)
+        if last is not None:
+            score += 10 * 0.5 ** ((now - last) / self.half_life)
+        if name == self.slot_last[slot]:
+            # Whatever is in the slot now is by far the most likely next frame
+            score += 1e9
+        return score
+
+    def order(self, slot, names):
+        """Candidate names for a slot, most likely first"""
+        cached = self._order_cache[slot]
+        if cached is not None and cached[0] == len(names):
+            return cached[1]
+        now = time.time()
+        ordered = sorted(names, key=lambda name: -self._score(slot, name, now))
+        self._order_cache[slot] = (len(names), ordered)
+        return ordered
+
+    def invalidate(self):
+        """Forget cached orders, e.g. after the reference images are reloaded"""
+        self._order_cache = [None] * self.slots
+
+    def record(self, slot, name):
+        """Record that an item newly appeared in a slot"""
+        self.slot_last[slot] = name
+        if name is not None:
+            self.slot_counts[slot][name] = self.slot_counts[slot].get(name, 0) + 1
+            self.global_counts[name] = self.global_counts.get(name, 0) + 1
+            self.last_seen[name] = time.time()
+            self.dirty = True
+        self.invalidate()
+
+    def record_search(self, evaluated):
+        self.evaluated += evaluated
+        self.searches += 1
+
+    def average_evaluated(self):
+        """Average number of templates evaluated per slot search"""
+        return self.evaluated / self.searches if self.searches else 0.0
+
+def match_template(image, template):
+    """Match a slot image against a template image"""
+    import cv2
+
+    result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, _ = cv2.minMaxLoc(result)
+    return max_val
+
+def match_slot(image, reference_images, order=None, early_exit=None):
+    """
+    Find the best matching reference image for a slot.
+
+    Args:
+        image: Slot image
+        reference_images (dict): name -> template image
+        order: Names in the order to try them (default: dict order)
+        early_exit (float): Stop as soon as a score reaches this value
+
+    Returns:
+        tuple: (best name, best score, number of templates evaluated)
+    """
+    best_match = None
+    best_score = -1
+    evaluated = 0
+
+    for name in order if order is not None else reference_images:
+        score = match_template(image, reference_images[name])
+        evaluated += 1
+        if score > best_score:
+            best_score = score
+            best_match = name
+            if early_exit is not None and score >= early_exit:
+                break
+
+    return best_match, best_score, evaluated
+
+def normalize_images(images):
+    """
+    Flatten a stack of images (N x H x W x C) to zero-mean, unit-length rows.
+
+    The mean is taken per channel like TM_CCOEFF_NORMED, so the dot product
+    of two rows equals cv2.matchTemplate's score for equal-size images.
+    """
+    images = images.astype(np.float32)
+    if images.ndim == 3:
+        images = images[..., np.newaxis]
+    centered = images - images.mean(axis=(1, 2), keepdims=True)
+    flat = centered.reshape(len(images), -1)
+    norms = np.linalg.norm(flat, axis=1, keepdims=True)
+    # A flat image correlates with nothing
+    norms[norms == 0] = np.inf
+    return flat / norms
+
+class BatchMatcher:
+    """Match many same-size regions against a reference bank in one pass"""
+    def __init__(self, reference_images):
+        """
+        Args:
+            reference_images (dict): name -> template image, all the same size
+        """
+        self.names = list(reference_images)
+        self.matrix = None
+        if self.names:
+            self.matrix = normalize_images(np.stack([reference_images[name] for name in self.names]))
+
+    def match(self, images):
+        """
+        Best reference for each image.
+
+        Args:
+            images: Images the size of the templates
+
+        Returns:
+            list: (best name, best score) per image
+        """
+        if self.matrix is None or not len(images):
+            return [(None, -1)] * len(images)
+        # One matrix product scores every image against every template
+        scores = normalize_images(np.stack(images)) @ self.matrix.T
+        best = scores.argmax(axis=1)
+        return [(self.names[i], float(scores[row, i])) for row, i in enumerate(best)]
@@ -0,0 +1,130 @@
+# overlay.py
+import time
+import cv2
+import numpy as np
+
+class OverlayCanvas:
+    """
+    Debug window for the hotbar monitor.
+
+    Everything is drawn into one canvas allocated up front. A slot's tile
+    is redrawn only when its image or detected item changed, the status
+    lines only when their text changed, and the window is refreshed at
+    most fps times per second. The time and CPU spent on the window are
+    counted so its cost can be reported.
+    """
+    def __init__(self, slots, tile_size=(250, 250), columns=3, fps=5, window="Hotbar Detection",
+                 status_height=100):
+        """
+        Args:
+            slots (int): Number of slot tiles
+            tile_size (tuple): (width, height) of a tile
+            columns (int): Tiles per row
+            fps (float): Maximum window refreshes per second (0 = every frame)
+            window (str): Window name
+            status_height (int): Height of the status strip below the tiles
+        """
+        self.slots = slots
+        self.tile_size = tuple(tile_size)
+        self.window = window
+        self.interval = 1. / fps if fps else 0
+        width, height = self.tile_size
+        rows = (slots + columns - 1) // columns
+
+        self.canvas = np.zeros((rows * height + status_height, columns * width, 3), dtype=np.uint8)
+        self.tiles = [
+            self.canvas[(idx // columns) * height:(idx // columns + 1) * height,
+                        (idx % columns) * width:(idx % columns + 1) * width]
+            for idx in range(slots)
+        ]
+        self.status_view = self.canvas[rows * height:]
+        self.resized = np.zeros((height, width, 3), dtype=np.uint8)
+
+        # What each tile shows, to skip redrawing unchanged ones
+        self.last_crops = [None] * slots
+        self.last_items = [None] * slots
+        self.last_status = None
+        self.dirty = True
+        self.last_show = 0.0
+
+        # Cost accounting
+        self.frames = 0
+        self.tile_updates = 0
+        self.refreshes = 0
+        self.seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.started = time.perf_counter()
+
+    def open(self):
+        cv2.namedWindow(self.window)
+
+    def close(self):
+        cv2.destroyWindow(self.window)
+
+    def update_slot(self, idx, crop, item):
+        """Redraw a slot's tile if its image or item changed"""
+        last = self.last_crops[idx]
+        if last is not None and item == self.last_items[idx] and np.array_equal(last, crop):
+            return
+        if last is None or last.shape != crop.shape:
+            self.last_crops[idx] = crop.copy()
+        else:
+            np.copyto(last, crop)
+        self.last_items[idx] = item
+
+        tile = self.tiles[idx]
+        np.copyto(tile, cv2.resize(crop, self.tile_size, dst=self.resized))
+        text = item if item else "Empty"
+        color = (0, 255, 0) if item else (0, 0, 255)
+        cv2.putText(tile, f"Slot {idx+1}: {text}", (5, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+        self.tile_updates += 1
+        self.dirty = True
+
+    def update_status(self, lines):
+        """Redraw the status strip if its text changed"""
+        if lines == self.last_status:
+            return
+        self.last_status = list(lines)
+        self.status_view[:] = 0
+        y = 25
+        for line in lines:
+            cv2.putText(self.status_view, line, (5, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+            y += 22
+        self.dirty = True
+
+    def frame(self, crops, items, status_lines):
+        """
+        Update the canvas for one monitor frame and refresh the window if due.
+
+        Returns:
+            int: Key pressed in the window, as from cv2.waitKey
+        """
+        start_time = time.perf_counter()
+        start_cpu = time.thread_time()
+
+        for idx, (crop, item) in enumerate(zip(crops, items)):
+            self.update_slot(idx, crop, item)
+        self.update_status(status_lines)
+        if self.dirty and start_time - self.last_show >= self.interval:
+            cv2.imshow(self.window, self.canvas)
+            self.last_show = start_time
+            self.dirty = False
+            self.refreshes += 1
+        # Keeps the window responsive and reads the adjustment keys
+        key = cv2.waitKey(1)
+
+        self.frames += 1
+        self.seconds += time.perf_counter() - start_time
+        self.cpu_seconds += time.thread_time() - start_cpu
+        return key
+
+    def report(self):
+        """Cost of the debug window"""
+        if not self.frames:
+            return "Overlay: no frames"
+        elapsed = time.perf_counter() - self.started
+        return (
+            f"Overlay: {self.frames} frames, {self.refreshes} window refreshes, "
+            f"{self.tile_updates} tile redraws, {self.seconds / self.frames * 1000:.2f} ms per frame, "
+            f"{self.cpu_seconds / elapsed * 100:.1f}% CPU"
+        )
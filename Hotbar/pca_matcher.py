@@ -0,0 +1,177 @@
+# pca_matcher.py
+"""
+Learned alternative to template matching for the hotbar.
+
+Slot crops (about 8,300 values each) are normalized the same way as
+TM_CCOEFF_NORMED and projected onto a small basis (128 dimensions by
+default) computed from the reference images in IMAGES_FOLDER. A crop is classified
+by the reference with the largest dot product in that space, so its cost
+is one small matrix product whatever the bank size. The basis is taken
+without centering, which keeps projected dot products an estimate of the
+real TM_CCOEFF_NORMED score, and the best few candidates are rescored
+exactly with cv2.matchTemplate when their images are available. Scores
+can therefore be compared with CONFIDENCE_THRESHOLD directly.
+
+At this dimensionality a k-d or ball tree visits most of the bank anyway,
+so the nearest reference is found with one matrix product instead.
+
+The model must be built from the same references the monitor rescores
+against; main.py rebuilds it when they differ or are reloaded.
+
+Usage:
+    python pca_matcher.py build --images images --dims 128
+    python pca_matcher.py bench --bank cache --sizes 250 1000 4000
+"""
+import argparse
+import sys
+import time
+import numpy as np
+from matching import match_template, normalize_images
+from references import IMAGES_FOLDER, load_reference_images
+
+PCA_DIMS = 128
+MODEL_FILE = "pca_model.npz"
+BANK_FOLDER = "cache"  # Larger bank used only by the benchmark
+
+class PCAMatcher:
+    def __init__(self, names, basis, projections, reference_images=None, rerank=3):
+        """
+        Args:
+            names (list): Reference names, one per projection row
+            basis: k x D projection basis
+            projections: Projected references (N x k)
+            reference_images (dict): name -> template, used to rescore candidates exactly
+            rerank (int): Number of best candidates rescored with cv2.matchTemplate
+        """
+        self.names = list(names)
+        self.basis = basis
+        self.projections = projections
+        self.reference_images = reference_images or {}
+        self.rerank = rerank
+
+    @classmethod
+    def build(cls, reference_images, dims=PCA_DIMS, **kwargs):
+        """Compute the basis from a bank of same-size images"""
+        names = list(reference_images)
+        if not names:
+            raise ValueError("Cannot build a PCA matcher from an empty bank")
+        vectors = normalize_images(np.stack([reference_images[name] for name in names]))
+        # Rows of vt are the principal directions, strongest first
+        _, _, vt = np.linalg.svd(vectors, full_matrices=False)
+        basis = np.ascontiguousarray(vt[:dims], dtype=np.float32)
+        projections = vectors @ basis.T
+        return cls(names, basis, projections, reference_images, **kwargs)
+
+    @classmethod
+    def load(cls, path, reference_images=None, **kwargs):
+        data = np.load(path, allow_pickle=False)
+        return cls(data['names'].tolist(), data['basis'], data['projections'], reference_images, **kwargs)
+
+    def save(self, path):
+        np.savez_compressed(path, names=np.array(self.names), basis=self.basis, projections=self.projections)
+
+    @property
+    def dims(self):
+        return self.basis.shape[0]
+
+    def match(self, images):
+        """
+        Best reference for each image.
+
+        Returns:
+            list: (best name, confidence, templates rescored) per image
+        """
+        if not len(images):
+            return []
+        scores = (normalize_images(np.stack(images)) @ self.basis.T) @ self.projections.T
+        results = []
+        count = min(self.rerank, len(self.names))
+        for image, row in zip(images, scores):
+            if count:
+                candidates = np.argpartition(-row, count - 1)[:count]
+            else:
+                candidates = [int(row.argmax())]
+            best_match, best_score, evaluated = None, -1, 0
+            for i in candidates:
+                name = self.names[i]
+                template = self.reference_images.get(name)
+                if count and template is not None:
+                    score = match_template(image, template)
+                    evaluated += 1
+                else:
+                    score = float(row[i])
+                if score > best_score:
+                    best_match, best_score = name, score
+            results.append((best_match, best_score, evaluated))
+        return results
+
+def grow_bank(images, size):
+    """Bank of the requested size, adding shifted copies when it is too small"""
+    names = list(images)
+    grown = {}
+    i = 0
+    while len(grown) < size:
+        name = names[i % len(names)]
+        copy = i // len(names)
+        if copy:
+            grown[f"{name} #{copy}"] = np.roll(images[name], (copy % 3, copy // 3), axis=(0, 1))
+        else:
+            grown[name] = images[name]
+        i += 1
+    return grown
+
+def main():
+    parser = argparse.ArgumentParser(description="PCA matcher for hotbar slots")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="Build the model from the reference images")
+    build_parser.add_argument("--images", default=IMAGES_FOLDER)
+    build_parser.add_argument("--dims", type=int, default=PCA_DIMS)
+    build_parser.add_argument("--output", default=MODEL_FILE)
+    bench_parser = sub.add_parser("bench", help="Classification latency for growing banks")
+    bench_parser.add_argument("--bank", default=BANK_FOLDER)
+    bench_parser.add_argument("--dims", type=int, default=PCA_DIMS)
+    bench_parser.add_argument("--sizes", type=int, nargs="+", default=[250, 500, 1000, 2000, 4000])
+    bench_parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    # The monitor rescores against IMAGES_FOLDER, so the model is built from it too
+    folder = args.images if args.command == "build" else args.bank
+    bank = load_reference_images(folder)
+    if not bank:
+        print(f"No reference images found in {folder}")
+        sys.exit(1)
+
+    if args.command == "build":
+        start_time = time.perf_counter()
+        matcher = PCAMatcher.build(bank, args.dims)
+        matcher.save(args.output)
+        print(f"Built {matcher.dims}-dimensional model of {len(matcher.names)} references "
+              f"in {time.perf_counter() - start_time:.1f}s, saved as {args.output}")
+    elif args.command == "bench":
+        rng = np.random.default_rng(0)
+        print(f"{'References':>10} {'PCA ms':>8} {'Brute ms':>9} {'Agree':>7}")
+        for size in args.sizes:
+            references = grow_bank(bank, size)
+            matcher = PCAMatcher.build(references, args.dims)
+            names = list(references)
+            queries = []
+            for i in rng.integers(len(names), size=args.queries):
+                noise = rng.normal(0, 8, references[names[i]].shape)
+                queries.append(np.clip(references[names[i]] + noise, 0, 255).astype(np.uint8))
+
+            start_time = time.perf_counter()
+            pca_results = [matcher.match([query])[0][0] for query in queries]
+            pca_time = (time.perf_counter() - start_time) / len(queries)
+
+            # Brute force on a subset of the queries, it is slow on big banks
+            brute_queries = queries[:20]
+            start_time = time.perf_counter()
+            brute_results = [max(names, key=lambda name: match_template(query, references[name]))
+                             for query in brute_queries]
+            brute_time = (time.perf_counter() - start_time) / len(brute_queries)
+
+            agree = sum(a == b for a, b in zip(pca_results, brute_results)) / len(brute_queries)
+            print(f"{size:>10} {pca_time * 1000:>8.3f} {brute_time * 1000:>9.2f} {agree * 100:>6.0f}%")
+
+if __name__ == "__main__":
+    main()
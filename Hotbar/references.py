@@ -0,0 +1,56 @@
+# references.py
+"""
+Hotbar slot positions and the reference images slots are matched against.
+
+Shared by main.py, evaluate.py, regions.py and pca_matcher.py. Importing this module
+has no side effects; cv2 is imported when images are loaded.
+"""
+import os
+
+BASE_SLOT_COORDS = [
+    (1514, 931, 1577, 975),  # Slot 1
+    (1595, 931, 1658, 975),  # Slot 2
+    (1677, 931, 1740, 975),  # Slot 3
+    (1759, 931, 1822, 975),  # Slot 4
+    (1840, 931, 1903, 975)   # Slot 5
+]
+# (width, height) every slot crop and reference image is compared at
+SLOT_SIZE = (int(BASE_SLOT_COORDS[0][2] - BASE_SLOT_COORDS[0][0]),
+             int(BASE_SLOT_COORDS[0][3] - BASE_SLOT_COORDS[0][1]))
+IMAGES_FOLDER = "images"  # Folder for reference images
+CONFIDENCE_THRESHOLD = 0.5  # Minimum confidence to consider a match valid
+EARLY_EXIT_THRESHOLD = 0.97  # Stop searching a slot once a match is this confident
+
+def decide(name, score, threshold=CONFIDENCE_THRESHOLD):
+    """The item announced for a slot's best match: name, or None (empty) below the threshold"""
+    return name if score >= threshold else None
+
+def load_reference_images(folder, cache=None, size=SLOT_SIZE):
+    """
+    Load all reference images from the folder, decoding cached ones from memory.
+
+    Args:
+        folder (str): Folder of PNG/JPG images, created if missing
+        cache: ImageCache holding the folder's files, if any
+        size: (width, height) every image is resized to
+    """
+    import cv2
+    import numpy as np
+
+    if not os.path.exists(folder):
+        os.makedirs(folder, exist_ok=True)
+        print(f"Created images folder: {folder}")
+        
+    images = {}
+    for filename in sorted(os.listdir(folder)):
+        if filename.endswith((".png", ".jpg", ".jpeg")):
+            data = cache.load_cached_image(filename) if cache else None
+            if data is not None:
+                img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+            else:
+                img = cv2.imread(os.path.join(folder, filename))
+            if img is not None:
+                img = cv2.resize(img, size)
+                name = os.path.splitext(filename)[0]
+                images[name] = img
+    return images
@@ -0,0 +1,187 @@
+# regions.py
+"""
+Item detection in extra screen regions beyond the five hotbar slots:
+the full inventory, ground-loot prompts, the backpack grid and so on.
+
+Region sets are read from a JSON file:
+
+    {
+        "region_sets": [
+            {
+                "name": "backpack",
+                "images": "images/backpack",
+                "interval": 0.5,
+                "threshold": 0.6,
+                "announce": false,
+                "grid": {"origin": [600, 300], "size": [63, 44],
+                         "step": [81, 60], "rows": 4, "cols": 8}
+            },
+            {
+                "name": "pickup",
+                "images": "images",
+                "interval": 0.2,
+                "announce": true,
+                "regions": [{"label": "Prompt", "bbox": [1200, 620, 1263, 664]}]
+            }
+        ]
+    }
+
+Each set has its own reference bank (a folder of images, resized to the
+set's region size), its own cadence in seconds and its own threshold.
+Regions are given one by one, as a grid, or both.
+
+On every frame, all regions that are due and share a reference bank are
+matched together in one matrix product, so adding regions adds rows to a
+single batched computation rather than another loop over every template.
+"""
+import json
+import os
+import time
+from collections import deque
+import cv2
+from matching import BatchMatcher
+from references import decide, load_reference_images
+
+class RegionSet:
+    def __init__(self, name, regions, images, interval=0.1, threshold=None, announce=False, size=None):
+        """
+        Args:
+            name (str): Name used in announcements and reports
+            regions (list): (label, (left, top, right, bottom)) pairs
+            images (str): Folder of reference images for this set
+            interval (float): Seconds between two detections of this set
+            threshold (float): Minimum confidence (default: the monitor's)
+            announce (bool): Speak changes, not only print them
+            size (tuple): (width, height) regions are compared at (default: first region)
+        """
+        if not regions:
+            raise ValueError(f"Region set {name!r} has no regions")
+        self.name = name
+        self.regions = regions
+        self.images = images
+        self.interval = interval
+        self.threshold = threshold
+        self.announce = announce
+        if size is None:
+            left, top, right, bottom = regions[0][1]
+            size = (int(right - left), int(bottom - top))
+        self.size = tuple(size)
+        self.next_due = 0.0
+
+    @staticmethod
+    def grid_regions(grid):
+        """(label, bbox) pairs for a grid of equally spaced regions"""
+        x, y = grid['origin']
+        width, height = grid['size']
+        step_x, step_y = grid.get('step', (width, height))
+        regions = []
+        for row in range(grid['rows']):
+            for col in range(grid['cols']):
+                left, top = x + col * step_x, y + row * step_y
+                regions.append((f"Row {row + 1} column {col + 1}", (left, top, left + width, top + height)))
+        return regions
+
+def load_region_sets(path):
+    """Region sets from a JSON config file, or an empty list if it does not exist"""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        config = json.load(f)
+
+    region_sets = []
+    for entry in config.get('region_sets', []):
+        regions = [(region['label'], tuple(region['bbox'])) for region in entry.get('regions', [])]
+        if 'grid' in entry:
+            regions.extend(RegionSet.grid_regions(entry['grid']))
+        region_sets.append(RegionSet(
+            entry['name'],
+            regions,
+            entry.get('images', "images"),
+            interval=entry.get('interval', 0.1),
+            threshold=entry.get('threshold'),
+            announce=entry.get('announce', False),
+            size=entry.get('size'),
+        ))
+    return region_sets
+
+class RegionDetector:
+    """Detect items in all configured region sets from shared frames"""
+    def __init__(self, region_sets, threshold):
+        """
+        Args:
+            region_sets (list): RegionSet objects
+            threshold (float): Minimum confidence for sets without their own
+        """
+        self.region_sets = region_sets
+        self.threshold = threshold
+        self.matchers = {}
+        self.detected = {region_set.name: [None] * len(region_set.regions) for region_set in region_sets}
+
+        # Seconds per detection pass and regions matched in it
+        self.timings = deque(maxlen=1000)
+
+    def load_banks(self):
+        """(Re)load the reference bank of every set, sharing identical ones"""
+        self.matchers = {}
+        for region_set in self.region_sets:
+            key = (region_set.images, region_set.size)
+            if key not in self.matchers:
+                self.matchers[key] = BatchMatcher(load_reference_images(region_set.images, size=region_set.size))
+            print(f"Region set {region_set.name}: {len(region_set.regions)} regions, "
+                  f"{len(self.matchers[key].names)} reference images")
+
+    def process(self, frame, now=None):
+        """
+        Match every region set that is due in one batched pass.
+
+        Returns:
+            list: (region set, region index, item, score) for each change,
+                  or None if the frame was overwritten while it was read
+        """
+        now = time.time() if now is None else now
+        due = [region_set for region_set in self.region_sets if now >= region_set.next_due]
+        if not due:
+            return []
+        start_time = time.perf_counter()
+
+        # Copy the crops out first, grouped by the bank they are matched against
+        batches = {}
+        for region_set in due:
+            rows = batches.setdefault((region_set.images, region_set.size), ([], []))
+            for idx, (_, bbox) in enumerate(region_set.regions):
+                crop = cv2.cvtColor(frame.region(bbox), cv2.COLOR_RGBA2RGB)
+                if crop.shape[1::-1] != region_set.size:
+                    crop = cv2.resize(crop, region_set.size)
+                rows[0].append(crop)
+                rows[1].append((region_set, idx))
+        if not frame.valid():
+            return None
+
+        changes = []
+        count = 0
+        for key, (crops, owners) in batches.items():
+            count += len(crops)
+            for (region_set, idx), (name, score) in zip(owners, self.matchers[key].match(crops)):
+                threshold = self.threshold if region_set.threshold is None else region_set.threshold
+                name = decide(name, score, threshold)
+                detected = self.detected[region_set.name]
+                if detected[idx] != name:
+                    detected[idx] = name
+                    changes.append((region_set, idx, name, score))
+
+        for region_set in due:
+            region_set.next_due = now + region_set.interval
+        self.timings.append((time.perf_counter() - start_time, count))
+        return changes
+
+    def report(self):
+        """Summary of batched detection cost"""
+        if not self.timings:
+            return "Regions: no detection passes"
+        seconds = sum(t for t, _ in self.timings)
+        regions = sum(n for _, n in self.timings)
+        return (
+            f"Regions: {len(self.timings)} passes, {regions / len(self.timings):.1f} regions per pass, "
+            f"{seconds / len(self.timings) * 1000:.2f} ms per pass, "
+            f"{seconds / max(regions, 1) * 1e6:.0f} us per region"
+        )
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from matching import BatchMatcher
+
+def random_images(count, seed, size=(44, 63)):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, size + (3,), dtype=np.uint8) for _ in range(count)]
+
+def ccoeff_normed(image, template):
+    """TM_CCOEFF_NORMED of two same-size images, written out"""
+    image = image.astype(np.float64)
+    template = template.astype(np.float64)
+    image -= image.mean(axis=(0, 1))
+    template -= template.mean(axis=(0, 1))
+    return (image * template).sum() / np.sqrt((image ** 2).sum() * (template ** 2).sum())
+
+@pytest.fixture
+def bank():
+    return dict(zip(["Bandage", "Medkit", "Shield Potion"], random_images(3, seed=0)))
+
+def queries(bank):
+    # Noisy copies of the references, and unrelated images
+    rng = np.random.default_rng(1)
+    noisy = [np.clip(image + rng.normal(0, 20, image.shape), 0, 255).astype(np.uint8)
+             for image in bank.values()]
+    return noisy + random_images(2, seed=2)
+
+def test_scores_match_reference_formula(bank):
+    images = queries(bank)
+    results = BatchMatcher(bank).match(images)
+    for image, (name, score) in zip(images, results):
+        expected = {ref: ccoeff_normed(image, template) for ref, template in bank.items()}
+        assert name == max(expected, key=expected.get)
+        assert score == pytest.approx(expected[name], abs=1e-5)
+
+def test_scores_match_cv2(bank):
+    cv2 = pytest.importorskip("cv2")
+    images = queries(bank)
+    for image, (name, score) in zip(images, BatchMatcher(bank).match(images)):
+        expected = cv2.matchTemplate(image, bank[name], cv2.TM_CCOEFF_NORMED)[0, 0]
+        assert score == pytest.approx(expected, abs=1e-4)
+
+def test_noisy_copies_find_their_reference(bank):
+    names = [name for name, _ in BatchMatcher(bank).match(queries(bank)[:3])]
+    assert names == list(bank)
+
+def test_empty_bank_and_flat_images():
+    assert BatchMatcher({}).match(random_images(2, seed=3)) == [(None, -1), (None, -1)]
+    flat = np.full((44, 63, 3), 128, dtype=np.uint8)
+    name, score = BatchMatcher({"Flat": flat, "Other": random_images(1, seed=4)[0]}).match([flat])[0]
+    # A flat image correlates with nothing rather than producing NaN
+    assert score == 0
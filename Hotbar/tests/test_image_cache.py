@@ -0,0 +1,74 @@
+import os
+import pytest
+from image_cache import ImageCache
+
+@pytest.fixture
+def folder(tmp_path):
+    images = tmp_path / "images"
+    images.mkdir()
+    (images / "Medkit.png").write_bytes(b"medkit")
+    (images / "Bandage.png").write_bytes(b"bandage")
+    return images
+
+def cache_folder(folder, cache_file):
+    cache = ImageCache()
+    ok, message = cache.cache_images(str(folder), str(cache_file))
+    assert ok, message
+    return cache, message
+
+def test_images_are_cached(folder, tmp_path):
+    cache, _ = cache_folder(folder, tmp_path / "cache.pkl")
+    assert cache.load_cached_image("Medkit.png") == b"medkit"
+    # A fresh instance reads the cache file
+    reloaded = ImageCache()
+    reloaded.cache_file = str(tmp_path / "cache.pkl")
+    assert reloaded.load_cached_image("Bandage.png") == b"bandage"
+    assert reloaded.load_cached_image("Missing.png") is None
+
+def test_unchanged_folder_is_not_reread(folder, tmp_path):
+    cache_file = tmp_path / "cache.pkl"
+    cache_folder(folder, cache_file)
+    written = os.path.getmtime(cache_file)
+    _, message = cache_folder(folder, cache_file)
+    assert "up to date" in message
+    assert os.path.getmtime(cache_file) == written
+
+def test_changed_images_are_reread(folder, tmp_path):
+    cache_file = tmp_path / "cache.pkl"
+    cache_folder(folder, cache_file)
+    medkit = folder / "Medkit.png"
+
+    # Same size, newer modification time
+    medkit.write_bytes(b"MEDKIT")
+    stat = medkit.stat()
+    os.utime(medkit, (stat.st_atime, stat.st_mtime + 10))
+    cache, message = cache_folder(folder, cache_file)
+    assert message.startswith("Cached 1 new or changed images")
+    assert cache.load_cached_image("Medkit.png") == b"MEDKIT"
+
+    # Different size, same modification time
+    mtime = medkit.stat().st_mtime
+    medkit.write_bytes(b"a larger medkit")
+    os.utime(medkit, (mtime, mtime))
+    cache, _ = cache_folder(folder, cache_file)
+    assert cache.load_cached_image("Medkit.png") == b"a larger medkit"
+
+def test_deleted_and_new_images(folder, tmp_path):
+    cache_file = tmp_path / "cache.pkl"
+    cache_folder(folder, cache_file)
+    os.remove(folder / "Bandage.png")
+    (folder / "Shield Potion.png").write_bytes(b"shield")
+    cache, message = cache_folder(folder, cache_file)
+    assert message.startswith("Cached 1 new or changed images, 2 in total")
+    assert sorted(cache.cache) == ["Medkit.png", "Shield Potion.png"]
+    assert cache.load_cached_image("Bandage.png") is None
+
+def test_deletion_alone_updates_the_cache(folder, tmp_path):
+    cache_file = tmp_path / "cache.pkl"
+    cache_folder(folder, cache_file)
+    os.remove(folder / "Bandage.png")
+    cache_folder(folder, cache_file)
+    reloaded = ImageCache()
+    reloaded.cache_file = str(cache_file)
+    assert reloaded.load_cache()
+    assert sorted(reloaded.cache) == ["Medkit.png"]
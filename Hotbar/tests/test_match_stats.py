@@ -0,0 +1,44 @@
+import matching
+from matching import MatchStats, match_slot
+
+NAMES = ["Bandage", "Medkit", "Shield Potion", "Slurp Juice"]
+
+def test_order_prefers_current_then_frequent_items():
+    stats = MatchStats(stats_file=None, slots=2)
+    for _ in range(3):
+        stats.record(0, "Medkit")
+    stats.record(1, "Slurp Juice")
+    stats.record(0, "Shield Potion")
+    # What the slot holds now comes first, then what it held most often
+    assert stats.order(0, NAMES)[:3] == ["Shield Potion", "Medkit", "Slurp Juice"]
+    assert stats.order(1, NAMES)[0] == "Slurp Juice"
+
+def test_order_is_rebuilt_after_record():
+    stats = MatchStats(stats_file=None, slots=1)
+    first = stats.order(0, NAMES)
+    assert stats.order(0, NAMES) is first
+    stats.record(0, "Slurp Juice")
+    assert stats.order(0, NAMES)[0] == "Slurp Juice"
+    # An emptied slot no longer favours its last item
+    stats.record(0, None)
+    assert stats.slot_last[0] is None
+
+def test_statistics_survive_save_and_load(tmp_path):
+    path = str(tmp_path / "match_stats.json")
+    stats = MatchStats(stats_file=path, slots=1)
+    stats.record(0, "Medkit")
+    stats.save()
+    loaded = MatchStats(stats_file=path, slots=1)
+    loaded.load()
+    assert loaded.slot_counts[0] == {"Medkit": 1}
+    assert loaded.order(0, NAMES)[0] == "Medkit"
+
+def test_match_slot_stops_at_early_exit(monkeypatch):
+    scores = {"Bandage": 0.3, "Medkit": 0.98, "Shield Potion": 0.99, "Slurp Juice": 0.1}
+    monkeypatch.setattr(matching, "match_template", lambda image, template: scores[template])
+    references = {name: name for name in NAMES}
+
+    assert match_slot(None, references) == ("Shield Potion", 0.99, 4)
+    assert match_slot(None, references, early_exit=0.97) == ("Medkit", 0.98, 2)
+    order = ["Shield Potion", "Medkit", "Bandage", "Slurp Juice"]
+    assert match_slot(None, references, order, early_exit=0.97) == ("Shield Potion", 0.99, 1)
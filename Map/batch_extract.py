@@ -0,0 +1,180 @@
+# batch_extract.py
+"""
+Headless POI extraction for a folder of map screenshots.
+
+Runs the same OCR pipeline as the POI setter on every image and writes
+one map_pois.txt style file per image, or a single combined JSONL file.
+Results are cached by image content, so re-running on a folder only
+processes new or changed screenshots. Names are corrected against the
+known POI names in poi_names.txt, if there is one (see gazetteer.py).
+
+Usage:
+    python batch_extract.py screenshots/ --output pois/ --workers 2
+    python batch_extract.py screenshots/ --jsonl all_pois.jsonl
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from poi_ocr import OCR_SETTINGS, extract_pois
+from poi_file import find_images, write_pois
+from gazetteer import GAZETTEER_FILE, load_gazetteer, format_report
+
+# Top-left corner of the map area captured by map_screenshotter.py, so the
+# positions match those the POI setter saves
+DEFAULT_OFFSET = (524, 84)
+CACHE_FILE = ".poi_cache.json"
+# OCR_SETTINGS that only affect speed, left out of the cache key
+SPEED_SETTINGS = ('tile_size', 'tile_overlap', 'workers')
+
+def file_hash(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_key(settings, offset):
+    """
+    Key results are cached under.
+
+    Deliberately covers only what changes the results: the OCR settings and
+    the offset. --workers and the tiling/worker settings (extract_pois reads
+    each image in one pass) only change how fast they are produced, so
+    changing them keeps the cache.
+    """
+    return repr(sorted((key, value) for key, value in settings.items()
+                       if key not in SPEED_SETTINGS)) + repr(tuple(offset))
+
+def load_cache(path, settings_key):
+    """Load cached results, ignoring them if the OCR settings changed"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"Warning: Ignoring unreadable cache {path}: {e}")
+        return {}
+    if data.get('settings') != settings_key:
+        return {}
+    return data.get('results', {})
+
+def save_cache(path, settings_key, results):
+    try:
+        with open(path, 'w') as f:
+            json.dump({'settings': settings_key, 'results': results}, f)
+    except Exception as e:
+        print(f"Warning: Failed to save cache {path}: {e}")
+
+def process_image(path, offset, settings):
+    """OCR a single screenshot. Runs in a worker process."""
+    import cv2
+
+    start_time = time.perf_counter()
+    img = cv2.imread(path)
+    if img is None:
+        raise ValueError(f"Could not read image {path}")
+    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    pois = extract_pois(img, offset, settings)
+    return pois, time.perf_counter() - start_time
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract POIs from a folder of map screenshots")
+    parser.add_argument("paths", nargs="+", help="Screenshot files or folders")
+    parser.add_argument("--output", default="pois", help="Folder for per-image POI files (default: pois)")
+    parser.add_argument("--jsonl", help="Write all results to this JSONL file instead")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes, each with its own OCR model")
+    parser.add_argument("--offset", type=int, nargs=2, default=DEFAULT_OFFSET, metavar=("X", "Y"),
+                        help="Screen position of the screenshot's top-left corner")
+    parser.add_argument("--force", action="store_true", help="Ignore cached results")
+    parser.add_argument("--gazetteer", default=GAZETTEER_FILE, help="Known POI names (default: %(default)s)")
+    parser.add_argument("--no-snap", action="store_true", help="Write the OCR names without correcting them")
+    args = parser.parse_args()
+
+    images = find_images(args.paths)
+    if not images:
+        print("No images found")
+        sys.exit(1)
+
+    os.makedirs(args.output, exist_ok=True)
+    cache_path = os.path.join(args.output, CACHE_FILE)
+    offset = tuple(args.offset)
+    settings_key = cache_key(OCR_SETTINGS, offset)
+    cache = {} if args.force else load_cache(cache_path, settings_key)
+
+    # Hash everything up front so cached images are skipped without OCR
+    hashes = {path: file_hash(path) for path in images}
+    pending = [path for path in images if hashes[path] not in cache]
+    print(f"{len(images)} images, {len(images) - len(pending)} cached, {len(pending)} to process")
+
+    start_time = time.perf_counter()
+    failed = 0
+    if pending:
+        from ocr_pool import init_worker
+
+        workers = max(1, min(args.workers, len(pending)))
+        torch_threads = max((os.cpu_count() or 1) // workers, 1)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(torch_threads,)) as executor:
+            futures = {executor.submit(process_image, path, offset, OCR_SETTINGS): path
+                       for path in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                path = futures[future]
+                try:
+                    pois, elapsed = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"[{done}/{len(pending)}] {os.path.basename(path)}: failed - {e}", flush=True)
+                    continue
+                cache[hashes[path]] = [list(poi) for poi in pois]
+                # Save as we go so an interrupted run keeps its progress
+                save_cache(cache_path, settings_key, cache)
+                print(f"[{done}/{len(pending)}] {os.path.basename(path)}: "
+                      f"{len(pois)} POIs in {elapsed:.1f}s", flush=True)
+
+    # Names are corrected when writing, so the cache keeps the raw OCR
+    # results and a grown gazetteer applies without running OCR again
+    gazetteer = None if args.no_snap else load_gazetteer(args.gazetteer)
+    totals = {'names': 0, 'corrected': 0, 'known': 0, 'unknown': 0, 'seconds': 0.0}
+
+    def output_pois(path):
+        pois = [tuple(poi) for poi in cache[hashes[path]]]
+        if gazetteer:
+            pois, report = gazetteer.snap_pois(pois)
+            print(f"{os.path.basename(path)}: {format_report(report)}")
+            for key in totals:
+                totals[key] += report[key]
+        return pois
+
+    # Write outputs for every image, cached or not
+    written = 0
+    if args.jsonl:
+        with open(args.jsonl, 'w') as f:
+            for path in images:
+                if hashes[path] not in cache:
+                    continue
+                pois = [{'name': n, 'x': x, 'y': y} for n, x, y in output_pois(path)]
+                f.write(json.dumps({'image': path, 'hash': hashes[path], 'pois': pois}) + "\n")
+                written += 1
+        print(f"Wrote {written} results to {args.jsonl}")
+    else:
+        for path in images:
+            if hashes[path] not in cache:
+                continue
+            stem = os.path.splitext(os.path.basename(path))[0]
+            write_pois(os.path.join(args.output, f"{stem}_pois.txt"), output_pois(path))
+            written += 1
+        print(f"Wrote {written} POI files to {args.output}")
+    if gazetteer:
+        print(f"Overall: {format_report(totals)}")
+
+    elapsed = time.perf_counter() - start_time
+    print(f"Done in {elapsed:.1f} seconds ({failed} failed)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+# gazetteer.py
+"""
+Known POI names, used to correct OCR results.
+
+Names are indexed by their trigrams (three-letter pieces). One edit
+changes at most three of a name's trigrams, so a known name within k
+edits of an OCR result shares all but 3k of its trigrams. Counting shared
+trigrams through the index leaves a handful of candidates, and only
+those have their edit distance computed. Lookups stay fast even for
+thousands of names. An OCR result is
+snapped to the nearest known name if that is within its edit budget and
+no other name is as close.
+
+The gazetteer file (poi_names.txt) has one name per line, normalized to
+upper case like the OCR results. Build it from POI files that were
+already checked by hand:
+
+    python gazetteer.py build map_pois.txt old_pois/ --output poi_names.txt
+    python gazetteer.py snap "SLAPPY SHRES"
+    python gazetteer.py bench --names 5000
+"""
+import argparse
+import os
+import random
+import re
+import string
+import sys
+import time
+from collections import Counter, defaultdict
+
+GAZETTEER_FILE = "poi_names.txt"
+
+GAZETTEER_SETTINGS = {
+    'max_distance': 2,    # Never correct more than this many edits
+    'max_ratio': 0.25,    # ... or more than this fraction of the name's length
+}
+
+def normalize_name(name):
+    """Upper case with single spaces, as the OCR reports names"""
+    return re.sub(r'\s+', ' ', name).strip().upper()
+
+def _pattern(word):
+    """Bit masks of where each character occurs in word, for _distance()"""
+    masks = {}
+    for i, char in enumerate(word):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks, len(word)
+
+def _distance(pattern, word):
+    """
+    Levenshtein distance between a _pattern() and a word.
+
+    Bit-parallel (Myers/Hyyro): one column of the edit distance table is
+    updated per character of word with a few integer operations, instead
+    of one cell at a time.
+    """
+    masks, length = pattern
+    if not length:
+        return len(word)
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    positive, negative = full, 0
+    score = length
+    for char in word:
+        eq = masks.get(char, 0)
+        xv = eq | negative
+        xh = (((eq & positive) + positive) ^ positive) | eq
+        horizontal_pos = negative | (~(xh | positive) & full)
+        horizontal_neg = positive & xh
+        if horizontal_pos & last:
+            score += 1
+        elif horizontal_neg & last:
+            score -= 1
+        horizontal_pos = ((horizontal_pos << 1) | 1) & full
+        horizontal_neg = (horizontal_neg << 1) & full
+        positive = horizontal_neg | (~(xv | horizontal_pos) & full)
+        negative = horizontal_pos & xv
+    return score
+
+def trigrams(word):
+    """Distinct three-letter pieces of a word, padded so the ends count too"""
+    padded = f"  {word}  "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TrigramIndex:
+    """Strings indexed by trigram, searched by edit distance"""
+    def __init__(self):
+        self.words = []
+        # Trigram -> indexes of the words containing it
+        self.postings = defaultdict(list)
+        # Length -> indexes of the words that long, for very short queries
+        self.lengths = defaultdict(list)
+
+    def add(self, word):
+        idx = len(self.words)
+        self.words.append(word)
+        for gram in trigrams(word):
+            self.postings[gram].append(idx)
+        self.lengths[len(word)].append(idx)
+
+    def search(self, word, max_distance):
+        """(distance, word) for every word within max_distance edits"""
+        grams = trigrams(word)
+        needed = len(grams) - 3 * max_distance
+        if needed > 0:
+            counts = Counter()
+            for gram in grams:
+                counts.update(self.postings.get(gram, ()))
+            candidates = [idx for idx, count in counts.items() if count >= needed]
+        else:
+            # Too short for the trigram filter; compare with every word of a close length
+            candidates = [idx for length in range(len(word) - max_distance, len(word) + max_distance + 1)
+                          for idx in self.lengths.get(length, ())]
+
+        found = []
+        pattern = _pattern(word)
+        for idx in candidates:
+            candidate = self.words[idx]
+            if abs(len(candidate) - len(word)) > max_distance:
+                continue
+            distance = _distance(pattern, candidate)
+            if distance <= max_distance:
+                found.append((distance, candidate))
+        return found
+
+class Gazetteer:
+    def __init__(self, names=(), settings=None):
+        """
+        Args:
+            names: Known POI names
+            settings (dict): Edit budget (defaults to GAZETTEER_SETTINGS)
+        """
+        self.settings = settings or GAZETTEER_SETTINGS
+        self.index = TrigramIndex()
+        # Normalized names
+        self.names = set()
+        for name in names:
+            self.add(name)
+
+    @classmethod
+    def load(cls, path=GAZETTEER_FILE, settings=None):
+        with open(path, 'r') as f:
+            return cls((line.strip() for line in f if line.strip()), settings)
+
+    def save(self, path=GAZETTEER_FILE):
+        with open(path, 'w') as f:
+            for name in sorted(self.names):
+                f.write(f"{name}\n")
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name):
+        key = normalize_name(name)
+        if key and key not in self.names:
+            self.names.add(key)
+            self.index.add(key)
+
+    def budget(self, name):
+        """Edits allowed when correcting this name"""
+        return min(self.settings['max_distance'], int(len(name) * self.settings['max_ratio']))
+
+    def lookup(self, name):
+        """
+        Nearest known name within the edit budget, ignoring case and spacing.
+
+        Returns:
+            tuple: (normalized known name, distance), or (None, None) if
+                   there is no match or two known names are equally close
+        """
+        key = normalize_name(name)
+        if key in self.names:
+            return key, 0
+        matches = sorted(self.index.search(key, self.budget(key)))
+        if not matches or (len(matches) > 1 and matches[1][0] == matches[0][0]):
+            return None, None
+        distance, match = matches[0]
+        return match, distance
+
+    def snap_pois(self, pois):
+        """
+        Replace OCR names with the known names they are closest to.
+
+        Names that only differ from a known name in case or spacing are
+        known, not corrected, and keep their OCR spelling.
+
+        Returns:
+            tuple: (POIs, report dict with corrected/known/unknown counts and lookup seconds)
+        """
+        snapped = []
+        corrected = known = unknown = 0
+        start_time = time.perf_counter()
+        for name, x, y in pois:
+            match, distance = self.lookup(name)
+            if match is None:
+                unknown += 1
+                snapped.append((name, x, y))
+                continue
+            if distance:
+                corrected += 1
+                snapped.append((match, x, y))
+            else:
+                known += 1
+                snapped.append((name, x, y))
+        elapsed = time.perf_counter() - start_time
+        return snapped, {
+            'names': len(pois),
+            'corrected': corrected,
+            'known': known,
+            'unknown': unknown,
+            'seconds': elapsed,
+        }
+
+def format_report(report):
+    """One line summary of a snap_pois report"""
+    if not report['names']:
+        return "Gazetteer: no names"
+    return (
+        f"Gazetteer: {report['corrected']} of {report['names']} names corrected "
+        f"({report['corrected'] / report['names'] * 100:.0f}%), {report['unknown']} unknown, "
+        f"{report['seconds'] / report['names'] * 1000:.3f} ms per lookup"
+    )
+
+def load_gazetteer(path=GAZETTEER_FILE):
+    """The gazetteer at path, or None if there is no such file"""
+    if not os.path.exists(path):
+        return None
+    gazetteer = Gazetteer.load(path)
+    print(f"Loaded {len(gazetteer)} known POI names from {path}")
+    return gazetteer
+
+def main():
+    parser = argparse.ArgumentParser(description="Known POI names for OCR correction")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="Collect names from POI files")
+    build_parser.add_argument("paths", nargs="+", help="POI files or folders of them")
+    build_parser.add_argument("--output", default=GAZETTEER_FILE)
+    snap_parser = sub.add_parser("snap", help="Look up names")
+    snap_parser.add_argument("names", nargs="+")
+    snap_parser.add_argument("--gazetteer", default=GAZETTEER_FILE)
+    bench_parser = sub.add_parser("bench", help="Lookup latency on synthetic names")
+    bench_parser.add_argument("--names", type=int, default=5000)
+    bench_parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        from poi_file import read_pois
+
+        gazetteer = Gazetteer.load(args.output) if os.path.exists(args.output) else Gazetteer()
+        before = len(gazetteer)
+        for path in args.paths:
+            files = ([os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".txt")]
+                     if os.path.isdir(path) else [path])
+            for file_path in files:
+                for name, _, _ in read_pois(file_path):
+                    gazetteer.add(name)
+        gazetteer.save(args.output)
+        print(f"{len(gazetteer)} names in {args.output} ({len(gazetteer) - before} new)")
+    elif args.command == "snap":
+        gazetteer = load_gazetteer(args.gazetteer)
+        if gazetteer is None:
+            print(f"No gazetteer {args.gazetteer}")
+            sys.exit(1)
+        for name in args.names:
+            match, distance = gazetteer.lookup(name)
+            print(f"{name} -> {match} ({distance} edits)" if match else f"{name} -> no match")
+    elif args.command == "bench":
+        rng = random.Random(0)
+        letters = string.ascii_uppercase
+        words = ["".join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(2000)]
+        names = {" ".join(rng.sample(words, rng.randint(1, 3))) for _ in range(args.names)}
+
+        start_time = time.perf_counter()
+        gazetteer = Gazetteer(names)
+        build_time = time.perf_counter() - start_time
+
+        # Queries with one OCR-style mistake each: a dropped, swapped or extra letter
+        queries = []
+        for name in rng.choices(sorted(names), k=args.queries):
+            i = rng.randrange(len(name))
+            mistake = rng.choice(("drop", "swap", "extra"))
+            if mistake == "drop":
+                name = name[:i] + name[i + 1:]
+            elif mistake == "swap":
+                name = name[:i] + rng.choice(letters) + name[i + 1:]
+            else:
+                name = name[:i] + rng.choice(letters) + name[i:]
+            queries.append((name, 0, 0))
+
+        snapped, report = gazetteer.snap_pois(queries)
+        print(f"{len(gazetteer)} names indexed in {build_time:.2f}s")
+        print(format_report(report))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+# map_archive.py
+"""
+Content-deduplicated archive for map screenshots.
+
+Captures are cut into fixed-size tiles stored under the hash of their
+pixels, so a tile that is identical across captures (most of the map
+between two patches) is only stored once. Each capture is a small JSON
+manifest listing its tile hashes, and images are rebuilt from tiles only
+when (and where) they are read.
+
+Layout:
+    <root>/tiles/<first 2 hash chars>/<hash>.bin   zlib-compressed raw pixels
+    <root>/captures/<capture id>.json              manifest
+
+Usage:
+    python map_archive.py add <root> screenshots/
+    python map_archive.py list <root>
+    python map_archive.py extract <root> <capture id> out.png
+    python map_archive.py stats <root>
+    python map_archive.py bench screenshots/   (uses a temporary archive)
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+import numpy as np
+from poi_file import find_images
+
+TILE_SIZE = 128
+
+class ArchivedImage:
+    """A capture in the archive, loading tiles only when they are read"""
+    def __init__(self, archive, manifest):
+        self.archive = archive
+        self.manifest = manifest
+        self.id = manifest['id']
+        self.width = manifest['width']
+        self.height = manifest['height']
+        self.channels = manifest['channels']
+        self.tile_size = manifest['tile_size']
+
+    @property
+    def shape(self):
+        return (self.height, self.width, self.channels)
+
+    def tile(self, row, col):
+        """Pixels of one tile"""
+        top, left = row * self.tile_size, col * self.tile_size
+        shape = (min(self.tile_size, self.height - top),
+                 min(self.tile_size, self.width - left),
+                 self.channels)
+        return self.archive.read_tile(self.manifest['tiles'][row][col], shape)
+
+    def region(self, left, top, right, bottom):
+        """Pixels of a region, reading only the tiles it overlaps"""
+        left, top = max(left, 0), max(top, 0)
+        right, bottom = min(right, self.width), min(bottom, self.height)
+        out = np.zeros((max(bottom - top, 0), max(right - left, 0), self.channels), dtype=np.uint8)
+        if out.size == 0:
+            return out
+        size = self.tile_size
+        for row in range(top // size, (bottom - 1) // size + 1):
+            for col in range(left // size, (right - 1) // size + 1):
+                tile = self.tile(row, col)
+                tile_top, tile_left = row * size, col * size
+                y0, y1 = max(top, tile_top), min(bottom, tile_top + tile.shape[0])
+                x0, x1 = max(left, tile_left), min(right, tile_left + tile.shape[1])
+                out[y0 - top:y1 - top, x0 - left:x1 - left] = \
+                    tile[y0 - tile_top:y1 - tile_top, x0 - tile_left:x1 - tile_left]
+        return out
+
+    def to_array(self):
+        """The full image"""
+        return self.region(0, 0, self.width, self.height)
+
+class TileArchive:
+    def __init__(self, root, tile_size=TILE_SIZE, compress_level=6, cache_tiles=256):
+        """
+        Args:
+            root (str): Archive folder, created if missing
+            tile_size (int): Tile edge in pixels for new captures
+            compress_level (int): zlib level (0-9) for new tiles
+            cache_tiles (int): Number of decoded tiles kept in memory
+        """
+        self.root = root
+        self.tile_size = tile_size
+        self.compress_level = compress_level
+        self.cache_tiles = cache_tiles
+        self._tile_cache = OrderedDict()
+        os.makedirs(os.path.join(root, "tiles"), exist_ok=True)
+        os.makedirs(os.path.join(root, "captures"), exist_ok=True)
+
+    def _tile_path(self, tile_hash):
+        return os.path.join(self.root, "tiles", tile_hash[:2], f"{tile_hash}.bin")
+
+    def _manifest_path(self, capture_id):
+        return os.path.join(self.root, "captures", f"{capture_id}.json")
+
+    def _unique_id(self, capture_id):
+        """capture_id, or capture_id_2, capture_id_3... if it is already taken"""
+        unique, count = capture_id, 1
+        while os.path.exists(self._manifest_path(unique)):
+            count += 1
+            unique = f"{capture_id}_{count}"
+        return unique
+
+    def _write_tile(self, tile):
+        """Store a tile unless an identical one exists, returning (hash, bytes written)"""
+        data = np.ascontiguousarray(tile).tobytes()
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(str(tile.shape).encode())
+        digest.update(data)
+        tile_hash = digest.hexdigest()
+
+        path = self._tile_path(tile_hash)
+        if os.path.exists(path):
+            return tile_hash, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = zlib.compress(data, self.compress_level)
+        # Write then rename so a crash never leaves a truncated tile behind
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, path)
+        return tile_hash, len(compressed)
+
+    def read_tile(self, tile_hash, shape):
+        tile = self._tile_cache.get(tile_hash)
+        if tile is not None:
+            self._tile_cache.move_to_end(tile_hash)
+            return tile
+        with open(self._tile_path(tile_hash), 'rb') as f:
+            data = zlib.decompress(f.read())
+        tile = np.frombuffer(data, dtype=np.uint8).reshape(shape)
+        self._tile_cache[tile_hash] = tile
+        while len(self._tile_cache) > self.cache_tiles:
+            self._tile_cache.popitem(last=False)
+        return tile
+
+    def add(self, image, capture_id=None, source=None):
+        """
+        Store an image (H x W x C or H x W uint8 array).
+
+        Captures are never overwritten: if capture_id is taken, a counter
+        is appended to it.
+
+        Returns:
+            tuple: (capture id, new tiles, reused tiles, bytes written)
+        """
+        if image.ndim == 2:
+            image = image[:, :, np.newaxis]
+        if capture_id is None:
+            capture_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        capture_id = self._unique_id(capture_id)
+        height, width, channels = image.shape
+        size = self.tile_size
+
+        tiles = []
+        new_tiles = reused = written = 0
+        for top in range(0, height, size):
+            row = []
+            for left in range(0, width, size):
+                tile_hash, tile_bytes = self._write_tile(image[top:top + size, left:left + size])
+                row.append(tile_hash)
+                if tile_bytes:
+                    new_tiles += 1
+                    written += tile_bytes
+                else:
+                    reused += 1
+            tiles.append(row)
+
+        manifest = {
+            'id': capture_id,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'source': source,
+            'width': width,
+            'height': height,
+            'channels': channels,
+            'tile_size': size,
+            'tiles': tiles,
+        }
+        with open(self._manifest_path(capture_id), 'w') as f:
+            json.dump(manifest, f)
+        return capture_id, new_tiles, reused, written
+
+    def captures(self):
+        """Ids of all stored captures, oldest first"""
+        folder = os.path.join(self.root, "captures")
+        return sorted(os.path.splitext(name)[0] for name in os.listdir(folder) if name.endswith(".json"))
+
+    def open(self, capture_id):
+        """Open a capture for lazy reading"""
+        with open(self._manifest_path(capture_id), 'r') as f:
+            return ArchivedImage(self, json.load(f))
+
+    def stats(self):
+        """Sizes of the archive compared with storing every capture raw"""
+        logical = manifest_bytes = 0
+        references = 0
+        for capture_id in self.captures():
+            path = self._manifest_path(capture_id)
+            manifest_bytes += os.path.getsize(path)
+            with open(path, 'r') as f:
+                manifest = json.load(f)
+            logical += manifest['width'] * manifest['height'] * manifest['channels']
+            references += sum(len(row) for row in manifest['tiles'])
+
+        tile_bytes = unique_tiles = 0
+        for folder, _, names in os.walk(os.path.join(self.root, "tiles")):
+            for name in names:
+                if name.endswith(".bin"):
+                    unique_tiles += 1
+                    tile_bytes += os.path.getsize(os.path.join(folder, name))
+
+        stored = tile_bytes + manifest_bytes
+        return {
+            'captures': len(self.captures()),
+            'tile_references': references,
+            'unique_tiles': unique_tiles,
+            'raw_bytes': logical,
+            'stored_bytes': stored,
+            'ratio': logical / stored if stored else 0,
+        }
+
+def load_image(path):
+    from PIL import Image
+    with Image.open(path) as img:
+        if img.mode not in ("RGB", "RGBA", "L"):
+            img = img.convert("RGB")
+        return np.asarray(img)
+
+def print_stats(stats):
+    print(f"Captures: {stats['captures']}")
+    print(f"Tiles: {stats['unique_tiles']} unique of {stats['tile_references']} referenced")
+    print(f"Raw size: {stats['raw_bytes'] / 1024 / 1024:.2f}MB")
+    print(f"Stored size: {stats['stored_bytes'] / 1024 / 1024:.2f}MB")
+    print(f"Compression ratio: {stats['ratio']:.1f}x")
+
+def bench(paths, tile_size=TILE_SIZE):
+    """Write and read back screenshots in a temporary archive, printing throughput"""
+    images = find_images(paths)
+    if not images:
+        print("No images found")
+        sys.exit(1)
+    decoded = [load_image(path) for path in images]
+    png_bytes = sum(os.path.getsize(path) for path in images)
+    raw_bytes = sum(image.nbytes for image in decoded)
+
+    # A scratch archive, so benchmark captures never end up in a real one
+    with tempfile.TemporaryDirectory(prefix="map_archive_bench_") as root:
+        archive = TileArchive(root, tile_size=tile_size)
+        start_time = time.perf_counter()
+        ids = [archive.add(image, f"bench_{i:05d}", source=path)[0]
+               for i, (image, path) in enumerate(zip(decoded, images))]
+        write_time = time.perf_counter() - start_time
+
+        # Read through a fresh archive object so no tiles are cached yet
+        reader = TileArchive(root, tile_size=tile_size)
+        start_time = time.perf_counter()
+        for capture_id, image in zip(ids, decoded):
+            rebuilt = reader.open(capture_id).to_array()
+            if not np.array_equal(rebuilt.reshape(image.shape), image):
+                print(f"Mismatch reading back {capture_id}")
+        read_time = time.perf_counter() - start_time
+        stats = archive.stats()
+
+    print(f"Images: {len(images)}, PNG files {png_bytes / 1024 / 1024:.2f}MB, "
+          f"raw {raw_bytes / 1024 / 1024:.2f}MB")
+    print(f"Write: {write_time:.2f}s ({raw_bytes / 1024 / 1024 / write_time:.1f}MB/s raw)")
+    print(f"Read: {read_time:.2f}s ({raw_bytes / 1024 / 1024 / read_time:.1f}MB/s raw)")
+    print_stats(stats)
+    if stats['stored_bytes']:
+        print(f"Versus PNG files: {png_bytes / stats['stored_bytes']:.1f}x smaller")
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicated map screenshot archive")
+    parser.add_argument("--tile-size", type=int, default=TILE_SIZE, help="Tile edge for new captures")
+    archive_args = argparse.ArgumentParser(add_help=False)
+    archive_args.add_argument("root", help="Archive folder")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add_parser = sub.add_parser("add", parents=[archive_args], help="Add screenshots")
+    add_parser.add_argument("paths", nargs="+")
+    sub.add_parser("list", parents=[archive_args], help="List captures")
+    extract_parser = sub.add_parser("extract", parents=[archive_args], help="Rebuild a capture as an image file")
+    extract_parser.add_argument("capture_id")
+    extract_parser.add_argument("output")
+    sub.add_parser("stats", parents=[archive_args], help="Show compression statistics")
+    bench_parser = sub.add_parser("bench", help="Measure write/read throughput on screenshots "
+                                                "in a temporary archive")
+    bench_parser.add_argument("paths", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        bench(args.paths, args.tile_size)
+        return
+    archive = TileArchive(args.root, tile_size=args.tile_size)
+
+    if args.command == "add":
+        for path in find_images(args.paths):
+            name = os.path.splitext(os.path.basename(path))[0]
+            capture_id, new_tiles, reused, written = archive.add(load_image(path), name, source=path)
+            print(f"{capture_id}: {new_tiles} new tiles, {reused} reused, {written / 1024:.1f}KB written")
+    elif args.command == "list":
+        for capture_id in archive.captures():
+            print(capture_id)
+    elif args.command == "extract":
+        from PIL import Image
+        Image.fromarray(archive.open(args.capture_id).to_array().squeeze()).save(args.output)
+        print(f"Saved {args.capture_id} as {args.output}")
+    elif args.command == "stats":
+        print_stats(archive.stats())
+
+if __name__ == "__main__":
+    main()
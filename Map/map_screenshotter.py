@@ -1,89 +1,227 @@
-import ctypes
-from PIL import ImageGrab
+from PIL import Image
+import numpy as np
 import wx
+import argparse
 import os
+import queue
 import sys
+import threading
 import time
+from datetime import datetime
+
+# Modules shared by all the tools
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "common"))
+from hotkeys import HotkeyManager
+from capture import FileGrabber, open_capture, bgra_to_rgb
 
 # Define the area for the screenshot
 x1, y1 = 524, 84
 x2, y2 = 1390, 1010
 
-# Virtual key codes
-VK_C = 0x43
-VK_CONTROL = 0x11
+# PNG compression level (0-9), lower = faster saves but larger files
+PNG_COMPRESS_LEVEL = 1
+
+# Frame source, opened in main(); --source replays image files instead
+capture_source = None
+
+# wx application, created once and reused for every save dialog
+app = None
+
+class PNGWriter:
+    """Encode and save screenshots on a background thread"""
+    def __init__(self, compress_level=PNG_COMPRESS_LEVEL, archive=None):
+        self.compress_level = compress_level
+        # Optional TileArchive every screenshot is also stored in
+        self.archive = archive
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def save(self, frame, file_path):
+        """Queue a BGRA frame to be written as a PNG (None = archive only)"""
+        self.queue.put((frame, file_path))
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                break
+            frame, file_path = item
+            rgb = bgra_to_rgb(frame)
+            if file_path:
+                try:
+                    start_time = time.perf_counter()
+                    Image.fromarray(rgb).save(file_path, compress_level=self.compress_level)
+                    elapsed = time.perf_counter() - start_time
+                    print(f"Screenshot saved as {file_path} (encoded in {elapsed * 1000:.0f} ms)")
+                except Exception as e:
+                    print(f"An error occurred saving {file_path}: {e}")
+            if self.archive:
+                try:
+                    start_time = time.perf_counter()
+                    source = os.path.basename(file_path) if file_path else None
+                    capture_id, new_tiles, reused, written = self.archive.add(rgb, source=source)
+                    elapsed = time.perf_counter() - start_time
+                    print(f"Archived as {capture_id}: {new_tiles} new tiles, {reused} reused, "
+                          f"{written / 1024:.1f}KB in {elapsed * 1000:.0f} ms")
+                except Exception as e:
+                    print(f"An error occurred archiving screenshot: {e}")
+            self.queue.task_done()
+
+    def close(self):
+        """Finish writing queued screenshots"""
+        self.queue.put(None)
+        self.queue.join()
+
+writer = None
 
-# Get reference to user32.dll for keyboard input
-user32 = ctypes.windll.user32
+def capture():
+    """Grab the map area, returning (BGRA frame, seconds taken)"""
+    start_time = time.perf_counter()
+    while True:
+        frame = capture_source.latest()
+        # Copy, since a shared frame is reused once the ring wraps around
+        pixels = np.array(frame.region((x1, y1, x2, y2)))
+        if frame.valid():
+            return pixels, time.perf_counter() - start_time
 
 def take_screenshot():
+    global app
     print("Capturing screenshot...")
     try:
         # Take a screenshot of the specified area
-        screenshot = ImageGrab.grab(bbox=(x1, y1, x2, y2))
-        
-        # Initialize wx application
-        app = wx.App(None)
-        
+        screenshot, capture_time = capture()
+
+        # Initialize wx application once
+        if app is None:
+            app = wx.App(None)
+
         # Get the current directory to use as default
         default_dir = os.getcwd()
-        
-        print("Opening save dialog...")
+
+        print(f"Captured in {capture_time * 1000:.0f} ms. Opening save dialog...")
         # Create and show the file dialog
         with wx.FileDialog(
-            None, 
+            None,
             message="Save Screenshot As",
             defaultDir=default_dir,
             defaultFile="map.png",
             wildcard="PNG files (*.png)|*.png|All files (*.*)|*.*",
             style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT
         ) as file_dialog:
-            
+
             # If user clicked "OK"
             if file_dialog.ShowModal() == wx.ID_OK:
                 file_path = file_dialog.GetPath()
-                screenshot.save(file_path)
-                print(f"Screenshot saved as {file_path}")
+                writer.save(screenshot, file_path)
             else:
                 print("Screenshot save canceled")
-        
-        # Clean up the wx app
-        app.Destroy()
     except Exception as e:
         print(f"An error occurred: {e}")
 
+def run_burst(output_dir, interval, count, stop_event):
+    """Capture at a fixed interval without dialogs until count or stop_event"""
+    if not writer.archive:
+        os.makedirs(output_dir, exist_ok=True)
+    print(f"Burst mode: capturing every {interval:.2f}s to {writer.archive.root if writer.archive else output_dir}")
+
+    latencies = []
+    next_time = time.perf_counter()
+    taken = 0
+    while not stop_event.is_set() and (count <= 0 or taken < count):
+        start_time = time.perf_counter()
+        screenshot, capture_time = capture()
+        if writer.archive:
+            # Burst captures go only to the archive when one is used
+            file_path = None
+        else:
+            file_path = os.path.join(output_dir, f"map_{datetime.now():%Y%m%d_%H%M%S_%f}.png")
+        writer.save(screenshot, file_path)
+        # Ready for the next capture as soon as the frame is queued
+        latencies.append(time.perf_counter() - start_time)
+        taken += 1
+
+        next_time += interval
+        stop_event.wait(max(next_time - time.perf_counter(), 0))
+
+    if latencies:
+        print(f"Captured {taken} screenshots, capture-to-ready "
+              f"mean {sum(latencies) / len(latencies) * 1000:.1f} ms, "
+              f"max {max(latencies) * 1000:.1f} ms")
+
 def main():
-    print("Fortnite Map Screenshot Tool Ready!")
-    print("Press 'C' to capture screenshot of the Fortnite map")
-    print("Press Ctrl+C to exit the program")
-    print("Waiting...")
-    
-    # Keep track of key states to detect when key is first pressed
-    c_pressed = False
-    
-    try:
-        while True:
-            # Check if C key is pressed
-            c_key_state = user32.GetAsyncKeyState(VK_C)
-            
-            # The high bit (0x8000) is set if the key is currently pressed
-            if c_key_state & 0x8000 and not c_pressed:
-                c_pressed = True
-                take_screenshot()
-            elif not (c_key_state & 0x8000):
-                c_pressed = False
-                
-            # Check if Ctrl+C is pressed
-            if user32.GetAsyncKeyState(VK_CONTROL) & 0x8000 and user32.GetAsyncKeyState(ord('C')) & 0x8000:
-                print("\nCtrl+C detected - Exiting program...")
-                sys.exit(0)
-                
-            # Small delay to prevent high CPU usage
-            time.sleep(0.1)
-                
-    except KeyboardInterrupt:
-        print("\nExiting program...")
-        sys.exit(0)
+    global capture_source, writer
+
+    parser = argparse.ArgumentParser(description="Fortnite map screenshot tool")
+    parser.add_argument("--burst", type=float, metavar="SECONDS",
+                        help="Capture every SECONDS without dialogs (timelapse)")
+    parser.add_argument("--count", type=int, default=0, help="Number of burst captures (0 = until Ctrl+C)")
+    parser.add_argument("--output-dir", default="screenshots", help="Folder for burst captures")
+    parser.add_argument("--compress-level", type=int, default=PNG_COMPRESS_LEVEL, choices=range(10),
+                        help="PNG compression level (0-9)")
+    parser.add_argument("--source", help="Replay map screenshots (an image file or folder, cut to the "
+                                         f"{x2 - x1}x{y2 - y1} map area like this tool saves them) "
+                                         "instead of capturing the screen")
+    parser.add_argument("--full-screen", action="store_true",
+                        help="--source images are full screenshots; cut the map area out of them")
+    parser.add_argument("--archive", help="Also store captures in this deduplicated tile archive")
+    args = parser.parse_args()
+
+    if args.source:
+        capture_source = open_capture((x1, y1, x2, y2), shared_name=None, start_service=False,
+                                      grabber=FileGrabber(args.source,
+                                                          origin=(0, 0) if args.full_screen else (x1, y1)))
+    else:
+        # Read shared frames if capture.py is publishing them, else grab on demand
+        capture_source = open_capture((x1, y1, x2, y2), start_service=False)
+    archive = None
+    if args.archive:
+        from map_archive import TileArchive
+        archive = TileArchive(args.archive)
+    writer = PNGWriter(args.compress_level, archive)
+
+    hotkeys = HotkeyManager()
+    stop_event = threading.Event()
+
+    def exit_program():
+        print("\nCtrl+C detected - Exiting program...")
+        stop_event.set()
+        hotkeys.stop()
+
+    hotkeys.add_hotkey('ctrl+c', exit_program)
+
+    if args.burst:
+        print("Press Ctrl+C to stop")
+        hotkeys.start()
+        try:
+            run_burst(args.output_dir, args.burst, args.count, stop_event)
+        except KeyboardInterrupt:
+            print("\nExiting program...")
+        hotkeys.stop()
+    else:
+        print("Fortnite Map Screenshot Tool Ready!")
+        print("Press 'C' to capture screenshot of the Fortnite map")
+        print("Press Ctrl+C to exit the program")
+        print("Waiting...")
+
+        hotkeys.add_hotkey('c', take_screenshot)
+
+        try:
+            # Screenshots run on this thread, so the save dialog stays on the main thread
+            hotkeys.run()
+        except KeyboardInterrupt:
+            print("\nExiting program...")
+
+    # Let queued screenshots finish saving
+    writer.close()
+    capture_source.stop()
+    if archive:
+        stats = archive.stats()
+        print(f"Archive: {stats['captures']} captures, {stats['unique_tiles']} unique tiles, "
+              f"{stats['ratio']:.1f}x smaller than raw")
+    print(hotkeys.latency_report())
+    sys.exit(0)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,85 @@
+# ocr_benchmark.py
+"""
+Compare the original OCR pipeline with the tuned preprocessing settings on
+saved map screenshots (e.g. the PNGs written by map_screenshotter.py).
+
+Usage:
+    python ocr_benchmark.py <folder or image> [more folders/images...]
+"""
+import argparse
+import os
+import sys
+import cv2
+from poi_ocr import OCR_SETTINGS, RAW_OCR_SETTINGS, get_reader, timed_extract
+from poi_file import find_images
+
+def load_rgb(path):
+    img = cv2.imread(path)
+    if img is None:
+        return None
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR preprocessing on map screenshots")
+    parser.add_argument("paths", nargs="+", help="Screenshot files or folders")
+    parser.add_argument("--preprocess", choices=["none", "gray", "threshold"], help="Override preprocess mode")
+    parser.add_argument("--threshold", type=int, help="Override threshold value")
+    parser.add_argument("--scale", type=float, help="Override downscale factor")
+    parser.add_argument("--batch-size", type=int, help="Override recognizer batch size")
+    parser.add_argument("--no-allowlist", action="store_true", help="Disable the uppercase allowlist")
+    args = parser.parse_args()
+
+    tuned = dict(OCR_SETTINGS)
+    if args.preprocess:
+        tuned['preprocess'] = args.preprocess
+    if args.threshold is not None:
+        tuned['threshold'] = args.threshold
+    if args.scale is not None:
+        tuned['scale'] = args.scale
+    if args.batch_size is not None:
+        tuned['batch_size'] = args.batch_size
+    if args.no_allowlist:
+        tuned['allowlist'] = None
+
+    images = find_images(args.paths)
+    if not images:
+        print("No images found")
+        sys.exit(1)
+
+    # Load the model up front so it is not counted against the first image
+    get_reader()
+
+    print(f"Tuned settings: {tuned}")
+    print(f"{'Image':<32} {'Base s':>8} {'Tuned s':>8} {'Base':>5} {'Tuned':>6} {'Recall':>7}")
+
+    total_base = total_tuned = 0.0
+    total_found = total_expected = 0
+    for path in images:
+        img = load_rgb(path)
+        if img is None:
+            print(f"Warning: could not read {path}")
+            continue
+
+        base_pois, base_time = timed_extract(img, settings=RAW_OCR_SETTINGS)
+        tuned_pois, tuned_time = timed_extract(img, settings=tuned)
+
+        # Recall is measured against the names the original pipeline found
+        expected = {name for name, _, _ in base_pois if name}
+        found = expected & {name for name, _, _ in tuned_pois}
+        recall = len(found) / len(expected) if expected else 1.0
+
+        total_base += base_time
+        total_tuned += tuned_time
+        total_found += len(found)
+        total_expected += len(expected)
+
+        print(f"{os.path.basename(path)[:32]:<32} {base_time:>8.2f} {tuned_time:>8.2f} "
+              f"{len(base_pois):>5} {len(tuned_pois):>6} {recall:>7.1%}")
+
+    speedup = total_base / total_tuned if total_tuned else 0
+    overall_recall = total_found / total_expected if total_expected else 1.0
+    print(f"\nTotal: baseline {total_base:.2f}s, tuned {total_tuned:.2f}s "
+          f"({speedup:.2f}x), recall {overall_recall:.1%}")
+
+if __name__ == "__main__":
+    main()
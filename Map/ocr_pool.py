@@ -0,0 +1,137 @@
+# ocr_pool.py
+"""
+Parallel tiled OCR for CPU-only machines.
+
+The map is cut into overlapping tiles (see poi_ocr.split_tiles) and the
+tiles are recognized in a persistent process pool. Every worker loads and
+warms its own easyocr.Reader once, so later captures only pay for the
+recognition itself.
+
+Run directly for a scaling benchmark:
+    python ocr_pool.py map.png --workers 1 2 4 --tile-size 384
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+import poi_ocr
+from poi_ocr import OCR_SETTINGS, preprocess_image, split_tiles, merge_tile_pois
+
+def init_worker(torch_threads):
+    """Load and warm up the reader once per worker process"""
+    try:
+        import torch
+        # Several workers each using every core only fight over the CPU
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    reader = poi_ocr.get_reader()
+    reader.readtext(np.zeros((32, 96), dtype=np.uint8))
+
+def _ocr_tile(tile_img, settings):
+    return poi_ocr.ocr_tile_images([tile_img], settings)[0]
+
+def _ping():
+    return os.getpid()
+
+class ParallelOCR:
+    """OCR backend running tiles across a pool of worker processes"""
+    def __init__(self, workers=None, settings=None):
+        """
+        Args:
+            workers (int): Number of worker processes (None = CPU count)
+            settings (dict): OCR settings (defaults to OCR_SETTINGS)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.settings = settings or OCR_SETTINGS
+        torch_threads = max((os.cpu_count() or 1) // self.workers, 1)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=init_worker,
+            initargs=(torch_threads,)
+        )
+
+    def warm_up(self):
+        """Start every worker now instead of on the first capture"""
+        futures = [self.executor.submit(_ping) for _ in range(self.workers)]
+        return len({future.result() for future in futures})
+
+    def run_tiles(self, tile_images, settings=None):
+        """
+        OCR tile images in parallel.
+
+        Returns:
+            list: (pois in tile-local coordinates, seconds spent) per tile
+        """
+        settings = settings or self.settings
+        if not tile_images:
+            return []
+        return list(self.executor.map(_ocr_tile, tile_images, repeat(settings)))
+
+    def extract(self, img_np, offset=(0, 0)):
+        """
+        Find POI labels in an RGB map image.
+
+        Returns:
+            list: (name, x, y) tuples, same as poi_ocr.extract_pois
+        """
+        img, scale = preprocess_image(img_np, self.settings)
+        tiles = split_tiles(img.shape[1], img.shape[0],
+                            self.settings.get('tile_size'), self.settings.get('tile_overlap', 0))
+        tile_pois = [pois for pois, _ in self.run_tiles([img[t.y0:t.y1, t.x0:t.x1] for t in tiles])]
+        return merge_tile_pois(tiles, tile_pois, scale, offset)
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+def main():
+    import cv2
+
+    parser = argparse.ArgumentParser(description="Benchmark tiled OCR across worker counts")
+    parser.add_argument("image", help="Saved map screenshot")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to try")
+    parser.add_argument("--tile-size", type=int, default=OCR_SETTINGS['tile_size'], help="Tile edge in pixels")
+    parser.add_argument("--overlap", type=int, default=OCR_SETTINGS['tile_overlap'], help="Tile overlap in pixels")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per worker count")
+    args = parser.parse_args()
+
+    img = cv2.imread(args.image)
+    if img is None:
+        print(f"Could not read {args.image}")
+        return
+    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+    settings = dict(OCR_SETTINGS, tile_size=args.tile_size, tile_overlap=args.overlap)
+
+    # Single process, single pass reference
+    poi_ocr.get_reader()
+    start_time = time.perf_counter()
+    reference = poi_ocr.extract_pois(img, settings=dict(settings, tile_size=None))
+    single_time = time.perf_counter() - start_time
+    reference_names = {name for name, _, _ in reference}
+    print(f"Single pass: {single_time:.2f}s, {len(reference)} POIs")
+
+    print(f"{'Workers':>7} {'Startup s':>10} {'Capture s':>10} {'Speedup':>8} {'POIs':>5} {'Recall':>7}")
+    for workers in args.workers:
+        start_time = time.perf_counter()
+        pool = ParallelOCR(workers, settings)
+        pool.warm_up()
+        startup = time.perf_counter() - start_time
+
+        times = []
+        for _ in range(args.runs):
+            start_time = time.perf_counter()
+            pois = pool.extract(img)
+            times.append(time.perf_counter() - start_time)
+        pool.close()
+
+        best = min(times)
+        names = {name for name, _, _ in pois}
+        recall = len(names & reference_names) / len(reference_names) if reference_names else 1.0
+        print(f"{workers:>7} {startup:>10.2f} {best:>10.2f} {single_time / best:>7.2f}x "
+              f"{len(pois):>5} {recall:>7.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,580 @@
+# poi_editor.py
+"""
+The POI setter's editor window, capture and OCR. Started by poi_setter.py,
+which OCR worker processes re-import, so none of this loads in them.
+"""
+import wx
+import time
+import sys
+import os
+from poi_ocr import OCR_SETTINGS, initialize_ocr, clean_poi_name, TiledOCR
+from poi_file import write_pois, read_pois
+from poi_index import merge_pois
+from poi_model import POIListModel, COLUMNS
+from gazetteer import load_gazetteer, format_report
+
+# Modules shared by all the tools
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "common"))
+from hotkeys import HotkeyManager
+from capture import open_capture, bgra_to_rgb
+
+# Define the area for the screenshot
+x1, y1 = 524, 84
+x2, y2 = 1390, 1010
+
+is_editing = False
+
+# Per-tile OCR cache shared by all captures
+tiled_ocr = TiledOCR()
+
+# Frame source, opened on the first capture
+capture = None
+
+# Known POI names OCR results are snapped to, loaded in main()
+# (None without a poi_names.txt)
+gazetteer = None
+
+def process_screenshot():
+    global capture
+    
+    if capture is None:
+        # Read shared frames if capture.py is publishing them, else grab on demand
+        capture = open_capture((x1, y1, x2, y2), start_service=False)
+    
+    print("Capturing screenshot...")
+    # Take a screenshot of the specified area
+    frame = capture.latest()
+    
+    # Convert to an RGB numpy array for EasyOCR, retrying if a shared
+    # frame was overwritten while it was copied
+    img_np = bgra_to_rgb(frame.region((x1, y1, x2, y2)))
+    while not frame.valid():
+        frame = capture.latest()
+        img_np = bgra_to_rgb(frame.region((x1, y1, x2, y2)))
+    
+    print("Running OCR on screenshot...")
+    # Only re-OCR tiles that changed since the last capture,
+    # positions relative to the original screen
+    pois = tiled_ocr.extract(img_np, offset=(x1, y1))
+    
+    print(tiled_ocr.last_report)
+
+    # Correct OCR mistakes against the known POI names
+    if gazetteer:
+        pois, report = gazetteer.snap_pois(pois)
+        print(format_report(report))
+    print(f"Found {len(pois)} potential POIs")
+    return pois
+
+# Edit POI dialog
+class EditPOIDialog(wx.Dialog):
+    def __init__(self, parent, poi_name, poi_x, poi_y):
+        global is_editing
+        is_editing = True  # Set editing flag when dialog opens
+        
+        wx.Dialog.__init__(self, parent, title="Edit POI", size=(300, 200))
+        
+        # Create a panel and sizer
+        panel = wx.Panel(self)
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        
+        # Create form fields
+        name_label = wx.StaticText(panel, label="POI Name:")
+        self.name_ctrl = wx.TextCtrl(panel, value=poi_name)
+        
+        x_label = wx.StaticText(panel, label="X Position:")
+        self.x_ctrl = wx.TextCtrl(panel, value=str(poi_x))
+        
+        y_label = wx.StaticText(panel, label="Y Position:")
+        self.y_ctrl = wx.TextCtrl(panel, value=str(poi_y))
+        
+        # Format checkbox
+        self.remove_symbols_check = wx.CheckBox(panel, label="Remove non-punctuation symbols")
+        self.remove_symbols_check.SetValue(True)
+        
+        # Create buttons
+        button_sizer = wx.StdDialogButtonSizer()
+        ok_button = wx.Button(panel, wx.ID_OK)
+        ok_button.SetDefault()
+        cancel_button = wx.Button(panel, wx.ID_CANCEL)
+        
+        button_sizer.AddButton(ok_button)
+        button_sizer.AddButton(cancel_button)
+        button_sizer.Realize()
+        
+        # Add everything to sizer
+        grid = wx.FlexGridSizer(3, 2, 10, 10)
+        grid.Add(name_label, 0, wx.ALIGN_RIGHT | wx.ALIGN_CENTER_VERTICAL)
+        grid.Add(self.name_ctrl, 1, wx.EXPAND)
+        grid.Add(x_label, 0, wx.ALIGN_RIGHT | wx.ALIGN_CENTER_VERTICAL)
+        grid.Add(self.x_ctrl, 1, wx.EXPAND)
+        grid.Add(y_label, 0, wx.ALIGN_RIGHT | wx.ALIGN_CENTER_VERTICAL)
+        grid.Add(self.y_ctrl, 1, wx.EXPAND)
+        
+        sizer.Add(grid, 0, wx.EXPAND | wx.ALL, 10)
+        sizer.Add(self.remove_symbols_check, 0, wx.ALL, 10)
+        sizer.Add(button_sizer, 0, wx.ALIGN_CENTER | wx.ALL, 10)
+        
+        panel.SetSizer(sizer)
+        
+        # Bind the close event to reset editing flag
+        self.Bind(wx.EVT_CLOSE, self.OnClose)
+        
+    def OnClose(self, event):
+        global is_editing
+        is_editing = False  # Reset editing flag when dialog closes
+        event.Skip()  # Continue with default close behavior
+        
+    def GetValues(self):
+        global is_editing
+        is_editing = False  # Reset editing flag when we get values
+        
+        name = self.name_ctrl.GetValue()
+        
+        # Apply formatting if checked
+        if self.remove_symbols_check.GetValue():
+            name = clean_poi_name(name)
+            
+        try:
+            x = int(self.x_ctrl.GetValue())
+            y = int(self.y_ctrl.GetValue())
+            return name, x, y
+        except ValueError:
+            return None
+
+# Custom drag-and-drop list control, virtual and backed by a POIListModel
+class DraggableListCtrl(wx.ListCtrl):
+    def __init__(self, parent, model, ID=wx.ID_ANY, pos=wx.DefaultPosition,
+                 size=wx.DefaultSize, style=0):
+        wx.ListCtrl.__init__(self, parent, ID, pos, size, style | wx.LC_VIRTUAL)
+        
+        # Rows are read from the model on demand
+        self.model = model
+        
+        # Bind editing events
+        self.Bind(wx.EVT_LIST_BEGIN_LABEL_EDIT, self.OnBeginEdit)
+        self.Bind(wx.EVT_LIST_END_LABEL_EDIT, self.OnEndEdit)
+        
+        # Bind key events
+        self.Bind(wx.EVT_KEY_DOWN, self.OnKeyDown)
+        
+        # Bind drag and drop events
+        self.Bind(wx.EVT_LIST_BEGIN_DRAG, self.OnBeginDrag)
+        
+        # Bind double click events
+        self.Bind(wx.EVT_LIST_ITEM_ACTIVATED, self.OnItemActivated)
+        
+        # Bind right click events
+        self.Bind(wx.EVT_LIST_ITEM_RIGHT_CLICK, self.OnRightClick)
+        
+        # For drag and drop
+        self.drag_item = None
+        self.drop_target = None
+        
+        # Parent reference for editing
+        self.parent_frame = parent
+        
+    def OnGetItemText(self, item, col):
+        # Called by wx for each visible cell of the virtual list
+        return self.model.cell_text(item, col)
+        
+    def RefreshFromModel(self):
+        """Resize the list to the model and redraw the visible rows"""
+        self.SetItemCount(len(self.model))
+        self.Refresh()
+        
+    def SelectRow(self, index):
+        """Select a single row, clearing any previous selection"""
+        selected = self.GetFirstSelected()
+        while selected != -1:
+            self.Select(selected, False)
+            selected = self.GetNextSelected(selected)
+        if 0 <= index < len(self.model):
+            self.Select(index)
+            self.Focus(index)
+            
+    def DeleteSelectedPOI(self):
+        selected = self.GetFirstSelected()
+        if selected >= 0:
+            self.model.delete(selected)
+            self.RefreshFromModel()
+            self.SelectRow(min(selected, len(self.model) - 1))
+        
+    def OnBeginEdit(self, event):
+        # Set editing flag when inline editing begins
+        global is_editing
+        is_editing = True
+        event.Skip()
+        
+    def OnEndEdit(self, event):
+        # Reset editing flag when inline editing ends
+        global is_editing
+        is_editing = False
+        # Virtual lists don't store labels, so write the new name to the model
+        if not event.IsEditCancelled():
+            self.model.update(event.GetIndex(), name=event.GetLabel())
+            self.RefreshItem(event.GetIndex())
+        event.Skip()
+        
+    def OnKeyDown(self, event):
+        key_code = event.GetKeyCode()
+        
+        # Check if DEL key is pressed
+        if key_code == wx.WXK_DELETE:
+            self.DeleteSelectedPOI()
+        # Check if E key is pressed
+        elif key_code == 69:  # ASCII for 'E'
+            selected = self.GetFirstSelected()
+            if selected >= 0:
+                self.EditSelectedPOI()
+        # Pass other keys
+        else:
+            event.Skip()
+    
+    def OnItemActivated(self, event):
+        # Double-click handler - edit the POI
+        self.EditSelectedPOI()
+        
+    def OnRightClick(self, event):
+        # Show context menu on right click
+        if not hasattr(self, "popupID1"):
+            self.popupID1 = wx.NewId()
+            self.popupID2 = wx.NewId()
+            self.popupID3 = wx.NewId()
+            
+            self.Bind(wx.EVT_MENU, self.OnPopupEdit, id=self.popupID1)
+            self.Bind(wx.EVT_MENU, self.OnPopupDelete, id=self.popupID2)
+            self.Bind(wx.EVT_MENU, self.OnPopupMoveUp, id=self.popupID3)
+        
+        # Only show popup if we have an item selected
+        if self.GetFirstSelected() != -1:
+            # Create the popup menu
+            menu = wx.Menu()
+            menu.Append(self.popupID1, "Edit POI")
+            menu.Append(self.popupID2, "Delete POI")
+            menu.Append(self.popupID3, "Move Up")
+            
+            # Show the popup menu
+            self.PopupMenu(menu)
+            menu.Destroy()
+    
+    def OnPopupEdit(self, event):
+        self.EditSelectedPOI()
+        
+    def OnPopupDelete(self, event):
+        self.DeleteSelectedPOI()
+            
+    def OnPopupMoveUp(self, event):
+        selected = self.GetFirstSelected()
+        if selected > 0:
+            # Swap with the row above and redraw just those two rows
+            new_index = self.model.move(selected, selected - 1)
+            self.RefreshItems(new_index, selected)
+            
+            # Select the moved item
+            self.SelectRow(new_index)
+            
+    def EditSelectedPOI(self):
+        selected = self.GetFirstSelected()
+        if selected >= 0:
+            # Get current values
+            name, x_pos, y_pos = self.model.get(selected)
+            
+            # Show edit dialog
+            dlg = EditPOIDialog(self.parent_frame, name, x_pos, y_pos)
+            if dlg.ShowModal() == wx.ID_OK:
+                result = dlg.GetValues()
+                if result:
+                    name, x, y = result
+                    # Update the item
+                    self.model.update(selected, name, x, y)
+                    self.RefreshItem(selected)
+            dlg.Destroy()
+            
+    def OnBeginDrag(self, event):
+        # Get the selected item for dragging
+        self.drag_item = event.GetIndex()
+        
+        # Start drag operation
+        if self.drag_item != -1:
+            # Create text data to transfer
+            text_data = wx.TextDataObject()
+            text_data.SetText(str(self.drag_item))
+            
+            # Start the drag operation
+            drag_source = wx.DropSource(self)
+            drag_source.SetData(text_data)
+            
+            # Track mouse pointer during drag
+            result = drag_source.DoDragDrop(wx.Drag_AllowMove)
+            
+            # Handle the result
+            if result == wx.DragMove:
+                # The item was moved (handled in the drop event)
+                pass
+
+class POIDropTarget(wx.TextDropTarget):
+    def __init__(self, list_ctrl):
+        wx.TextDropTarget.__init__(self)
+        self.list_ctrl = list_ctrl
+        
+    def OnDropText(self, x, y, data):
+        # Get source item index
+        source_index = int(data)
+        
+        # Get target item index (where we're dropping)
+        target_index, flags = self.list_ctrl.HitTest((x, y))
+        
+        # Don't do anything if dropped on itself
+        if target_index == source_index:
+            return True
+            
+        if target_index == -1:
+            # Dropped below the last item, move to the end
+            target_index = self.list_ctrl.GetItemCount() - 1
+        elif target_index > source_index:
+            # If we're moving an item down, it lands above the drop target
+            target_index -= 1
+            
+        # Move the record in the model and redraw the affected rows
+        new_index = self.list_ctrl.model.move(source_index, target_index)
+        self.list_ctrl.RefreshItems(min(source_index, new_index), max(source_index, new_index))
+        
+        # Select the moved item
+        self.list_ctrl.SelectRow(new_index)
+        
+        return True
+
+class POIEditorFrame(wx.Frame):
+    """Main application frame"""
+    def __init__(self):
+        super(POIEditorFrame, self).__init__(
+            None, title="POI Editor", size=(600, 500)
+        )
+        
+        # Create the panel
+        self.panel = wx.Panel(self)
+        
+        # Create main sizer
+        main_sizer = wx.BoxSizer(wx.VERTICAL)
+        
+        # Create instructions label
+        instructions = wx.StaticText(self.panel, 
+            label="Press F5 to capture, 'E' to edit, DEL to delete. Right-click for more options.")
+        
+        # POIs shown in the list
+        self.model = POIListModel()
+        
+        # Create list control for POIs
+        self.poi_list = DraggableListCtrl(
+            self.panel,
+            self.model,
+            style=wx.LC_REPORT | wx.BORDER_SUNKEN | wx.LC_EDIT_LABELS
+        )
+        
+        # Set up the drop target
+        drop_target = POIDropTarget(self.poi_list)
+        self.poi_list.SetDropTarget(drop_target)
+        
+        # Add columns
+        for col, (title, width) in enumerate(zip(COLUMNS, (250, 100, 100))):
+            self.poi_list.InsertColumn(col, title, width=width)
+        
+        # Button sizer
+        button_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        
+        # Add buttons
+        self.capture_btn = wx.Button(self.panel, label="Capture (F5)")
+        self.capture_btn.Bind(wx.EVT_BUTTON, self.on_capture)
+        
+        self.edit_btn = wx.Button(self.panel, label="Edit (E)")
+        self.edit_btn.Bind(wx.EVT_BUTTON, self.on_edit)
+        
+        self.save_btn = wx.Button(self.panel, label="Save")
+        self.save_btn.Bind(wx.EVT_BUTTON, self.on_save)
+        
+        self.load_btn = wx.Button(self.panel, label="Load")
+        self.load_btn.Bind(wx.EVT_BUTTON, self.on_load)
+        
+        self.add_btn = wx.Button(self.panel, label="Add POI")
+        self.add_btn.Bind(wx.EVT_BUTTON, self.on_add)
+        
+        self.delete_btn = wx.Button(self.panel, label="Delete POI")
+        self.delete_btn.Bind(wx.EVT_BUTTON, self.on_delete)
+        
+        # Add buttons to sizer
+        button_sizer.Add(self.capture_btn, 0, wx.ALL, 5)
+        button_sizer.Add(self.edit_btn, 0, wx.ALL, 5)
+        button_sizer.Add(self.save_btn, 0, wx.ALL, 5)
+        button_sizer.Add(self.load_btn, 0, wx.ALL, 5)
+        button_sizer.Add(self.add_btn, 0, wx.ALL, 5)
+        button_sizer.Add(self.delete_btn, 0, wx.ALL, 5)
+        
+        # Add everything to main sizer
+        # Merge mode keeps earlier POIs and adds new ones from each capture
+        self.merge_check = wx.CheckBox(self.panel, label="Merge captures into current POIs")
+        
+        main_sizer.Add(instructions, 0, wx.ALL, 5)
+        main_sizer.Add(self.merge_check, 0, wx.ALL, 5)
+        main_sizer.Add(self.poi_list, 1, wx.EXPAND | wx.ALL, 5)
+        main_sizer.Add(button_sizer, 0, wx.ALIGN_CENTER | wx.ALL, 5)
+        
+        # Set the sizer
+        self.panel.SetSizer(main_sizer)
+        
+        # Center the frame
+        self.Centre()
+        
+        # Initialize the list with sample data
+        self.pois = []
+    
+    def add_poi_to_list(self, name, x, y):
+        """Add a POI to the end of the list"""
+        index = self.model.append(name, x, y)
+        self.poi_list.RefreshFromModel()
+        self.poi_list.SelectRow(index)
+        self.poi_list.EnsureVisible(index)
+    
+    def update_list_from_pois(self):
+        """Update the list control from the POIs list"""
+        self.model.set_pois(self.pois)
+        self.poi_list.RefreshFromModel()
+    
+    def on_capture(self, event):
+        """Handle capture button click"""
+        global is_editing
+        if is_editing:
+            print("Cannot capture while editing - please finish editing first")
+            return
+            
+        pois = process_screenshot()
+        if self.merge_check.GetValue():
+            self.merge_into_list(pois)
+        else:
+            self.pois = pois
+            self.update_list_from_pois()
+    
+    def merge_into_list(self, pois):
+        """Merge POIs into the current list, dropping duplicates"""
+        start_time = time.perf_counter()
+        self.pois, added, duplicates = merge_pois(self.model.as_tuples(), pois)
+        elapsed = time.perf_counter() - start_time
+        print(f"Merged: {added} new POIs, {duplicates} duplicates dropped "
+              f"({len(self.pois)} total, {elapsed * 1000:.1f} ms)")
+        self.update_list_from_pois()
+    
+    def on_edit(self, event):
+        """Handle edit button click"""
+        self.poi_list.EditSelectedPOI()
+    
+    def on_save(self, event):
+        """Handle save button click"""
+        # Get all items, in list order
+        pois = self.model.as_tuples()
+        
+        # Open save dialog
+        with wx.FileDialog(
+            self, message="Save POI File",
+            defaultDir=os.getcwd(),
+            defaultFile="map_pois.txt",
+            wildcard="Text files (*.txt)|*.txt",
+            style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT
+        ) as file_dialog:
+            
+            if file_dialog.ShowModal() == wx.ID_CANCEL:
+                return
+            
+            # Save the file
+            path = file_dialog.GetPath()
+            try:
+                write_pois(path, pois)
+                wx.MessageBox(f"Saved {len(pois)} POIs to {path}", "Success")
+            except Exception as e:
+                wx.MessageBox(f"Error saving file: {e}", "Error", wx.ICON_ERROR)
+    
+    def on_load(self, event):
+        """Load one or more POI files, merging later files into the first"""
+        with wx.FileDialog(
+            self, message="Load POI Files",
+            defaultDir=os.getcwd(),
+            wildcard="Text files (*.txt)|*.txt",
+            style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST | wx.FD_MULTIPLE
+        ) as file_dialog:
+            
+            if file_dialog.ShowModal() == wx.ID_CANCEL:
+                return
+            
+            paths = file_dialog.GetPaths()
+        
+        for i, path in enumerate(paths):
+            try:
+                pois = read_pois(path)
+            except Exception as e:
+                wx.MessageBox(f"Error loading file: {e}", "Error", wx.ICON_ERROR)
+                return
+            if i == 0 and not self.merge_check.GetValue():
+                # Without merge mode the file replaces the current POIs as it is;
+                # a checked file is never deduplicated against itself
+                self.pois = pois
+                self.update_list_from_pois()
+            else:
+                self.merge_into_list(pois)
+    
+    def on_add(self, event):
+        """Add a new empty POI"""
+        self.add_poi_to_list("NEW POI", 0, 0)
+    
+    def on_delete(self, event):
+        """Delete selected POI"""
+        self.poi_list.DeleteSelectedPOI()
+
+def main():
+    global gazetteer
+    gazetteer = load_gazetteer()
+
+    app = wx.App()
+    frame = POIEditorFrame()
+    frame.Show()
+    
+    print("POI Setter Tool Ready!")
+    print("Press F5 or click 'Capture' to scan the screen for POIs")
+    print("Press 'E' or double-click a POI to edit it")
+    print("Press DEL key to delete selected POI")
+    
+    # Initialize OCR, either in this process or in a pool of workers
+    if OCR_SETTINGS['workers']:
+        from ocr_pool import ParallelOCR
+        print(f"Starting {OCR_SETTINGS['workers']} OCR workers (this may take a moment)...")
+        ocr_pool = ParallelOCR(OCR_SETTINGS['workers'])
+        ocr_pool.warm_up()
+        tiled_ocr.tile_runner = ocr_pool.run_tiles
+        print("OCR Ready!")
+    else:
+        initialize_ocr()
+    
+    # Global hotkeys, handled on a background thread
+    hotkeys = HotkeyManager()
+    
+    def on_f5():
+        # Only trigger capture if not editing
+        if not is_editing:
+            # Trigger capture via wx event
+            wx.CallAfter(frame.on_capture, None)
+        else:
+            print("Cannot capture while editing - please finish editing first")
+    
+    hotkeys.add_hotkey('f5', on_f5)
+    hotkeys.add_hotkey('e', lambda: wx.CallAfter(frame.on_edit, None))
+    hotkeys.start()
+    
+    # Start the main loop
+    app.MainLoop()
+    
+    hotkeys.stop()
+    print(hotkeys.latency_report())
+    
+    if OCR_SETTINGS['workers']:
+        ocr_pool.close()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,43 @@
+# poi_file.py
+"""Reading and writing the name,x,y POI file format (map_pois.txt)"""
+import os
+
+def find_images(paths):
+    """Expand folders into the PNG/JPG files they contain"""
+    images = []
+    for path in paths:
+        if os.path.isdir(path):
+            for filename in sorted(os.listdir(path)):
+                if filename.lower().endswith((".png", ".jpg", ".jpeg")):
+                    images.append(os.path.join(path, filename))
+        elif os.path.isfile(path):
+            images.append(path)
+    return images
+
+def write_pois(path, pois):
+    """Write (name, x, y) POIs to a map_pois.txt style file"""
+    with open(path, 'w') as f:
+        for name, x, y in pois:
+            f.write(f"{name},{x},{y}\n")
+
+def read_pois(path):
+    """
+    Read a map_pois.txt style file.
+
+    Names may themselves contain commas, so the coordinates are taken from
+    the end of each line. Blank or malformed lines are skipped.
+
+    Returns:
+        list: (name, x, y) tuples with integer coordinates
+    """
+    pois = []
+    with open(path, 'r') as f:
+        for line in f:
+            parts = line.strip().rsplit(',', 2)
+            if len(parts) != 3:
+                continue
+            try:
+                pois.append((parts[0], int(float(parts[1])), int(float(parts[2]))))
+            except ValueError:
+                continue
+    return pois
@@ -0,0 +1,183 @@
+# poi_index.py
+"""
+Spatial index for POIs and merging of POI sets from several captures.
+
+POIs are bucketed into a uniform grid, so finding the POIs near a point
+only looks at the few cells around it. Merging n new POIs into m existing
+ones is therefore roughly O(n + m) instead of O(n * m).
+"""
+import heapq
+import math
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+MERGE_SETTINGS = {
+    'radius': 40,            # POIs closer than this (pixels) may be duplicates
+    'min_similarity': 0.6,   # Name similarity (0-1) needed to count as the same POI
+}
+
+def names_match(a, b, min_similarity):
+    """True if two names are at least min_similarity alike"""
+    a = a.strip().upper()
+    b = b.strip().upper()
+    if a == b:
+        return True
+    matcher = SequenceMatcher(None, a, b)
+    # The quick ratios are cheap upper bounds, so most pairs stop here
+    return (matcher.real_quick_ratio() >= min_similarity
+            and matcher.quick_ratio() >= min_similarity
+            and matcher.ratio() >= min_similarity)
+
+class POIGrid:
+    """Uniform grid of (name, x, y) POIs"""
+    def __init__(self, cell_size, pois=None):
+        """
+        Args:
+            cell_size (float): Grid cell edge in pixels
+            pois: Optional (name, x, y) POIs to add
+        """
+        self.cell_size = max(float(cell_size), 1.0)
+        self.cells = defaultdict(list)
+        self.pois = []
+        self.bounds = None  # min_cx, min_cy, max_cx, max_cy of occupied cells
+        for name, x, y in pois or ():
+            self.add(name, x, y)
+
+    @classmethod
+    def from_pois(cls, pois, points_per_cell=2):
+        """Build a grid sized so each cell holds about points_per_cell POIs"""
+        pois = list(pois)
+        if not pois:
+            return cls(1)
+        xs = [x for _, x, _ in pois]
+        ys = [y for _, _, y in pois]
+        area = max(max(xs) - min(xs), 1) * max(max(ys) - min(ys), 1)
+        return cls(math.sqrt(area * points_per_cell / len(pois)), pois)
+
+    def __len__(self):
+        return len(self.pois)
+
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def add(self, name, x, y):
+        """Add a POI, returning its index"""
+        index = len(self.pois)
+        self.pois.append((name, x, y))
+        cell = self._cell(x, y)
+        self.cells[cell].append(index)
+        if self.bounds is None:
+            self.bounds = [cell[0], cell[1], cell[0], cell[1]]
+        else:
+            self.bounds = [min(self.bounds[0], cell[0]), min(self.bounds[1], cell[1]),
+                           max(self.bounds[2], cell[0]), max(self.bounds[3], cell[1])]
+        return index
+
+    def within(self, x, y, radius):
+        """
+        Find POIs within radius of (x, y).
+
+        Returns:
+            list: (distance squared, index) pairs, unsorted
+        """
+        radius_sq = radius * radius
+        min_cx, min_cy = self._cell(x - radius, y - radius)
+        max_cx, max_cy = self._cell(x + radius, y + radius)
+        found = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                for index in self.cells.get((cx, cy), ()):
+                    _, px, py = self.pois[index]
+                    dist_sq = (px - x) ** 2 + (py - y) ** 2
+                    if dist_sq <= radius_sq:
+                        found.append((dist_sq, index))
+        return found
+
+    def _ring(self, cx, cy, ring):
+        """Cells at Chebyshev distance ring from (cx, cy)"""
+        if ring == 0:
+            yield cx, cy
+            return
+        for dx in range(-ring, ring + 1):
+            yield cx + dx, cy - ring
+            yield cx + dx, cy + ring
+        for dy in range(-ring + 1, ring):
+            yield cx - ring, cy + dy
+            yield cx + ring, cy + dy
+
+    def k_nearest(self, x, y, k):
+        """
+        Find the k POIs closest to (x, y).
+
+        Cells are searched in growing rings around the query and the
+        search stops once no unvisited cell can hold anything closer.
+
+        Returns:
+            list: (distance, index) pairs, closest first
+        """
+        if not self.pois or k <= 0:
+            return []
+        cx, cy = self._cell(x, y)
+        min_cx, min_cy, max_cx, max_cy = self.bounds
+        # Beyond this ring every cell is empty
+        max_ring = max(cx - min_cx, max_cx - cx, cy - min_cy, max_cy - cy, 0)
+
+        best = []  # max-heap of (-distance squared, index)
+        ring = 0
+        while ring <= max_ring:
+            for cell in self._ring(cx, cy, ring):
+                for index in self.cells.get(cell, ()):
+                    _, px, py = self.pois[index]
+                    entry = (-((px - x) ** 2 + (py - y) ** 2), index)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif entry > best[0]:
+                        heapq.heapreplace(best, entry)
+            # Anything in the next ring is at least this far away
+            reach = ring * self.cell_size
+            if len(best) == k and -best[0][0] <= reach * reach:
+                break
+            ring += 1
+        return sorted((math.sqrt(-neg_dist_sq), index) for neg_dist_sq, index in best)
+
+    def nearest(self, x, y):
+        """(distance, index) of the POI closest to (x, y), or None if empty"""
+        found = self.k_nearest(x, y, 1)
+        return found[0] if found else None
+
+def find_duplicate(grid, name, x, y, radius, min_similarity):
+    """Index of the closest POI in grid that matches name, or None"""
+    best = None
+    for dist_sq, index in grid.within(x, y, radius):
+        if names_match(name, grid.pois[index][0], min_similarity):
+            if best is None or dist_sq < best[0]:
+                best = (dist_sq, index)
+    return best[1] if best else None
+
+def merge_pois(existing, new, radius=None, min_similarity=None):
+    """
+    Merge new POIs into an existing set.
+
+    A new POI is dropped if an existing one lies within radius and has a
+    similar name. Existing POIs are kept as they are, since they may have
+    been corrected by hand. New POIs are only compared with existing ones,
+    never with each other: two close, similarly named POIs in one file
+    (DOCK A and DOCK B) are both real.
+
+    Returns:
+        tuple: (merged POI list, number added, number of duplicates dropped)
+    """
+    radius = MERGE_SETTINGS['radius'] if radius is None else radius
+    if min_similarity is None:
+        min_similarity = MERGE_SETTINGS['min_similarity']
+
+    grid = POIGrid(radius, existing)
+    merged = list(grid.pois)
+    duplicates = 0
+    for name, x, y in new:
+        x, y = int(x), int(y)
+        if find_duplicate(grid, name, x, y, radius, min_similarity) is not None:
+            duplicates += 1
+            continue
+        merged.append((name, x, y))
+    return merged, len(merged) - len(grid.pois), duplicates
@@ -0,0 +1,67 @@
+# poi_model.py
+"""
+Plain Python model behind the POI list.
+
+The list control in the POI setter is virtual: it stores nothing itself
+and asks this model for the text of the rows it is drawing. Edits and
+reordering only touch the list of records here, so they stay cheap with
+thousands of POIs, and the model can be used without a display.
+"""
+
+COLUMNS = ("POI Name", "X Position", "Y Position")
+
+class POIListModel:
+    """Ordered list of [name, x, y] records"""
+    def __init__(self, pois=None):
+        self.records = []
+        if pois:
+            self.set_pois(pois)
+
+    def __len__(self):
+        return len(self.records)
+
+    def set_pois(self, pois):
+        """Replace all records with (name, x, y) POIs"""
+        self.records = [[name, x, y] for name, x, y in pois]
+
+    def get(self, row):
+        """Return the (name, x, y) tuple at a row"""
+        return tuple(self.records[row])
+
+    def cell_text(self, row, col):
+        """Text shown for a row and column"""
+        return str(self.records[row][col])
+
+    def append(self, name, x, y):
+        """Add a POI at the end, returning its row"""
+        self.records.append([name, x, y])
+        return len(self.records) - 1
+
+    def delete(self, row):
+        del self.records[row]
+
+    def update(self, row, name=None, x=None, y=None):
+        """Change some or all fields of a row"""
+        record = self.records[row]
+        if name is not None:
+            record[0] = name
+        if x is not None:
+            record[1] = x
+        if y is not None:
+            record[2] = y
+
+    def move(self, source, target):
+        """
+        Move a row so it ends up at index target.
+
+        Returns:
+            int: The row's new index
+        """
+        target = max(0, min(target, len(self.records) - 1))
+        if source != target:
+            self.records.insert(target, self.records.pop(source))
+        return target
+
+    def as_tuples(self):
+        """All POIs as (name, x, y) tuples, in list order"""
+        return [tuple(record) for record in self.records]
@@ -0,0 +1,307 @@
+# poi_ocr.py
+import re
+import time
+import hashlib
+from collections import OrderedDict, namedtuple
+import numpy as np
+
+# Characters the recognizer is allowed to output. Map labels are always
+# upper case, so restricting the charset both speeds up decoding and stops
+# EasyOCR from "finding" lower case words in terrain textures.
+UPPERCASE_ALLOWLIST = "ABCDEFGHIJKLMNOPQRSTUVWXYZ '.-"
+
+# Preprocessing applied before OCR. The defaults are tuned for the map
+# labels, which are white text with a dark outline.
+OCR_SETTINGS = {
+    'preprocess': 'gray',     # 'none', 'gray' or 'threshold'
+    'threshold': 200,         # Brightness cut-off used by 'threshold' mode
+    'scale': 1.0,             # Downscale factor applied before OCR (1.0 = off)
+    'allowlist': UPPERCASE_ALLOWLIST,
+    'batch_size': 4,          # Recognizer batch size
+    'min_confidence': 0.5,    # Minimum OCR confidence to keep a result
+    'tile_size': 384,         # Tile edge for incremental OCR (None = whole image)
+    'tile_overlap': 128,      # Must exceed the widest label so none is cut in every tile
+    'workers': 0,             # OCR worker processes (0 = run in this process)
+}
+
+# Settings matching the original pipeline (full color image, no allowlist)
+RAW_OCR_SETTINGS = {
+    'preprocess': 'none',
+    'threshold': 200,
+    'scale': 1.0,
+    'allowlist': None,
+    'batch_size': 1,
+    'min_confidence': 0.5,
+    'tile_size': None,
+    'tile_overlap': 0,
+    'workers': 0,
+}
+
+reader = None
+
+def initialize_ocr():
+    global reader
+    print("Initializing EasyOCR (this may take a moment)...")
+    import easyocr
+    reader = easyocr.Reader(['en'])
+    print("OCR Ready!")
+    return reader
+
+def get_reader():
+    """Return the shared EasyOCR reader, creating it on first use"""
+    if reader is None:
+        initialize_ocr()
+    return reader
+
+def clean_poi_name(text):
+    """
+    Cleans a POI name:
+    - Keeps only letters (no numbers), spaces and basic punctuation
+    - Removes numbers and other symbols
+    """
+    # Keep letters, spaces, and basic punctuation
+    return re.sub(r'[^A-Za-z_\s.,\'-]', '', text).strip()
+
+def preprocess_image(img_np, settings=None):
+    """
+    Prepare an RGB map image for OCR.
+
+    Returns:
+        tuple: (processed image, scale factor that was applied)
+    """
+    settings = settings or OCR_SETTINGS
+    mode = settings.get('preprocess', 'none')
+    scale = settings.get('scale', 1.0) or 1.0
+    if mode == 'none' and scale == 1.0:
+        return img_np, scale
+    import cv2
+
+    img = img_np
+    if mode in ('gray', 'threshold') and img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+    if mode == 'threshold':
+        # Labels are near-white; everything else becomes background
+        _, img = cv2.threshold(img, settings.get('threshold', 200), 255, cv2.THRESH_BINARY)
+    elif mode not in ('none', 'gray'):
+        raise ValueError(f"Unknown preprocess mode: {mode}")
+
+    if scale != 1.0:
+        img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    return img, scale
+
+def run_ocr(img, settings=None):
+    """Run the recognizer on an already preprocessed image"""
+    settings = settings or OCR_SETTINGS
+    kwargs = {'batch_size': settings.get('batch_size', 1)}
+    if settings.get('allowlist'):
+        kwargs['allowlist'] = settings['allowlist']
+    return get_reader().readtext(img, **kwargs)
+
+def results_to_pois(results, scale=1.0, offset=(0, 0), min_confidence=0.5):
+    """Convert raw EasyOCR results to (name, x, y) POIs"""
+    pois = []
+    for (bbox, text, prob) in results:
+        if prob > min_confidence:  # Filter by confidence
+            # Calculate center position, undoing any downscaling
+            center_x = int((bbox[0][0] + bbox[2][0]) / 2 / scale) + offset[0]
+            center_y = int((bbox[0][1] + bbox[2][1]) / 2 / scale) + offset[1]
+
+            # Clean up text and filter for all caps
+            clean_text = text.strip()
+
+            # Only include text that is already in all caps
+            if clean_text.isupper():
+                # Clean the POI name
+                clean_text = clean_poi_name(clean_text)
+
+                # Add to POIs list
+                pois.append((clean_text, center_x, center_y))
+    return pois
+
+def extract_pois(img_np, offset=(0, 0), settings=None):
+    """
+    Find POI labels in an RGB map image.
+
+    Args:
+        img_np: RGB image as a numpy array
+        offset: (x, y) added to every position, e.g. the capture origin
+        settings: OCR settings dict (defaults to OCR_SETTINGS)
+
+    Returns:
+        list: (name, x, y) tuples
+    """
+    settings = settings or OCR_SETTINGS
+    img, scale = preprocess_image(img_np, settings)
+    results = run_ocr(img, settings)
+    return results_to_pois(results, scale, offset, settings.get('min_confidence', 0.5))
+
+def timed_extract(img_np, offset=(0, 0), settings=None):
+    """Run extract_pois and return (pois, elapsed seconds)"""
+    start_time = time.perf_counter()
+    pois = extract_pois(img_np, offset, settings)
+    return pois, time.perf_counter() - start_time
+
+# A tile of the (preprocessed) image. Detections are only kept by the tile
+# whose core contains their center, which removes duplicates found in the
+# overlap between neighbouring tiles.
+Tile = namedtuple('Tile', 'x0 y0 x1 y1 core_x0 core_y0 core_x1 core_y1')
+
+def _tile_starts(length, tile_size, overlap):
+    """Start offsets of overlapping tiles covering [0, length)"""
+    if not tile_size or tile_size >= length:
+        return [0]
+    step = max(tile_size - overlap, 1)
+    # Spread the tiles evenly so the last one is not mostly overlap
+    count = -(-(length - tile_size) // step) + 1
+    return [round(i * (length - tile_size) / (count - 1)) for i in range(count)]
+
+def _core_bounds(starts, tile_size, length):
+    """Split each overlap at its midpoint so every pixel has exactly one owner"""
+    tile_size = min(tile_size or length, length)
+    bounds = [0]
+    for prev, start in zip(starts, starts[1:]):
+        bounds.append((start + prev + tile_size) // 2)
+    bounds.append(length)
+    return list(zip(bounds, bounds[1:]))
+
+def split_tiles(width, height, tile_size, overlap):
+    """Split an image of the given size into overlapping tiles"""
+    xs = _tile_starts(width, tile_size, overlap)
+    ys = _tile_starts(height, tile_size, overlap)
+    x_cores = _core_bounds(xs, tile_size, width)
+    y_cores = _core_bounds(ys, tile_size, height)
+    tile_w = min(tile_size or width, width)
+    tile_h = min(tile_size or height, height)
+
+    tiles = []
+    for y0, (cy0, cy1) in zip(ys, y_cores):
+        for x0, (cx0, cx1) in zip(xs, x_cores):
+            tiles.append(Tile(x0, y0, x0 + tile_w, y0 + tile_h, cx0, cy0, cx1, cy1))
+    return tiles
+
+def ocr_tile_images(tile_images, settings=None):
+    """
+    OCR a list of tile images one after another.
+
+    Returns:
+        list: (pois in tile-local coordinates, seconds spent) per tile
+    """
+    settings = settings or OCR_SETTINGS
+    output = []
+    for tile_img in tile_images:
+        start_time = time.perf_counter()
+        results = run_ocr(tile_img, settings)
+        pois = results_to_pois(results, min_confidence=settings.get('min_confidence', 0.5))
+        output.append((pois, time.perf_counter() - start_time))
+    return output
+
+def merge_tile_pois(tiles, tile_pois, scale=1.0, offset=(0, 0)):
+    """Combine per-tile POIs into absolute (name, x, y) positions"""
+    pois = []
+    for tile, local_pois in zip(tiles, tile_pois):
+        for name, local_x, local_y in local_pois:
+            x = local_x + tile.x0
+            y = local_y + tile.y0
+            # Skip labels owned by a neighbouring tile
+            if not (tile.core_x0 <= x < tile.core_x1 and tile.core_y0 <= y < tile.core_y1):
+                continue
+            pois.append((name, int(x / scale) + offset[0], int(y / scale) + offset[1]))
+    return pois
+
+class TiledOCR:
+    """
+    Incremental OCR for repeated captures of the same map.
+
+    The image is split into overlapping tiles keyed by a hash of their
+    content. OCR results are cached per tile, so only tiles that changed
+    since an earlier capture are sent to the recognizer again.
+    """
+    def __init__(self, settings=None, max_tiles=1024, tile_runner=None):
+        """
+        Args:
+            settings (dict): OCR settings (defaults to OCR_SETTINGS)
+            max_tiles (int): Maximum number of tiles kept in the cache
+            tile_runner: Callable (tile_images, settings) -> [(pois, seconds)],
+                         defaults to running OCR serially in this process
+        """
+        self.settings = settings or OCR_SETTINGS
+        self.max_tiles = max_tiles
+        self.tile_runner = tile_runner or ocr_tile_images
+        self.cache = OrderedDict()
+        self._settings_key = None
+        self.stats = {'hits': 0, 'misses': 0, 'ocr_time': 0.0, 'time_saved': 0.0}
+        self.last_report = ""
+
+    def _tile_key(self, tile_img):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(str(tile_img.shape).encode())
+        digest.update(np.ascontiguousarray(tile_img).tobytes())
+        return digest.hexdigest()
+
+    def clear(self):
+        """Forget all cached tiles"""
+        self.cache.clear()
+
+    def extract(self, img_np, offset=(0, 0)):
+        """
+        Find POI labels in an RGB map image, reusing cached tile results.
+
+        Returns:
+            list: (name, x, y) tuples
+        """
+        settings_key = repr(sorted(self.settings.items()))
+        if settings_key != self._settings_key:
+            # Results depend on the settings, so a change invalidates the cache
+            self.clear()
+            self._settings_key = settings_key
+
+        start_time = time.perf_counter()
+        img, scale = preprocess_image(img_np, self.settings)
+        tiles = split_tiles(img.shape[1], img.shape[0],
+                            self.settings.get('tile_size'), self.settings.get('tile_overlap', 0))
+        tile_images = [img[t.y0:t.y1, t.x0:t.x1] for t in tiles]
+        keys = [self._tile_key(tile_img) for tile_img in tile_images]
+
+        # Only tiles we have not seen before go to the recognizer, once per
+        # distinct content (e.g. tiles of plain water); the result is read
+        # back below for every tile with the same key
+        missing = {}
+        for i, key in enumerate(keys):
+            if key not in self.cache:
+                missing.setdefault(key, i)
+        hits = len(tiles) - len(missing)
+        time_saved = sum(self.cache[key][1] for key in keys if key in self.cache)
+        fresh = self.tile_runner([tile_images[i] for i in missing.values()], self.settings)
+        for key, entry in zip(missing, fresh):
+            self.cache[key] = entry
+
+        tile_pois = []
+        for key in keys:
+            self.cache.move_to_end(key)
+            tile_pois.append(self.cache[key][0])
+        pois = merge_tile_pois(tiles, tile_pois, scale, offset)
+
+        # Keep the cache bounded, dropping the least recently used tiles
+        while len(self.cache) > self.max_tiles:
+            self.cache.popitem(last=False)
+
+        ocr_time = sum(seconds for _, seconds in fresh)
+        self.stats['hits'] += hits
+        self.stats['misses'] += len(missing)
+        self.stats['ocr_time'] += ocr_time
+        self.stats['time_saved'] += time_saved
+
+        elapsed = time.perf_counter() - start_time
+        hit_rate = hits / len(tiles) * 100 if tiles else 0
+        self.last_report = (
+            f"Tile cache: {hits}/{len(tiles)} hits ({hit_rate:.0f}%), "
+            f"OCR'd {len(missing)} tiles in {ocr_time:.2f}s, "
+            f"saved ~{time_saved:.2f}s, total {elapsed:.2f}s"
+        )
+        return pois
+
+    def hit_rate(self):
+        """Overall tile cache hit rate since creation"""
+        total = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / total if total else 0.0
@@ -0,0 +1,115 @@
+# poi_query.py
+"""
+Spatial queries over saved POI files (map_pois.txt format).
+
+The file is parsed into a grid index once and kept in memory until the
+file's modification time changes, so repeated lookups (e.g. on every
+keypress during navigation) don't rescan the file.
+
+    from poi_query import nearest, k_nearest, within_radius
+    name, x, y, distance = nearest("map_pois.txt", 960, 540)
+
+Run directly for a benchmark on synthetic POI sets:
+    python poi_query.py --points 10000 50000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from poi_file import read_pois, write_pois
+from poi_index import POIGrid
+
+# path -> (mtime, size, POIGrid)
+_index_cache = {}
+
+def load_index(path):
+    """Return the grid index for a POI file, rebuilding it if the file changed"""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    cached = _index_cache.get(path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    index = POIGrid.from_pois(read_pois(path))
+    _index_cache[path] = (stat.st_mtime_ns, stat.st_size, index)
+    return index
+
+def clear_cache():
+    """Forget all loaded indexes"""
+    _index_cache.clear()
+
+def _with_distance(index, found):
+    return [index.pois[i] + (distance,) for distance, i in found]
+
+def nearest(path, x, y):
+    """Closest POI to (x, y) as (name, x, y, distance), or None"""
+    index = load_index(path)
+    found = index.nearest(x, y)
+    return _with_distance(index, [found])[0] if found else None
+
+def k_nearest(path, x, y, k):
+    """The k closest POIs to (x, y) as (name, x, y, distance), closest first"""
+    index = load_index(path)
+    return _with_distance(index, index.k_nearest(x, y, k))
+
+def within_radius(path, x, y, radius):
+    """All POIs within radius of (x, y) as (name, x, y, distance), closest first"""
+    index = load_index(path)
+    found = sorted((dist_sq ** 0.5, i) for dist_sq, i in index.within(x, y, radius))
+    return _with_distance(index, found)
+
+def _linear_nearest(pois, x, y):
+    return min(pois, key=lambda poi: (poi[1] - x) ** 2 + (poi[2] - y) ** 2)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark POI spatial queries on synthetic data")
+    parser.add_argument("--points", type=int, nargs="+", default=[10000, 50000], help="POI counts to test")
+    parser.add_argument("--queries", type=int, default=2000, help="Queries per test")
+    parser.add_argument("--k", type=int, default=5, help="k for k-nearest queries")
+    parser.add_argument("--radius", type=float, default=100, help="Radius for radius queries")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    width, height = 1920, 1080
+
+    print(f"{'POIs':>7} {'Load ms':>8} {'Cached ms':>10} {'Nearest us':>11} "
+          f"{'k-NN us':>8} {'Radius us':>10} {'Linear us':>10}")
+    for count in args.points:
+        pois = [(f"POI {i}", rng.randint(0, width), rng.randint(0, height)) for i in range(count)]
+        queries = [(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(args.queries)]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "map_pois.txt")
+            write_pois(path, pois)
+
+            clear_cache()
+            start_time = time.perf_counter()
+            load_index(path)
+            load_ms = (time.perf_counter() - start_time) * 1000
+
+            start_time = time.perf_counter()
+            load_index(path)
+            cached_ms = (time.perf_counter() - start_time) * 1000
+
+            def per_query_us(func):
+                start_time = time.perf_counter()
+                for x, y in queries:
+                    func(x, y)
+                return (time.perf_counter() - start_time) / len(queries) * 1e6
+
+            nearest_us = per_query_us(lambda x, y: nearest(path, x, y))
+            knn_us = per_query_us(lambda x, y: k_nearest(path, x, y, args.k))
+            radius_us = per_query_us(lambda x, y: within_radius(path, x, y, args.radius))
+            linear_us = per_query_us(lambda x, y: _linear_nearest(pois, x, y))
+
+            # Spot check against the linear scan
+            for x, y in queries[:50]:
+                expected = _linear_nearest(pois, x, y)
+                found = nearest(path, x, y)
+                assert abs(((expected[1] - x) ** 2 + (expected[2] - y) ** 2) ** 0.5 - found[3]) < 1e-6
+
+        print(f"{count:>7} {load_ms:>8.1f} {cached_ms:>10.3f} {nearest_us:>11.1f} "
+              f"{knn_us:>8.1f} {radius_us:>10.1f} {linear_us:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import sys
+import pytest
+
+import batch_extract
+from batch_extract import CACHE_FILE, DEFAULT_OFFSET, cache_key, file_hash, save_cache
+from poi_file import read_pois
+from poi_ocr import OCR_SETTINGS
+
+@pytest.fixture
+def cached_folder(tmp_path):
+    """A screenshot folder whose OCR results are all in the cache already"""
+    screenshots = tmp_path / "screenshots"
+    screenshots.mkdir()
+    image = screenshots / "map1.png"
+    image.write_bytes(b"not decoded, the cached result is used")
+    output = tmp_path / "pois"
+    output.mkdir()
+    save_cache(str(output / CACHE_FILE), cache_key(OCR_SETTINGS, DEFAULT_OFFSET),
+               {file_hash(str(image)): [["SLAPPY SHRES", 100, 200], ["NOWHERE", 5, 6]]})
+    gazetteer = tmp_path / "poi_names.txt"
+    gazetteer.write_text("Slappy Shores\nLonely Labs\n")
+    return screenshots, output, gazetteer
+
+def run(monkeypatch, *args):
+    monkeypatch.setattr(sys, 'argv', ["batch_extract.py", *map(str, args)])
+    batch_extract.main()
+
+def test_snaps_cached_results(monkeypatch, cached_folder):
+    screenshots, output, gazetteer = cached_folder
+    run(monkeypatch, screenshots, "--output", output, "--gazetteer", gazetteer)
+    assert read_pois(str(output / "map1_pois.txt")) == [("SLAPPY SHORES", 100, 200), ("NOWHERE", 5, 6)]
+
+def test_no_snap_keeps_ocr_names(monkeypatch, cached_folder):
+    screenshots, output, gazetteer = cached_folder
+    run(monkeypatch, screenshots, "--output", output, "--gazetteer", gazetteer, "--no-snap")
+    assert read_pois(str(output / "map1_pois.txt")) == [("SLAPPY SHRES", 100, 200), ("NOWHERE", 5, 6)]
+
+def test_missing_gazetteer_keeps_ocr_names(monkeypatch, cached_folder, tmp_path):
+    screenshots, output, _ = cached_folder
+    run(monkeypatch, screenshots, "--output", output, "--gazetteer", tmp_path / "missing.txt")
+    assert read_pois(str(output / "map1_pois.txt"))[0] == ("SLAPPY SHRES", 100, 200)
+
+def test_cache_key_ignores_speed_settings():
+    key = cache_key(OCR_SETTINGS, DEFAULT_OFFSET)
+    assert cache_key(dict(OCR_SETTINGS, workers=4, tile_size=256), DEFAULT_OFFSET) == key
+    assert cache_key(dict(OCR_SETTINGS, min_confidence=0.9), DEFAULT_OFFSET) != key
+    assert cache_key(OCR_SETTINGS, (0, 0)) != key
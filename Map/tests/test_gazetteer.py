@@ -0,0 +1,56 @@
+import random
+from gazetteer import Gazetteer, TrigramIndex, _distance, _pattern
+
+def levenshtein(a, b):
+    """Reference edit distance, one table cell at a time"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+def random_words(rng, count, alphabet="ABCDE "):
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12))) for _ in range(count)]
+
+def test_distance_matches_reference():
+    rng = random.Random(0)
+    words = random_words(rng, 200)
+    for a, b in zip(words, reversed(words)):
+        assert _distance(_pattern(a), b) == levenshtein(a, b), (a, b)
+
+def test_distance_on_long_words():
+    # Longer than a machine word, where Python's big integers take over
+    rng = random.Random(1)
+    a = "".join(rng.choice("AB") for _ in range(100))
+    b = "".join(rng.choice("AB") for _ in range(90))
+    assert _distance(_pattern(a), b) == levenshtein(a, b)
+
+def test_search_finds_every_word_within_distance():
+    rng = random.Random(2)
+    words = sorted(set(random_words(rng, 300, alphabet="ABC")))
+    index = TrigramIndex()
+    for word in words:
+        index.add(word)
+    for query in random_words(rng, 50, alphabet="ABC"):
+        for max_distance in (0, 1, 2):
+            expected = sorted((levenshtein(query, word), word) for word in words
+                              if levenshtein(query, word) <= max_distance)
+            assert sorted(index.search(query, max_distance)) == expected, (query, max_distance)
+
+def test_lookup_snaps_to_nearest_name():
+    gazetteer = Gazetteer(["Slappy Shores", "Lonely Labs"])
+    assert gazetteer.lookup("SLAPPY SHRES") == ("SLAPPY SHORES", 1)
+    assert gazetteer.lookup("NOWHERE") == (None, None)
+
+def test_equally_close_names_are_not_snapped():
+    gazetteer = Gazetteer(["DOCK A", "DOCK B", "FAR AWAY PLACE"])
+    assert gazetteer.lookup("DOCK C") == (None, None)
+    assert gazetteer.lookup("FAR AWAY PLACX") == ("FAR AWAY PLACE", 1)
+
+def test_case_only_differences_are_known():
+    gazetteer = Gazetteer(["Slappy Shores"])
+    pois, report = gazetteer.snap_pois([("SLAPPY  SHORES", 1, 2), ("slappy shore", 3, 4)])
+    assert pois == [("SLAPPY  SHORES", 1, 2), ("SLAPPY SHORES", 3, 4)]
+    assert (report['known'], report['corrected']) == (1, 1)
@@ -0,0 +1,42 @@
+import numpy as np
+from map_archive import TileArchive
+
+def random_image(height, width, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+def test_round_trip_with_edge_tiles(tmp_path):
+    # Neither side is a multiple of the tile size, so the last row and column are partial
+    image = random_image(70, 90)
+    archive = TileArchive(str(tmp_path), tile_size=32)
+    capture_id, new_tiles, reused, _ = archive.add(image, "map")
+    assert (new_tiles, reused) == (9, 0)
+
+    stored = TileArchive(str(tmp_path)).open(capture_id)
+    assert stored.shape == image.shape
+    assert np.array_equal(stored.to_array(), image)
+    assert stored.tile(2, 2).shape == (6, 26, 3)
+    # Regions spanning tile borders, inside the edge tiles and past the image
+    assert np.array_equal(stored.region(20, 10, 70, 50), image[10:50, 20:70])
+    assert np.array_equal(stored.region(65, 65, 90, 70), image[65:70, 65:90])
+    assert np.array_equal(stored.region(80, 60, 200, 200), image[60:, 80:])
+    assert stored.region(100, 0, 120, 10).size == 0
+
+def test_identical_tiles_are_stored_once(tmp_path):
+    archive = TileArchive(str(tmp_path), tile_size=32)
+    image = random_image(64, 64)
+    archive.add(image, "first")
+    changed = image.copy()
+    changed[40, 40] = 0
+    _, new_tiles, reused, _ = archive.add(changed, "second")
+    assert (new_tiles, reused) == (1, 3)
+    assert np.array_equal(archive.open("second").to_array(), changed)
+
+def test_taken_ids_are_not_overwritten(tmp_path):
+    archive = TileArchive(str(tmp_path), tile_size=32)
+    first = random_image(40, 40, seed=1)
+    second = random_image(40, 40, seed=2)
+    assert archive.add(first, "map")[0] == "map"
+    assert archive.add(second, "map")[0] == "map_2"
+    assert archive.captures() == ["map", "map_2"]
+    assert np.array_equal(archive.open("map").to_array(), first)
+    assert np.array_equal(archive.open("map_2").to_array(), second)
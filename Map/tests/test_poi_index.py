@@ -0,0 +1,60 @@
+import math
+import random
+import pytest
+from poi_index import POIGrid, merge_pois, names_match
+
+def random_pois(count, seed=0):
+    rng = random.Random(seed)
+    return [(f"POI {i}", rng.randint(0, 1000), rng.randint(0, 1000)) for i in range(count)]
+
+def test_names_match():
+    assert names_match("lonely labs", "LONELY LABS ", 0.6)
+    assert names_match("LONELY LABS", "LONELY LAB5", 0.6)
+    assert not names_match("LONELY LABS", "SALTY SPRINGS", 0.6)
+
+def test_within_matches_brute_force():
+    pois = random_pois(300)
+    grid = POIGrid(37, pois)
+    for x, y, radius in [(500, 500, 80), (0, 0, 150), (999, 10, 40), (-200, -200, 10)]:
+        found = sorted(grid.within(x, y, radius))
+        expected = sorted(((px - x) ** 2 + (py - y) ** 2, i) for i, (_, px, py) in enumerate(pois)
+                          if (px - x) ** 2 + (py - y) ** 2 <= radius * radius)
+        assert found == expected
+
+@pytest.mark.parametrize("k", [1, 5, 20])
+def test_k_nearest_matches_brute_force(k):
+    pois = random_pois(400, seed=k)
+    grid = POIGrid.from_pois(pois)
+    for x, y in [(500, 500), (0, 1000), (1500, -300), (123, 456)]:
+        found = grid.k_nearest(x, y, k)
+        distances = sorted(math.hypot(px - x, py - y) for _, px, py in pois)
+        assert [distance for distance, _ in found] == pytest.approx(distances[:k])
+        for distance, index in found:
+            _, px, py = pois[index]
+            assert distance == pytest.approx(math.hypot(px - x, py - y))
+
+def test_k_nearest_edge_cases():
+    assert POIGrid(10).k_nearest(0, 0, 3) == []
+    grid = POIGrid(10, [("A", 0, 0), ("B", 30, 40)])
+    assert grid.k_nearest(0, 0, 0) == []
+    assert grid.k_nearest(0, 0, 5) == [(0.0, 0), (50.0, 1)]
+    assert grid.nearest(29, 39) == (pytest.approx(math.sqrt(2)), 1)
+
+def test_merge_drops_new_duplicates_of_existing():
+    existing = [("LONELY LABS", 100, 100), ("SALTY SPRINGS", 500, 500)]
+    new = [("LONELY LAB5", 110, 105), ("SALTY SPRINGS", 700, 700), ("NEW PLACE", 300, 300)]
+    merged, added, duplicates = merge_pois(existing, new)
+    # Existing POIs are kept as they are, hand corrections included
+    assert merged == existing + [("SALTY SPRINGS", 700, 700), ("NEW PLACE", 300, 300)]
+    assert (added, duplicates) == (2, 1)
+
+def test_merge_never_collapses_new_pois_into_each_other():
+    merged, added, duplicates = merge_pois([], [("DOCK A", 100, 100), ("DOCK B", 120, 100)])
+    assert merged == [("DOCK A", 100, 100), ("DOCK B", 120, 100)]
+    assert (added, duplicates) == (2, 0)
+
+def test_merge_settings():
+    existing = [("LONELY LABS", 100, 100)]
+    assert merge_pois(existing, [("LONELY LABS", 150, 100)])[1] == 1
+    assert merge_pois(existing, [("LONELY LABS", 150, 100)], radius=60)[1] == 0
+    assert merge_pois(existing, [("LONELY LAB5", 100, 100)], min_similarity=1.0)[1] == 1
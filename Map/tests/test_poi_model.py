@@ -0,0 +1,51 @@
+from poi_model import COLUMNS, POIListModel
+
+POIS = [("SALTY SPRINGS", 300, 40), ("LONELY LABS", 120, 500), ("BRUTAL BOXCARS", 800, 220),
+        ("LAVISH LAIR", 50, 700)]
+
+def names(model):
+    return [model.get(row)[0] for row in range(len(model))]
+
+def test_cells_for_the_virtual_list():
+    model = POIListModel(POIS)
+    assert len(model) == len(POIS)
+    assert len(COLUMNS) == 3
+    assert [model.cell_text(1, col) for col in range(len(COLUMNS))] == ["LONELY LABS", "120", "500"]
+
+def test_set_pois_copies_the_records():
+    pois = [list(poi) for poi in POIS]
+    model = POIListModel(pois)
+    model.update(0, name="CHANGED")
+    assert pois[0][0] == "SALTY SPRINGS"
+    model.set_pois([])
+    assert len(model) == 0
+
+def test_append_returns_the_new_row():
+    model = POIListModel(POIS)
+    assert model.append("NEW POI", 0, 0) == len(POIS)
+    assert model.get(len(POIS)) == ("NEW POI", 0, 0)
+
+def test_delete_and_update():
+    model = POIListModel(POIS)
+    model.delete(1)
+    assert names(model) == ["SALTY SPRINGS", "BRUTAL BOXCARS", "LAVISH LAIR"]
+    model.update(1, x=1)
+    model.update(2, name="LAVISH LAIRS", y=9)
+    assert model.as_tuples() == [("SALTY SPRINGS", 300, 40), ("BRUTAL BOXCARS", 1, 220),
+                                 ("LAVISH LAIRS", 50, 9)]
+
+def test_move_only_shifts_rows_between_source_and_target():
+    model = POIListModel(POIS)
+    assert model.move(0, 2) == 2
+    assert names(model) == ["LONELY LABS", "BRUTAL BOXCARS", "SALTY SPRINGS", "LAVISH LAIR"]
+    # Rows outside the moved range, which the list doesn't redraw, are unchanged
+    assert model.get(3) == POIS[3]
+    assert model.move(2, 1) == 1
+    assert names(model) == ["LONELY LABS", "SALTY SPRINGS", "BRUTAL BOXCARS", "LAVISH LAIR"]
+
+def test_move_clamps_the_target():
+    model = POIListModel(POIS)
+    assert model.move(1, 10) == 3
+    assert names(model)[-1] == "LONELY LABS"
+    assert model.move(3, -5) == 0
+    assert names(model) == ["LONELY LABS", "SALTY SPRINGS", "BRUTAL BOXCARS", "LAVISH LAIR"]
@@ -0,0 +1,38 @@
+import numpy as np
+from poi_ocr import TiledOCR, split_tiles
+
+# No preprocessing or scaling, so the tiles are plain slices of the image
+SETTINGS = {'preprocess': 'none', 'scale': 1.0, 'tile_size': 64, 'tile_overlap': 16}
+
+class CountingRunner:
+    """Tile runner recording the tiles it is asked to OCR"""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, tile_images, settings):
+        self.calls.append(len(tile_images))
+        # One POI at the centre of every tile
+        return [([("TILE", img.shape[1] // 2, img.shape[0] // 2)], 0.1) for img in tile_images]
+
+def test_identical_tiles_are_recognized_once():
+    runner = CountingRunner()
+    ocr = TiledOCR(SETTINGS, tile_runner=runner)
+    img = np.zeros((128, 128, 3), dtype=np.uint8)
+    tiles = split_tiles(128, 128, 64, 16)
+
+    pois = ocr.extract(img)
+    assert runner.calls == [1]
+    # The one result is used by every tile, each keeping the POIs in its core
+    assert len(pois) == sum(1 for t in tiles if t.core_x0 <= t.x0 + 32 < t.core_x1
+                            and t.core_y0 <= t.y0 + 32 < t.core_y1)
+
+def test_changed_tiles_only_are_recognized_again():
+    runner = CountingRunner()
+    ocr = TiledOCR(SETTINGS, tile_runner=runner)
+    img = np.zeros((128, 128, 3), dtype=np.uint8)
+    ocr.extract(img)
+    img[:10, :10] = 255
+    ocr.extract(img)
+    assert runner.calls == [1, 1]
+    ocr.extract(img)
+    assert runner.calls == [1, 1, 0]
@@ -0,0 +1,606 @@
+# capture.py
+"""
+Screen capture shared by the FA11y tools.
+
+Every grabber returns BGRA uint8 numpy arrays (the layout mss produces),
+for a bbox given as (left, top, right, bottom) in screen pixels.
+
+MssGrabber keeps its mss instance alive between grabs, instead of setting
+one up per capture. FileGrabber and VideoGrabber serve frames from image
+or video files instead of the screen, so the tools can run on Linux or in
+tests.
+
+CaptureService owns one grabber and publishes timestamped frames into a
+fixed-size ring buffer. Consumers take zero-copy views of the regions they
+need:
+
+    source = open_capture()
+    frame = source.latest()
+    slot = frame.region((1514, 931, 1577, 975))
+
+To share one capture between the tools, run this module:
+
+    python capture.py --fps 20
+
+It publishes the whole screen (or --bbox) in shared memory under
+SHARED_NAME, and open_capture() in every tool reads those frames instead
+of grabbing the screen itself whenever they cover the region it needs.
+Without it, each tool captures privately.
+
+Set FA11Y_CAPTURE_SOURCE to an image, folder or video to replace the
+screen everywhere open_capture() is used.
+
+Shared frames are only trusted while they keep coming: when the publishing
+tool exits or stops capturing, SharedFrameReader notices that no frame
+arrived for STALE_FRAMES capture intervals and grabs directly instead.
+"""
+import argparse
+import os
+import threading
+import time
+import weakref
+import numpy as np
+
+# Name of the shared memory block published by the capture service
+SHARED_NAME = "fa11y_frames"
+
+STALE_FRAMES = 10  # Shared frames are stale after this many capture intervals without a new one
+STALE_SECONDS = 1.0  # ... and never sooner than this
+REOPEN_INTERVAL = 2.0  # Seconds between looks for a new publisher while grabbing directly
+FIRST_FRAME_TIMEOUT = 1.0  # Seconds open_capture() waits for a new publisher's first frame
+
+# Shared memory blocks created by this process
+_owned_names = set()
+
+class MssGrabber:
+    """Grab regions of the screen with a persistent mss instance"""
+    def __init__(self):
+        # mss instances can't be shared between threads, so keep one per thread
+        self._local = threading.local()
+
+    def _sct(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            from mss import mss
+            sct = self._local.sct = mss()
+        return sct
+
+    def screen_bbox(self):
+        """Bbox of the primary monitor"""
+        monitor = self._sct().monitors[1]
+        return (monitor['left'], monitor['top'],
+                monitor['left'] + monitor['width'], monitor['top'] + monitor['height'])
+
+    def grab(self, bbox):
+        """Grab a (left, top, right, bottom) region as a BGRA array"""
+        left, top, right, bottom = map(int, bbox)
+        shot = self._sct().grab({'left': left, 'top': top,
+                                 'width': right - left, 'height': bottom - top})
+        return np.asarray(shot)
+
+    def close(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is not None:
+            sct.close()
+            self._local.sct = None
+
+def _crop(frame, bbox):
+    """Copy a region of a full frame, padding with black outside it"""
+    left, top, right, bottom = map(int, bbox)
+    region = np.zeros((bottom - top, right - left, 4), dtype=np.uint8)
+    src_left, src_top = max(left, 0), max(top, 0)
+    src_right, src_bottom = min(right, frame.shape[1]), min(bottom, frame.shape[0])
+    if src_right > src_left and src_bottom > src_top:
+        region[src_top - top:src_bottom - top, src_left - left:src_right - left] = \
+            frame[src_top:src_bottom, src_left:src_right]
+    return region
+
+class FileGrabber:
+    """
+    Stand-in grabber that treats image files as screen contents.
+
+    Each grab() serves the next image in turn (looping by default), so a
+    folder of saved screenshots can be replayed through a tool. Images are
+    full screenshots unless origin says where on the screen they were cut
+    from, as for screenshots of just the map.
+    """
+    def __init__(self, paths, loop=True, origin=(0, 0)):
+        """
+        Args:
+            paths: An image file, a folder of images, or a list of either
+            loop (bool): Start over after the last image instead of repeating it
+            origin: Screen position (left, top) of the images' top-left pixel
+        """
+        if isinstance(paths, str):
+            paths = [paths]
+        self.paths = []
+        for path in paths:
+            if os.path.isdir(path):
+                self.paths.extend(
+                    os.path.join(path, name) for name in sorted(os.listdir(path))
+                    if name.lower().endswith((".png", ".jpg", ".jpeg", ".bmp"))
+                )
+            else:
+                self.paths.append(path)
+        if not self.paths:
+            raise ValueError("FileGrabber needs at least one image")
+        self.loop = loop
+        self.origin = tuple(origin)
+        self.position = 0
+        self._frames = {}
+
+    def _load(self, path):
+        frame = self._frames.get(path)
+        if frame is None:
+            import cv2
+            img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+            if img is None:
+                raise ValueError(f"Could not read image {path}")
+            if img.ndim == 2:
+                img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGRA)
+            elif img.shape[2] == 3:
+                img = cv2.cvtColor(img, cv2.COLOR_BGR2BGRA)
+            frame = self._frames[path] = img
+        return frame
+
+    def screen_bbox(self):
+        height, width = self._load(self.paths[self.position]).shape[:2]
+        left, top = self.origin
+        return (left, top, left + width, top + height)
+
+    def next_frame(self):
+        """Full image for the next grab"""
+        frame = self._load(self.paths[self.position])
+        if self.position + 1 < len(self.paths):
+            self.position += 1
+        elif self.loop:
+            self.position = 0
+        return frame
+
+    def grab(self, bbox):
+        """Crop a region of the next image, padding with black outside it"""
+        left, top, right, bottom = bbox
+        return _crop(self.next_frame(), (left - self.origin[0], top - self.origin[1],
+                                         right - self.origin[0], bottom - self.origin[1]))
+
+    def close(self):
+        self._frames.clear()
+
+class VideoGrabber:
+    """Stand-in grabber that plays a video file as screen contents"""
+    def __init__(self, path, loop=True):
+        import cv2
+        self.path = path
+        self.loop = loop
+        self.video = cv2.VideoCapture(path)
+        if not self.video.isOpened():
+            raise ValueError(f"Could not open video {path}")
+        self.last_frame = None
+
+    def screen_bbox(self):
+        import cv2
+        width = int(self.video.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(self.video.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        return (0, 0, width, height)
+
+    def next_frame(self):
+        import cv2
+        ok, img = self.video.read()
+        if not ok and self.loop:
+            self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, img = self.video.read()
+        if ok:
+            self.last_frame = cv2.cvtColor(img, cv2.COLOR_BGR2BGRA)
+        if self.last_frame is None:
+            raise ValueError(f"No frames in video {self.path}")
+        return self.last_frame
+
+    def grab(self, bbox):
+        return _crop(self.next_frame(), bbox)
+
+    def close(self):
+        self.video.release()
+
+def grabber_for_source(source=None):
+    """
+    Grabber for a stand-in source, or the screen.
+
+    Args:
+        source (str): Image file, folder or video (default FA11Y_CAPTURE_SOURCE,
+                      or the real screen if that isn't set either)
+    """
+    source = source or os.environ.get("FA11Y_CAPTURE_SOURCE")
+    if not source:
+        return MssGrabber()
+    if os.path.isfile(source) and source.lower().endswith((".mp4", ".avi", ".mkv", ".mov", ".webm")):
+        return VideoGrabber(source)
+    return FileGrabber(source)
+
+class Frame:
+    """A captured frame; pixels may be a view into a ring buffer slot"""
+    def __init__(self, seq, timestamp, pixels, left=0, top=0, ring=None, slot=None):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.pixels = pixels
+        self.left = left
+        self.top = top
+        self._ring = ring
+        self._slot = slot
+
+    def region(self, bbox):
+        """Zero-copy BGRA view of a (left, top, right, bottom) screen region"""
+        left, top, right, bottom = map(int, bbox)
+        return self.pixels[top - self.top:bottom - self.top, left - self.left:right - self.left]
+
+    def valid(self):
+        """
+        False if the ring buffer slot has been overwritten since this frame
+        was read. Check after copying data out of a view.
+        """
+        if self._ring is None:
+            return True
+        slot_seq = self._ring.slot_seq
+        # A closed ring no longer holds this frame
+        return slot_seq is not None and slot_seq[self._slot] == self.seq
+
+class FrameRing:
+    """
+    Fixed-size ring buffer of frames, in local or shared memory.
+
+    Writers bump a slot's sequence number after filling it; readers check
+    it again after copying (see Frame.valid) to detect overwritten slots.
+    """
+    HEADER = 9   # magic, write seq, height, width, channels, capacity, left, top, interval (us)
+    MAGIC = 0x46413132
+
+    def __init__(self, shape, capacity=4, origin=(0, 0), name=None, create=True, interval=0.0):
+        """
+        Args:
+            shape: (height, width, channels) of each frame
+            capacity (int): Number of frames kept
+            origin: Screen position (left, top) of the frames' top-left pixel
+            name (str): Shared memory name, or None for process-local memory
+            create (bool): Create the shared memory block instead of attaching
+            interval (float): Seconds between frames, so readers can tell a stopped writer
+        """
+        self.shm = None
+        self.owner = create
+        if name and not create:
+            self._attach(name)
+            return
+
+        height, width, channels = shape
+        size = self._size(shape, capacity)
+        if name:
+            from multiprocessing import shared_memory
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            _owned_names.add(name)
+            buf = self.shm.buf
+        else:
+            buf = bytearray(size)
+        self._map(buf, shape, capacity)
+        self.header[:] = (self.MAGIC, 0, height, width, channels, capacity, origin[0], origin[1],
+                          int(interval * 1e6))
+        self.slot_seq[:] = -1
+
+    @classmethod
+    def _size(cls, shape, capacity):
+        return (cls.HEADER + 2 * capacity) * 8 + capacity * int(np.prod(shape))
+
+    def _map(self, buf, shape, capacity):
+        self.shape = tuple(shape)
+        self.capacity = capacity
+        meta_end = (self.HEADER + 2 * capacity) * 8
+        # Every array is a view of one root array, which holds a buffer
+        # export: shared memory can't be unmapped under a live view
+        root = np.frombuffer(buf, dtype=np.uint8)
+        self._mapping = root.base
+        self.header = root[:self.HEADER * 8].view(np.int64)
+        self.slot_seq = root[self.HEADER * 8:(self.HEADER + capacity) * 8].view(np.int64)
+        self.slot_time = root[(self.HEADER + capacity) * 8:meta_end].view(np.float64)
+        self.frames = root[meta_end:self._size(shape, capacity)].reshape((capacity,) + self.shape)
+
+    def _attach(self, name):
+        from multiprocessing import shared_memory
+        self.shm = shared_memory.SharedMemory(name=name)
+        if name not in _owned_names:
+            try:
+                # Only the owning process may unlink the block when it exits
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(self.shm._name, "shared_memory")
+            except Exception:
+                pass
+        header = np.frombuffer(self.shm.buf, dtype=np.int64, count=self.HEADER).copy()
+        if header[0] != self.MAGIC:
+            raise ValueError(f"Shared memory {name} is not a frame ring")
+        self._map(self.shm.buf, (int(header[2]), int(header[3]), int(header[4])), int(header[5]))
+
+    @property
+    def origin(self):
+        return int(self.header[6]), int(self.header[7])
+
+    @property
+    def bbox(self):
+        """Screen region (left, top, right, bottom) the frames cover"""
+        left, top = self.origin
+        return (left, top, left + self.shape[1], top + self.shape[0])
+
+    @property
+    def interval(self):
+        return int(self.header[8]) / 1e6
+
+    def last_time(self):
+        """Timestamp of the most recent frame, or None before the first publish"""
+        seq = int(self.header[1])
+        if seq <= 0:
+            return None
+        return float(self.slot_time[seq % self.capacity])
+
+    def publish(self, pixels, timestamp=None):
+        """Copy a frame into the next slot, returning its sequence number"""
+        seq = int(self.header[1]) + 1
+        slot = seq % self.capacity
+        self.slot_seq[slot] = -1  # Mark as being written
+        self.frames[slot][...] = pixels
+        self.slot_time[slot] = time.time() if timestamp is None else timestamp
+        self.slot_seq[slot] = seq
+        self.header[1] = seq
+        return seq
+
+    def latest(self):
+        """Most recent complete frame, or None before the first publish"""
+        seq = int(self.header[1])
+        if seq <= 0:
+            return None
+        slot = seq % self.capacity
+        left, top = self.origin
+        return Frame(seq, float(self.slot_time[slot]), self.frames[slot], left, top, self, slot)
+
+    def close(self):
+        """
+        Stop using the ring. Frames already handed out stay readable: shared
+        memory is unmapped once the last of them is released.
+        """
+        self.header = self.slot_seq = self.slot_time = self.frames = None
+        if self.shm is not None:
+            if self.owner:
+                self.shm.unlink()
+                _owned_names.discard(self.shm.name)
+            weakref.finalize(self._mapping, self.shm.close)
+            self.shm = None
+        self._mapping = None
+
+class CaptureService:
+    """Owns one grabber and publishes frames of a region into a FrameRing"""
+    def __init__(self, grabber=None, bbox=None, interval=0.05, capacity=4, shared_name=None):
+        """
+        Args:
+            grabber: Grabber to capture with (default: screen or FA11Y_CAPTURE_SOURCE)
+            bbox: (left, top, right, bottom) region to capture (default: whole screen)
+            interval (float): Seconds between captures
+            capacity (int): Frames kept in the ring buffer
+            shared_name (str): Publish the ring in shared memory under this name
+        """
+        self.grabber = grabber or grabber_for_source()
+        self.bbox = tuple(map(int, bbox or self.grabber.screen_bbox()))
+        self.interval = interval
+        left, top, right, bottom = self.bbox
+        self.ring = FrameRing((bottom - top, right - left, 4), capacity,
+                              origin=(left, top), name=shared_name, create=True, interval=interval)
+        self.running = False
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.new_frame = threading.Condition()
+        self.grab_time = 0.0
+
+    def capture_once(self):
+        """Grab and publish one frame now"""
+        start_time = time.perf_counter()
+        timestamp = time.time()
+        seq = self.ring.publish(self.grabber.grab(self.bbox), timestamp)
+        self.grab_time = time.perf_counter() - start_time
+        with self.new_frame:
+            self.new_frame.notify_all()
+        return seq
+
+    def _run(self):
+        next_time = time.perf_counter()
+        while self.running:
+            try:
+                self.capture_once()
+            except Exception as e:
+                print(f"Capture error: {e}")
+            next_time += self.interval
+            delay = next_time - time.perf_counter()
+            if delay < 0:
+                # Running behind, don't try to catch up with a burst
+                next_time = time.perf_counter()
+                delay = 0
+            self.stop_event.wait(delay)
+
+    def start(self):
+        """Capture continuously on a background thread"""
+        self.running = True
+        self.stop_event.clear()
+        self.capture_once()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def latest(self):
+        return self.ring.latest()
+
+    def wait_frame(self, after_seq=0, timeout=None):
+        """Wait for a frame newer than after_seq"""
+        with self.new_frame:
+            self.new_frame.wait_for(lambda: int(self.ring.header[1]) > after_seq, timeout)
+        return self.latest()
+
+    def stop(self):
+        self.running = False
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+        self.ring.close()
+        self.grabber.close()
+
+class SharedFrameReader:
+    """
+    Reads frames published by a CaptureService in another process.
+
+    When the publisher stops, frames are grabbed directly with a
+    DirectCapture of the same region, and the shared memory is looked up
+    again every REOPEN_INTERVAL seconds in case a new publisher started.
+    """
+    def __init__(self, shared_name=SHARED_NAME, bbox=None, grabber=None):
+        """
+        Args:
+            shared_name (str): Shared memory name of the frame ring
+            bbox: Region needed, grabbed directly if the publisher stops (default: the ring's)
+            grabber: Grabber used when grabbing directly (default: screen or FA11Y_CAPTURE_SOURCE)
+        """
+        self.shared_name = shared_name
+        self.ring = FrameRing(None, name=shared_name, create=False)
+        self.attached = time.time()
+        self.bbox = tuple(map(int, bbox)) if bbox else self.ring.bbox
+        self.grabber = grabber
+        self.direct = None
+        self.next_reopen = 0.0
+
+    def stale(self, now=None):
+        """True if the publisher has not published for STALE_FRAMES intervals"""
+        now = time.time() if now is None else now
+        last = self.ring.last_time()
+        if last is None:
+            # Give a publisher that has only just started time for its first frame
+            last = self.attached
+        return now - last > max(STALE_FRAMES * self.ring.interval, STALE_SECONDS)
+
+    def _reopen(self):
+        """Attach to the shared memory again, True if a live publisher covers our region"""
+        try:
+            ring = FrameRing(None, name=self.shared_name, create=False)
+        except (FileNotFoundError, ValueError):
+            return False
+        old_ring, old_attached = self.ring, self.attached
+        self.ring, self.attached = ring, time.time()
+        if _contains(ring, self.bbox) and not self.stale():
+            old_ring.close()
+            return True
+        # Still the stopped publisher's block, or one that doesn't cover our region
+        self.ring, self.attached = old_ring, old_attached
+        ring.close()
+        return False
+
+    def _source(self):
+        """The ring while its publisher is alive, else the direct capture"""
+        now = time.time()
+        if self.direct is None:
+            if not self.stale(now) or self._reopen():
+                return self.ring
+            print(f"Shared frames {self.shared_name} stopped, capturing directly")
+            self.direct = DirectCapture(self.grabber, self.bbox)
+            self.next_reopen = now + REOPEN_INTERVAL
+        elif now >= self.next_reopen:
+            if self._reopen():
+                print(f"Reading shared frames {self.shared_name} again")
+                self.direct.stop()
+                self.direct = None
+                return self.ring
+            self.next_reopen = now + REOPEN_INTERVAL
+        return self.direct
+
+    def latest(self):
+        return self._source().latest()
+
+    def wait_frame(self, after_seq=0, timeout=None, poll=0.005):
+        """Wait for a frame newer than after_seq"""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self._source() is self.ring and int(self.ring.header[1]) <= after_seq:
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            time.sleep(poll)
+        return self.latest()
+
+    def stop(self):
+        if self.direct:
+            self.direct.stop()
+            self.direct = None
+        self.ring.close()
+
+class DirectCapture:
+    """Grabs a region on demand, for tools that only capture occasionally"""
+    def __init__(self, grabber=None, bbox=None):
+        self.grabber = grabber or grabber_for_source()
+        self.bbox = tuple(map(int, bbox or self.grabber.screen_bbox()))
+        self.seq = 0
+
+    def latest(self):
+        self.seq += 1
+        left, top = self.bbox[:2]
+        return Frame(self.seq, time.time(), self.grabber.grab(self.bbox), left, top)
+
+    def wait_frame(self, after_seq=0, timeout=None):
+        return self.latest()
+
+    def stop(self):
+        self.grabber.close()
+
+def open_capture(bbox=None, interval=0.05, shared_name=SHARED_NAME, start_service=True, grabber=None):
+    """
+    Get a frame source, reading shared frames where possible.
+
+    If a live publisher (see main) covers bbox under shared_name, its
+    frames are read from shared memory. Otherwise a private CaptureService
+    is started, or with start_service=False a DirectCapture grabs only
+    when asked.
+
+    All sources have latest(), wait_frame() and stop(). latest() always
+    returns a frame, with region(bbox) for zero-copy views: a shared
+    source is only used once its first frame is there.
+    """
+    if shared_name:
+        try:
+            reader = SharedFrameReader(shared_name, bbox, grabber)
+            if ((bbox is None or _contains(reader.ring, bbox)) and not reader.stale()
+                    and reader.wait_frame(0, FIRST_FRAME_TIMEOUT) is not None):
+                return reader
+            reader.stop()
+        except (FileNotFoundError, ValueError):
+            pass
+    if not start_service:
+        return DirectCapture(grabber, bbox)
+    return CaptureService(grabber, bbox, interval).start()
+
+def _contains(ring, bbox):
+    left, top, right, bottom = ring.bbox
+    return bbox[0] >= left and bbox[1] >= top and bbox[2] <= right and bbox[3] <= bottom
+
+def bgra_to_rgb(frame):
+    """Contiguous RGB copy of a BGRA frame"""
+    return np.ascontiguousarray(frame[:, :, 2::-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish screen frames for the FA11y tools to share")
+    parser.add_argument("--bbox", type=int, nargs=4, metavar=("LEFT", "TOP", "RIGHT", "BOTTOM"),
+                        help="Region to publish (default: the whole screen)")
+    parser.add_argument("--fps", type=float, default=20, help="Frames per second (default: %(default)s)")
+    parser.add_argument("--name", default=SHARED_NAME, help="Shared memory name (default: %(default)s)")
+    args = parser.parse_args()
+
+    try:
+        service = CaptureService(bbox=args.bbox, interval=1. / args.fps, shared_name=args.name).start()
+    except FileExistsError:
+        print(f"Frames are already published under {args.name}")
+        return
+    print(f"Publishing {service.bbox} at {args.fps:g} fps under {args.name}, Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+
+if __name__ == "__main__":
+    main()
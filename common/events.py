@@ -0,0 +1,308 @@
+# events.py
+"""
+Local stream of detection events from the FA11y tools.
+
+A tool publishes events (plain dicts) and any number of local processes
+subscribe to them, e.g. the FA11y client or a logger:
+
+    publisher = EventPublisher()
+    publisher.start()
+    publisher.publish({'type': 'detection', 'slot': 1, 'item': "Shield Potion"})
+
+    for event in EventSubscriber():
+        print(event)
+
+Events are sent as JSON lines over a Unix socket, or over a localhost TCP
+socket where Unix sockets are not available. The publisher adds a
+sequence number and the time it was published.
+
+Publishing never blocks the tool. Every subscriber has its own bounded
+queue emptied by its own sender thread. When a subscriber cannot keep up,
+its oldest events are dropped and it receives a
+{"type": "dropped", "count": n} event in their place.
+
+Set FA11Y_EVENTS to "unix:<path>" or "tcp:<host>:<port>" to change the
+address.
+
+Usage:
+    python events.py listen
+    python events.py bench --subscribers 3 --events 5000
+"""
+import argparse
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import deque
+
+DEFAULT_UNIX_PATH = os.path.join(tempfile.gettempdir(), "fa11y_events.sock")
+DEFAULT_TCP_ADDRESS = ("127.0.0.1", 47600)
+QUEUE_SIZE = 256  # Events queued per subscriber before the oldest are dropped
+
+def default_address():
+    """FA11Y_EVENTS, else a Unix socket, else localhost TCP"""
+    address = os.environ.get("FA11Y_EVENTS")
+    if address:
+        return address
+    if hasattr(socket, 'AF_UNIX'):
+        return f"unix:{DEFAULT_UNIX_PATH}"
+    return f"tcp:{DEFAULT_TCP_ADDRESS[0]}:{DEFAULT_TCP_ADDRESS[1]}"
+
+def parse_address(address):
+    """
+    Parse "unix:<path>" or "tcp:<host>:<port>".
+
+    Returns:
+        tuple: (socket family, socket address)
+    """
+    kind, _, rest = address.partition(":")
+    if kind == "unix":
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ValueError("Unix sockets are not available on this platform")
+        return socket.AF_UNIX, rest
+    if kind == "tcp":
+        host, _, port = rest.rpartition(":")
+        return socket.AF_INET, (host or DEFAULT_TCP_ADDRESS[0], int(port))
+    raise ValueError(f"Unknown event address {address!r}")
+
+def encode_event(event):
+    return (json.dumps(event, separators=(',', ':')) + "\n").encode()
+
+class _Subscriber:
+    """Connection to one subscriber, with its queue and sender thread"""
+    def __init__(self, conn, queue_size):
+        self.conn = conn
+        self.queue_size = queue_size
+        self.lines = deque()
+        self.dropped = 0
+        self.total_dropped = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def put(self, line):
+        with self.condition:
+            if len(self.lines) >= self.queue_size:
+                self.lines.popleft()
+                self.dropped += 1
+                self.total_dropped += 1
+            self.lines.append(line)
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.lines or self.closed)
+                if self.closed:
+                    break
+                # Send everything queued so far in one write
+                data = b"".join(self.lines)
+                self.lines.clear()
+                if self.dropped:
+                    data = encode_event({'type': 'dropped', 'count': self.dropped}) + data
+                    self.dropped = 0
+            try:
+                self.conn.sendall(data)
+            except OSError:
+                break
+        self.close()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+
+class EventPublisher:
+    def __init__(self, address=None, queue_size=QUEUE_SIZE):
+        """
+        Args:
+            address (str): "unix:<path>" or "tcp:<host>:<port>" (default: default_address())
+            queue_size (int): Events queued per subscriber before the oldest are dropped
+        """
+        self.address = address or default_address()
+        self.queue_size = queue_size
+        self.family, self.sockaddr = parse_address(self.address)
+        self.server = None
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.thread = None
+
+    def start(self):
+        """Start accepting subscribers"""
+        if self.family == getattr(socket, 'AF_UNIX', None) and os.path.exists(self.sockaddr):
+            # Remove a socket file left behind, unless a publisher is still using it
+            probe = socket.socket(self.family, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.sockaddr)
+                raise OSError(f"Another publisher is using {self.sockaddr}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(self.sockaddr)
+            finally:
+                probe.close()
+
+        self.server = socket.socket(self.family, socket.SOCK_STREAM)
+        if self.family == socket.AF_INET:
+            self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(self.sockaddr)
+        self.server.listen()
+        self.thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self.thread.start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                break
+            if self.family == socket.AF_INET:
+                # Send each event right away instead of waiting to fill a packet
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self.lock:
+                self.subscribers.append(_Subscriber(conn, self.queue_size))
+
+    def publish(self, event):
+        """Send an event to every subscriber without waiting for them"""
+        with self.lock:
+            self.seq += 1
+            event = dict(event, seq=self.seq, published=time.time())
+            line = encode_event(event)
+            self.subscribers = [subscriber for subscriber in self.subscribers if not subscriber.closed]
+            for subscriber in self.subscribers:
+                subscriber.put(line)
+        return event
+
+    def subscriber_count(self):
+        with self.lock:
+            return sum(not subscriber.closed for subscriber in self.subscribers)
+
+    def stop(self):
+        if self.server:
+            # Shutting down wakes the accept() in the accept thread
+            try:
+                self.server.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.server.close()
+            self.server = None
+        with self.lock:
+            for subscriber in self.subscribers:
+                subscriber.close()
+            self.subscribers = []
+        if self.family == getattr(socket, 'AF_UNIX', None) and os.path.exists(self.sockaddr):
+            os.unlink(self.sockaddr)
+
+class EventSubscriber:
+    """Iterate over the events of a publisher"""
+    def __init__(self, address=None, timeout=None):
+        self.address = address or default_address()
+        family, sockaddr = parse_address(self.address)
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(sockaddr)
+        self.reader = self.sock.makefile('rb')
+
+    def __iter__(self):
+        for line in self.reader:
+            yield json.loads(line)
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+def _bench_subscriber(address, count, slow, results):
+    """Receive count events and report publish-to-receive latencies"""
+    subscriber = EventSubscriber(address)
+    results.put(('ready', None))
+    latencies = []
+    dropped = received = 0
+    for event in subscriber:
+        if event['type'] == 'dropped':
+            dropped += event['count']
+            continue
+        latencies.append(time.time() - event['published'])
+        received += 1
+        if slow:
+            time.sleep(slow)
+        if event['seq'] >= count:
+            break
+    subscriber.close()
+    results.put(('done', (slow, received, dropped, latencies)))
+
+def main():
+    parser = argparse.ArgumentParser(description="FA11y detection event stream")
+    parser.add_argument("--address", help="unix:<path> or tcp:<host>:<port> (default: %(default)s)",
+                        default=default_address())
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("listen", help="Print events as they arrive")
+    bench_parser = sub.add_parser("bench", help="Measure publish-to-receive latency")
+    bench_parser.add_argument("--subscribers", type=int, default=3)
+    bench_parser.add_argument("--events", type=int, default=5000)
+    bench_parser.add_argument("--rate", type=float, default=1000, help="Events per second")
+    bench_parser.add_argument("--slow", type=float, default=0,
+                              help="Add a subscriber that takes this many seconds per event")
+    args = parser.parse_args()
+
+    if args.command == "listen":
+        try:
+            for event in EventSubscriber(args.address):
+                print(json.dumps(event))
+        except KeyboardInterrupt:
+            pass
+        except ConnectionRefusedError:
+            print(f"No publisher at {args.address}")
+    elif args.command == "bench":
+        import multiprocessing
+
+        publisher = EventPublisher(args.address)
+        publisher.start()
+        results = multiprocessing.Queue()
+        delays = [0.0] * args.subscribers + ([args.slow] if args.slow else [])
+        processes = [multiprocessing.Process(target=_bench_subscriber,
+                                             args=(args.address, args.events, delay, results))
+                     for delay in delays]
+        for process in processes:
+            process.start()
+        for _ in processes:
+            results.get()
+        # Wait for every connection to be accepted
+        while publisher.subscriber_count() < len(processes):
+            time.sleep(0.01)
+
+        interval = 1. / args.rate
+        publish_times = []
+        next_time = time.perf_counter()
+        for i in range(args.events):
+            start_time = time.perf_counter()
+            publisher.publish({'type': 'detection', 'tool': 'bench', 'slot': i % 5 + 1,
+                               'item': "Shield Potion", 'score': 0.99})
+            publish_times.append(time.perf_counter() - start_time)
+            next_time += interval
+            time.sleep(max(next_time - time.perf_counter(), 0))
+
+        reports = [results.get()[1] for _ in processes]
+        for process in processes:
+            process.join()
+        publisher.stop()
+
+        publish_times.sort()
+        print(f"{args.events} events at {args.rate:.0f}/s over {publisher.address}")
+        print(f"publish() mean {sum(publish_times) / len(publish_times) * 1e6:.1f} us, "
+              f"max {publish_times[-1] * 1e6:.1f} us")
+        for slow, received, dropped, latencies in reports:
+            latencies.sort()
+            kind = f"slow ({slow * 1000:.0f} ms/event)" if slow else "subscriber"
+            print(f"{kind}: {received} received, {dropped} dropped, "
+                  f"latency p50 {latencies[len(latencies) // 2] * 1e6:.0f} us, "
+                  f"p95 {latencies[int(len(latencies) * 0.95)] * 1e6:.0f} us, "
+                  f"max {latencies[-1] * 1e6:.0f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+# hotkeys.py
+"""
+Event-driven global hotkeys shared by the FA11y tools.
+
+Key events come from a backend (pynput by default) and are queued to a
+dispatcher that runs the registered callbacks. Nothing polls: while no
+key is pressed the dispatcher is blocked on the queue and never wakes up.
+
+    hotkeys = HotkeyManager()
+    hotkeys.add_hotkey('f5', capture)
+    hotkeys.add_hotkey('ctrl+c', hotkeys.stop)
+    hotkeys.run()  # Dispatch on this thread until stop() is called
+
+For tests, pass FakeBackend() and call its press()/release()/tap().
+"""
+import queue
+import threading
+import time
+from collections import deque
+
+MODIFIERS = ('ctrl', 'shift', 'alt')
+
+def parse_hotkey(spec):
+    """
+    Parse a hotkey such as 'f5' or 'ctrl+c'.
+
+    Returns:
+        tuple: (key name, frozenset of modifier names)
+    """
+    parts = [part.strip().lower() for part in spec.split('+') if part.strip()]
+    if not parts:
+        raise ValueError(f"Empty hotkey: {spec!r}")
+    key = parts[-1]
+    modifiers = frozenset(parts[:-1])
+    unknown = modifiers - set(MODIFIERS)
+    if unknown:
+        raise ValueError(f"Unknown modifiers in hotkey {spec!r}: {', '.join(sorted(unknown))}")
+    return key, modifiers
+
+def pynput_key_name(key):
+    """Normalize a pynput key to a name such as 'f5', 'ctrl' or 'c'"""
+    name = getattr(key, 'name', None)
+    if name:
+        # ctrl_l / ctrl_r / alt_gr -> ctrl / alt
+        for modifier in MODIFIERS:
+            if name.startswith(modifier):
+                return modifier
+        return name
+    # Prefer the virtual key code for letters and digits, since the char
+    # is a control character while ctrl is held
+    vk = getattr(key, 'vk', None)
+    if vk is not None and (0x30 <= vk <= 0x39 or 0x41 <= vk <= 0x5A):
+        return chr(vk).lower()
+    char = getattr(key, 'char', None)
+    if char:
+        return char.lower()
+    return None
+
+class PynputBackend:
+    """Global keyboard hook using pynput"""
+    def __init__(self):
+        self.listener = None
+
+    def start(self, on_event):
+        from pynput import keyboard
+
+        def on_press(key):
+            on_event(pynput_key_name(key), True, time.perf_counter())
+
+        def on_release(key):
+            on_event(pynput_key_name(key), False, time.perf_counter())
+
+        self.listener = keyboard.Listener(on_press=on_press, on_release=on_release)
+        self.listener.start()
+
+    def stop(self):
+        if self.listener:
+            self.listener.stop()
+            self.listener = None
+
+class FakeBackend:
+    """Backend driven by hand, for tests and scripted runs"""
+    def __init__(self):
+        self.on_event = None
+
+    def start(self, on_event):
+        self.on_event = on_event
+
+    def stop(self):
+        self.on_event = None
+
+    def press(self, key):
+        if self.on_event:
+            self.on_event(key, True, time.perf_counter())
+
+    def release(self, key):
+        if self.on_event:
+            self.on_event(key, False, time.perf_counter())
+
+    def tap(self, spec):
+        """Press and release a hotkey such as 'ctrl+c'"""
+        key, modifiers = parse_hotkey(spec)
+        for modifier in modifiers:
+            self.press(modifier)
+        self.press(key)
+        self.release(key)
+        for modifier in modifiers:
+            self.release(modifier)
+
+class HotkeyManager:
+    def __init__(self, backend=None, debounce=0.2):
+        """
+        Args:
+            backend: Key event source (default PynputBackend)
+            debounce (float): Minimum seconds between two triggers of the same hotkey
+        """
+        self.backend = backend or PynputBackend()
+        self.debounce = debounce
+        self.hotkeys = {}
+        self.held = set()
+        self.events = queue.Queue()
+        self.thread = None
+        self.running = False
+        self.stopped = threading.Event()
+
+        # Seconds from the key event to its callback being started
+        self.latencies = deque(maxlen=1000)
+        self.triggered = 0
+        self.suppressed = 0
+
+    def add_hotkey(self, spec, callback, debounce=None):
+        """Call callback() when the hotkey is pressed"""
+        key, modifiers = parse_hotkey(spec)
+        self.hotkeys[(key, modifiers)] = {
+            'callback': callback,
+            'debounce': self.debounce if debounce is None else debounce,
+            'last': float('-inf'),
+        }
+
+    def _on_event(self, key, down, timestamp):
+        # Runs on the backend's thread, so only queue the event
+        if key is not None:
+            self.events.put((key, down, timestamp))
+
+    def _dispatch(self, key, down, timestamp):
+        if not down:
+            self.held.discard(key)
+            return
+        if key in self.held:
+            # Auto-repeat while the key is held down
+            return
+        self.held.add(key)
+        if key in MODIFIERS:
+            return
+
+        modifiers = frozenset(self.held.intersection(MODIFIERS))
+        hotkey = self.hotkeys.get((key, modifiers))
+        if hotkey is None:
+            return
+        if timestamp - hotkey['last'] < hotkey['debounce']:
+            self.suppressed += 1
+            return
+        hotkey['last'] = timestamp
+
+        self.triggered += 1
+        self.latencies.append(time.perf_counter() - timestamp)
+        try:
+            hotkey['callback']()
+        except Exception as e:
+            print(f"Error in hotkey {key}: {e}")
+
+    def _loop(self):
+        while self.running:
+            # Blocks without a timeout, so an idle tool never wakes up
+            event = self.events.get()
+            if event is None:
+                break
+            self._dispatch(*event)
+        self.stopped.set()
+
+    def start(self):
+        """Start listening and dispatch callbacks on a background thread"""
+        self.running = True
+        self.stopped.clear()
+        self.backend.start(self._on_event)
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """Start listening and dispatch callbacks on this thread until stop()"""
+        self.running = True
+        self.stopped.clear()
+        self.backend.start(self._on_event)
+        try:
+            self._loop()
+        finally:
+            self.backend.stop()
+
+    def stop(self):
+        """Stop listening; safe to call from a callback"""
+        self.running = False
+        self.backend.stop()
+        self.events.put(None)
+
+    def join(self, timeout=None):
+        """Wait for the dispatcher to finish"""
+        return self.stopped.wait(timeout)
+
+    def process_pending(self):
+        """Dispatch queued events on this thread without blocking (for tests)"""
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                return
+            if event is not None:
+                self._dispatch(*event)
+
+    def latency_report(self):
+        """Summary of key-to-action latency"""
+        if not self.latencies:
+            return "Hotkeys: none triggered"
+        latencies = sorted(self.latencies)
+        mean = sum(latencies) / len(latencies)
+        return (
+            f"Hotkeys: {self.triggered} triggered, {self.suppressed} debounced, "
+            f"latency mean {mean * 1000:.2f} ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.2f} ms, "
+            f"max {latencies[-1] * 1000:.2f} ms"
+        )
@@ -0,0 +1,112 @@
+import os
+import time
+import numpy as np
+import pytest
+from capture import CaptureService, FileGrabber, SharedFrameReader, open_capture
+
+BBOX = (10, 20, 30, 35)
+
+class SolidGrabber:
+    """Grabber returning frames of one colour"""
+    def __init__(self, value):
+        self.value = value
+        self.grabs = 0
+
+    def screen_bbox(self):
+        return (0, 0, 100, 100)
+
+    def grab(self, bbox):
+        self.grabs += 1
+        left, top, right, bottom = bbox
+        return np.full((bottom - top, right - left, 4), self.value, dtype=np.uint8)
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def shared_name():
+    return f"fa11y_test_{os.getpid()}_{time.perf_counter_ns()}"
+
+def test_reader_follows_live_publisher(shared_name):
+    service = CaptureService(SolidGrabber(1), BBOX, interval=0.01, shared_name=shared_name)
+    service.capture_once()
+    direct = SolidGrabber(2)
+    reader = SharedFrameReader(shared_name, BBOX, direct)
+    try:
+        frame = reader.latest()
+        assert frame.valid()
+        assert frame.region(BBOX)[0, 0, 0] == 1
+        assert direct.grabs == 0
+    finally:
+        reader.stop()
+        service.stop()
+
+def test_reader_grabs_directly_when_publisher_stops(shared_name):
+    service = CaptureService(SolidGrabber(1), BBOX, interval=0.01, shared_name=shared_name)
+    service.capture_once()
+    direct = SolidGrabber(2)
+    reader = SharedFrameReader(shared_name, BBOX, direct)
+    try:
+        # The last frame is much older than STALE_FRAMES intervals
+        service.ring.publish(np.ones((15, 20, 4), dtype=np.uint8), timestamp=time.time() - 60)
+        assert reader.stale()
+        frame = reader.latest()
+        assert frame.region(BBOX)[0, 0, 0] == 2
+        assert direct.grabs == 1
+    finally:
+        reader.stop()
+        service.stop()
+
+def test_open_capture_reads_published_frames(shared_name):
+    service = CaptureService(SolidGrabber(3), BBOX, interval=0.01, shared_name=shared_name).start()
+    try:
+        reader = open_capture(BBOX, shared_name=shared_name, grabber=SolidGrabber(4))
+        assert isinstance(reader, SharedFrameReader)
+        assert reader.latest().region(BBOX)[0, 0, 0] == 3
+        reader.stop()
+    finally:
+        service.stop()
+
+def test_open_capture_fallback_is_private(shared_name):
+    source = open_capture(BBOX, shared_name=shared_name, grabber=SolidGrabber(3))
+    try:
+        assert source.latest().region(BBOX)[0, 0, 0] == 3
+        # Only a publisher started on purpose shares its frames
+        with pytest.raises(FileNotFoundError):
+            SharedFrameReader(shared_name)
+    finally:
+        source.stop()
+
+def test_frames_outlive_stop(shared_name):
+    service = CaptureService(SolidGrabber(6), BBOX, interval=0.01, shared_name=shared_name)
+    service.capture_once()
+    reader = SharedFrameReader(shared_name, BBOX, SolidGrabber(7))
+    frame = reader.latest()
+    own_frame = service.latest()
+    reader.stop()
+    service.stop()
+    # The shared memory stays mapped while frames point into it
+    assert frame.region(BBOX)[0, 0, 0] == 6
+    assert own_frame.pixels[-1, -1, -1] == 6
+    assert not frame.valid()
+
+def test_open_capture_skips_stopped_publisher(shared_name):
+    service = CaptureService(SolidGrabber(1), BBOX, interval=0.01, shared_name=shared_name)
+    service.ring.publish(np.ones((15, 20, 4), dtype=np.uint8), timestamp=time.time() - 60)
+    try:
+        source = open_capture(BBOX, shared_name=shared_name, start_service=False, grabber=SolidGrabber(5))
+        assert not isinstance(source, SharedFrameReader)
+        assert source.latest().region(BBOX)[0, 0, 0] == 5
+        source.stop()
+    finally:
+        service.stop()
+
+def test_file_grabber_origin():
+    image = np.arange(6 * 8 * 4, dtype=np.uint8).reshape(6, 8, 4)
+    grabber = FileGrabber("map.png", origin=(100, 50))
+    grabber._frames["map.png"] = image  # Decoded already, so no image file is needed
+    assert grabber.screen_bbox() == (100, 50, 108, 56)
+    assert np.array_equal(grabber.grab((100, 50, 108, 56)), image)
+    assert np.array_equal(grabber.grab((102, 51, 105, 53)), image[1:3, 2:5])
+    # Outside the image is black
+    assert not grabber.grab((106, 50, 110, 52))[:, 2:].any()
@@ -0,0 +1,69 @@
+import json
+import os
+import socket
+import threading
+import time
+import pytest
+from events import EventPublisher, EventSubscriber, _Subscriber, encode_event, parse_address
+
+class BlockedConnection:
+    """Socket stand-in whose first send waits until released, like a slow subscriber"""
+    def __init__(self):
+        self.sending = threading.Event()
+        self.release = threading.Event()
+        self.data = b""
+        self.sent = threading.Condition()
+
+    def sendall(self, data):
+        self.sending.set()
+        self.release.wait(5)
+        with self.sent:
+            self.data += data
+            self.sent.notify_all()
+
+    def close(self):
+        pass
+
+    def events(self, count, timeout=5):
+        with self.sent:
+            self.sent.wait_for(lambda: self.data.count(b"\n") >= count, timeout)
+        return [json.loads(line) for line in self.data.splitlines()]
+
+def test_slow_subscriber_loses_oldest_events():
+    conn = BlockedConnection()
+    subscriber = _Subscriber(conn, queue_size=3)
+    try:
+        subscriber.put(encode_event({'seq': 1}))
+        assert conn.sending.wait(5)
+        # The sender is stuck on event 1, so only the newest three of the rest are kept
+        for seq in range(2, 8):
+            subscriber.put(encode_event({'seq': seq}))
+        assert subscriber.total_dropped == 3
+        conn.release.set()
+        events = conn.events(5)
+        assert events == [{'seq': 1}, {'type': 'dropped', 'count': 3}, {'seq': 5}, {'seq': 6}, {'seq': 7}]
+    finally:
+        subscriber.close()
+
+def test_parse_address():
+    assert parse_address("tcp:127.0.0.1:5000")[1] == ("127.0.0.1", 5000)
+    with pytest.raises(ValueError):
+        parse_address("pipe:fa11y")
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_events_reach_subscribers(tmp_path):
+    address = f"unix:{tmp_path / 'events.sock'}"
+    publisher = EventPublisher(address)
+    publisher.start()
+    try:
+        subscriber = EventSubscriber(address, timeout=5)
+        deadline = time.time() + 5
+        while publisher.subscriber_count() < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        publisher.publish({'type': 'detection', 'slot': 1, 'item': "Medkit"})
+        event = next(iter(subscriber))
+        assert (event['type'], event['item'], event['seq']) == ('detection', "Medkit", 1)
+        subscriber.close()
+    finally:
+        publisher.stop()
+    assert not os.path.exists(tmp_path / 'events.sock')
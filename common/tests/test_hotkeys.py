@@ -0,0 +1,110 @@
+import threading
+import time
+import pytest
+from hotkeys import FakeBackend, HotkeyManager, parse_hotkey
+
+def manager(debounce=0.0):
+    backend = FakeBackend()
+    hotkeys = HotkeyManager(backend, debounce=debounce)
+    # Deliver events to the queue without starting a dispatcher thread
+    backend.start(hotkeys._on_event)
+    return hotkeys, backend
+
+def test_parse_hotkey():
+    assert parse_hotkey("Ctrl + C") == ("c", frozenset({"ctrl"}))
+    assert parse_hotkey("f5") == ("f5", frozenset())
+    with pytest.raises(ValueError):
+        parse_hotkey("win+c")
+    with pytest.raises(ValueError):
+        parse_hotkey("+")
+
+def test_combo_needs_exact_modifiers():
+    hotkeys, backend = manager()
+    fired = []
+    hotkeys.add_hotkey("ctrl+c", lambda: fired.append("ctrl+c"))
+    hotkeys.add_hotkey("c", lambda: fired.append("c"))
+
+    backend.tap("ctrl+c")
+    backend.tap("c")
+    backend.tap("ctrl+shift+c")
+    hotkeys.process_pending()
+    assert fired == ["ctrl+c", "c"]
+
+def test_modifier_release():
+    hotkeys, backend = manager()
+    fired = []
+    hotkeys.add_hotkey("ctrl+c", lambda: fired.append("ctrl+c"))
+    hotkeys.add_hotkey("c", lambda: fired.append("c"))
+
+    backend.press("ctrl")
+    backend.press("c")
+    backend.release("c")
+    backend.release("ctrl")
+    # ctrl is no longer held, so this is plain c
+    backend.press("c")
+    backend.release("c")
+    hotkeys.process_pending()
+    assert fired == ["ctrl+c", "c"]
+    assert hotkeys.held == set()
+
+def test_auto_repeat_and_debounce():
+    hotkeys, backend = manager(debounce=60)
+    fired = []
+    hotkeys.add_hotkey("f5", lambda: fired.append("f5"))
+
+    # Auto-repeat sends presses without releases
+    backend.press("f5")
+    backend.press("f5")
+    backend.release("f5")
+    # Pressed again within the debounce time
+    backend.tap("f5")
+    hotkeys.process_pending()
+    assert fired == ["f5"]
+    assert hotkeys.suppressed == 1
+
+def test_callbacks_run_on_the_run_thread():
+    backend = FakeBackend()
+    hotkeys = HotkeyManager(backend, debounce=0)
+    threads = []
+
+    def on_f5():
+        threads.append(threading.current_thread())
+
+    def on_f9():
+        threads.append(threading.current_thread())
+        hotkeys.stop()
+
+    hotkeys.add_hotkey("f5", on_f5)
+    hotkeys.add_hotkey("f9", on_f9)
+    runner = threading.Thread(target=hotkeys.run)
+    runner.start()
+    while backend.on_event is None:
+        time.sleep(0.001)
+    backend.tap("f5")
+    backend.tap("f9")
+    runner.join(timeout=5)
+
+    assert not runner.is_alive()
+    assert threads == [runner, runner]
+    assert hotkeys.join(0)
+    assert hotkeys.triggered == 2
+
+def test_stop_ends_background_dispatcher():
+    backend = FakeBackend()
+    hotkeys = HotkeyManager(backend)
+    fired = threading.Event()
+    hotkeys.add_hotkey("f5", fired.set)
+    hotkeys.start()
+    backend.tap("f5")
+    assert fired.wait(5)
+    assert hotkeys.thread is not threading.current_thread()
+
+    hotkeys.stop()
+    assert hotkeys.join(5)
+    hotkeys.thread.join(5)
+    assert not hotkeys.thread.is_alive()
+    # The backend is stopped, so later keys are not delivered
+    fired.clear()
+    backend.tap("f5")
+    assert not fired.is_set()
+    assert "1 triggered" in hotkeys.latency_report()